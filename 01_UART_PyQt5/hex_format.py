@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Hex Format Module
+ ==================
+ - Hex / ASCII / hex-dump formatting shared by the UART terminals.
+
+ - Everything is done with bulk `bytes` operations (`bytes.hex`,
+   `bytes.translate`) and a precomputed translation table, so there is
+   no per-byte Python loop on the RX path.
+
+ - Functions:
+        * parse_hex: Hex text (spaces allowed) to bytes
+        * to_hex: Bytes to "AA BB CC" text
+        * to_ascii: Bytes to printable ASCII ('.' for the rest)
+        * hex_dump: Bytes to offset / hex / ASCII lines
+"""
+
+# Printable ASCII maps to itself, everything else to '.'
+ASCII_TABLE = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))
+
+
+def parse_hex(text):
+    """Parse hex text such as "FF 00 a3bd" into bytes (raises ValueError)"""
+    return bytes.fromhex(''.join(text.split()))
+
+
+def to_hex(data, sep=' '):
+    """Format bytes as upper-case hex pairs separated by sep"""
+    if not data:
+        return ""
+    return data.hex(sep).upper() if sep else data.hex().upper()
+
+
+def to_ascii(data):
+    """Format bytes as printable ASCII, replacing the rest with '.'"""
+    return bytes(data).translate(ASCII_TABLE).decode('ascii')
+
+
+def hex_dump(data, width=16, base=0):
+    """Format bytes as hex-dump lines: offset, hex column and ASCII column"""
+    if not data:
+        return []
+    # Convert the whole buffer once, then cut fixed-width rows out of it
+    hex_text = to_hex(data)
+    ascii_text = to_ascii(data)
+    hex_width = 3 * width - 1
+    return [
+        f"{base + offset:08X}  {hex_text[3 * offset:3 * offset + hex_width]:<{hex_width}}  "
+        f"{ascii_text[offset:offset + width]}"
+        for offset in range(0, len(data), width)
+    ]
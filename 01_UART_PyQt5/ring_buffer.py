@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Ring Buffer Module
+ ===================
+ - Fixed-size byte ring buffer between the serial reader thread and the UI.
+
+ - Memory is allocated once up front; when the consumer falls behind,
+   the oldest bytes are overwritten and counted as dropped.
+
+ - Classes:
+        * RingBuffer: Thread-safe preallocated byte ring buffer
+"""
+
+import threading
+
+
+class RingBuffer:
+    """Thread-safe, fixed-capacity byte ring buffer"""
+
+    def __init__(self, capacity=1 << 20):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._head = 0      # Index of the oldest unread byte
+        self._size = 0      # Number of unread bytes
+        self._lock = threading.Lock()
+        
+        # Counters
+        self.total_written = 0
+        self.dropped = 0
+    
+    def __len__(self):
+        with self._lock:
+            return self._size
+    
+    def write(self, data):
+        """Append data, overwriting the oldest bytes if the buffer is full"""
+        n = len(data)
+        if n == 0:
+            return
+        data = memoryview(data)
+        capacity = self.capacity
+        
+        with self._lock:
+            self.total_written += n
+            
+            # Only the newest `capacity` bytes of a huge write can survive
+            if n >= capacity:
+                self.dropped += self._size + n - capacity
+                self._view[:] = data[n - capacity:]
+                self._head = 0
+                self._size = capacity
+                return
+            
+            # Make room by discarding the oldest bytes
+            overflow = self._size + n - capacity
+            if overflow > 0:
+                self.dropped += overflow
+                self._head = (self._head + overflow) % capacity
+                self._size -= overflow
+            
+            # Copy in at most two slices (before and after the wrap point)
+            tail = (self._head + self._size) % capacity
+            first = min(n, capacity - tail)
+            self._view[tail:tail + first] = data[:first]
+            if first < n:
+                self._view[:n - first] = data[first:]
+            self._size += n
+    
+    def read(self, max_bytes=None):
+        """Remove and return up to max_bytes of the oldest data (all by default)"""
+        with self._lock:
+            n = self._size if max_bytes is None else min(max_bytes, self._size)
+            if n <= 0:
+                return b""
+            head = self._head
+            end = head + n
+            if end <= self.capacity:
+                data = bytes(self._view[head:end])
+            else:
+                data = bytes(self._view[head:]) + bytes(self._view[:end - self.capacity])
+            self._head = end % self.capacity
+            self._size -= n
+            return data
+    
+    def clear(self):
+        """Discard all unread data"""
+        with self._lock:
+            self._head = 0
+            self._size = 0
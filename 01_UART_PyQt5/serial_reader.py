@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Serial Reader Module
+ =====================
+ - Background thread that continuously drains an open serial port.
+
+ - Every byte that arrives is written into a RingBuffer, so unsolicited
+   data is captured even when nothing was transmitted.
+
+ - Classes:
+        * SerialReader: Reader thread for one open serial port
+"""
+
+import threading
+
+
+class SerialReader(threading.Thread):
+    """Drains `in_waiting` from a serial port into a RingBuffer until stopped
+    
+    on_data, if given, is called from this thread with every chunk read
+    (e.g. to timestamp it for a capture file); it must be quick.
+    """
+
+    def __init__(self, serial_port, ring_buffer, poll_timeout=0.05, on_data=None):
+        super().__init__(daemon=True)
+        self.serial_port = serial_port
+        self.ring_buffer = ring_buffer
+        self.on_data = on_data
+        self.poll_timeout = poll_timeout
+        self.error = None
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        port = self.serial_port
+        # A blocking read wakes up as soon as data arrives; the timeout only
+        # bounds how long a stop request can go unnoticed.
+        port.timeout = self.poll_timeout
+        read = port.read
+        write = self.ring_buffer.write
+        
+        while not self._stop_event.is_set():
+            try:
+                data = read(max(1, port.in_waiting))
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    self.error = e
+                break
+            if data:
+                write(data)
+                if self.on_data is not None:
+                    self.on_data(data)
+    
+    def stop(self, timeout=1.0):
+        """Ask the thread to exit and wait for it"""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
@@ -15,7 +15,8 @@
         2. Hex data transmission and reception
         3. Settings persistence
         4. Configurable delays
-        5. Continuous monitoring mode
+        5. Continuous monitoring mode (background reader + ring buffer)
+        6. Persistent session mode (port stays open across transmits)
 
  - Classes:
         * UARTTerminal: Main application class
@@ -26,7 +27,17 @@ import os
 import json
 import serial
 import serial.tools.list_ports
+from PyQt5.QtCore import QTimer
 from uart_terminal_ui import UARTTerminalUI
+from hex_format import parse_hex, to_hex
+from ring_buffer import RingBuffer
+from serial_reader import SerialReader
+
+
+# RX ring buffer size: 1 MiB holds ~11 s of backlog at 921600 baud
+RX_BUFFER_SIZE = 1 << 20
+# How often the UI drains the RX ring buffer
+RX_POLL_INTERVAL_MS = 50
 
 
 class UARTTerminal(UARTTerminalUI):
@@ -36,11 +47,22 @@ class UARTTerminal(UARTTerminalUI):
         # Serial port object
         self.serial_port = None
         
+        # Continuous monitoring: reader thread -> ring buffer -> UI timer
+        self.serial_reader = None
+        self.rx_buffer = RingBuffer(RX_BUFFER_SIZE)
+        self.rx_dropped = 0
+        self.rx_timer = QTimer(self)
+        self.rx_timer.setInterval(RX_POLL_INTERVAL_MS)
+        self.rx_timer.timeout.connect(self.drain_rx_buffer)
+        
         # Config file path
         self.config_path = os.path.join(os.path.expanduser("~"), "uart_config.json")
         self.settings = {
             "port": "",
-            "baudrate": "115200"
+            "baudrate": "115200",
+            "persistent": False,
+            "log_lines": 10000,
+            "hex_scrollback_kb": 1024
         }
         
         # Load saved settings
@@ -51,6 +73,11 @@ class UARTTerminal(UARTTerminalUI):
         self.save_button.clicked.connect(self.save_settings)
         self.clear_button.clicked.connect(self.clear_terminal)
         self.transmit_button.clicked.connect(self.send_and_disconnect)
+        self.persistent_check.toggled.connect(self.on_mode_changed)
+        self.connect_button.clicked.connect(self.open_session)
+        self.disconnect_button.clicked.connect(self.close_session)
+        self.log_lines_spin.valueChanged.connect(self.apply_scrollback)
+        self.hex_kb_spin.valueChanged.connect(self.apply_scrollback)
         
         # Initialize the port list
         self.refresh_ports()
@@ -59,6 +86,15 @@ class UARTTerminal(UARTTerminalUI):
         index = self.baud_combo.findText(self.settings["baudrate"])
         if index >= 0:
             self.baud_combo.setCurrentIndex(index)
+        
+        # Restore session mode from settings
+        self.persistent_check.setChecked(bool(self.settings["persistent"]))
+        self.update_session_controls()
+        
+        # Restore scrollback caps from settings
+        self.log_lines_spin.setValue(int(self.settings["log_lines"]))
+        self.hex_kb_spin.setValue(int(self.settings["hex_scrollback_kb"]))
+        self.apply_scrollback()
     
     def refresh_ports(self):
         """Refresh the list of available serial ports"""
@@ -110,6 +146,7 @@ class UARTTerminal(UARTTerminalUI):
     
     def disconnect_from_device(self):
         """Disconnect from the current serial port"""
+        self.stop_reader()
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
             self.serial_port = None
@@ -119,46 +156,126 @@ class UARTTerminal(UARTTerminalUI):
         self.status_value.setStyleSheet("color: red;")
         self.terminal_display.append("<Disconnected from device>\n")
     
-    def send_and_disconnect(self):
-        """Connect, send message, and disconnect workflow"""
-        # Step 1: Connect
-        if not self.connect_to_device():
+    def is_connected(self):
+        """Return True if the serial port is currently open"""
+        return bool(self.serial_port and self.serial_port.is_open)
+    
+    def open_session(self):
+        """Open a persistent session that is reused for every transmit"""
+        if self.is_connected():
+            return
+        if self.connect_to_device():
+            self.start_reader()
+        self.update_session_controls()
+    
+    def close_session(self):
+        """Close the persistent session"""
+        if self.is_connected():
+            self.disconnect_from_device()
+        self.update_session_controls()
+    
+    def on_mode_changed(self, persistent):
+        """Switch between one-shot and stay-connected mode"""
+        if not persistent and self.is_connected():
+            self.close_session()
+        self.update_session_controls()
+    
+    def start_reader(self):
+        """Start continuous monitoring of the open port"""
+        self.rx_buffer.clear()
+        self.rx_dropped = self.rx_buffer.dropped
+        self.serial_reader = SerialReader(self.serial_port, self.rx_buffer)
+        self.serial_reader.start()
+        self.rx_timer.start()
+    
+    def stop_reader(self):
+        """Stop continuous monitoring and show any data still buffered"""
+        if self.serial_reader is None:
             return
+        self.serial_reader.stop()
+        self.serial_reader = None
+        self.rx_timer.stop()
+        self.drain_rx_buffer()
+    
+    def drain_rx_buffer(self):
+        """Display everything the reader thread has buffered since the last call"""
+        data = self.rx_buffer.read()
+        if data:
+            self.hex_model.append_bytes(data)
+            self.terminal_display.append(f"RX: {to_hex(data)}\n")
+        
+        # Report bytes lost because the buffer overflowed
+        dropped = self.rx_buffer.dropped - self.rx_dropped
+        if dropped:
+            self.rx_dropped = self.rx_buffer.dropped
+            self.terminal_display.append(f"<RX buffer overflow: {dropped} bytes dropped>\n")
+        
+        # The reader exits on its own if the port fails (e.g. unplugged)
+        reader = self.serial_reader
+        if reader is not None and not reader.is_alive():
+            self.terminal_display.append(f"<Read error: {reader.error}>\n")
+            self.close_session()
+    
+    def update_session_controls(self):
+        """Enable or disable the session widgets for the current state"""
+        connected = self.is_connected()
+        persistent = self.persistent_check.isChecked()
+        self.connect_button.setEnabled(persistent and not connected)
+        self.disconnect_button.setEnabled(connected)
+        self.port_combo.setEnabled(not connected)
+        self.baud_combo.setEnabled(not connected)
+        self.refresh_button.setEnabled(not connected)
+    
+    def send_and_disconnect(self):
+        """Connect, send message, and disconnect workflow
+        
+        In stay-connected mode the open port is reused and left open.
+        """
+        # Step 1: Connect (skipped when a session is already open)
+        keep_open = self.persistent_check.isChecked() or self.is_connected()
+        if keep_open and not self.is_connected():
+            self.open_session()
+        if not self.is_connected():
+            if not self.connect_to_device():
+                return
+            self.update_session_controls()
             
         # Step 2: Send message
         try:
             # Get and parse hex input
             hex_input = self.transmit_input.text().strip()
             
-            # Remove any spaces and validate hex characters
-            hex_input = ''.join(hex_input.split())
-            
-            # Check if input is valid hex
+            # Check if input is valid hex (spaces are ignored)
             try:
-                byte_data = bytes.fromhex(hex_input)
+                byte_data = parse_hex(hex_input)
             except ValueError:
                 self.terminal_display.append("<Invalid hex format>\n")
-                self.disconnect_from_device()
+                if not keep_open:
+                    self.disconnect_from_device()
+                    self.update_session_controls()
                 return
                 
             # Send the data
             self.serial_port.write(byte_data)
             
             # Display what was sent
-            formatted_hex = ' '.join([hex_input[i:i+2] for i in range(0, len(hex_input), 2)]).upper()
+            formatted_hex = to_hex(byte_data)
             self.terminal_display.append(f"TX: {formatted_hex}\n")
             
-            # Check for response
-            if self.serial_port.in_waiting > 0:
+            # Check for response (the reader thread picks it up when monitoring)
+            if self.serial_reader is None and self.serial_port.in_waiting > 0:
                 data = self.serial_port.read(self.serial_port.in_waiting)
-                hex_data = data.hex(' ').upper()
+                self.hex_model.append_bytes(data)
+                hex_data = to_hex(data)
                 self.terminal_display.append(f"RX: {hex_data}\n")
             
         except Exception as e:
             self.terminal_display.append(f"<Send error: {str(e)}>\n")
         
-        # Step 3: Disconnect
-        self.disconnect_from_device()
+        # Step 3: Disconnect (one-shot mode only)
+        if not keep_open:
+            self.disconnect_from_device()
+            self.update_session_controls()
     
     def save_settings(self):
         """Save the current port and baudrate settings"""
@@ -166,6 +283,9 @@ class UARTTerminal(UARTTerminalUI):
         if port != "No ports available":
             self.settings["port"] = port
         self.settings["baudrate"] = self.baud_combo.currentText()
+        self.settings["persistent"] = self.persistent_check.isChecked()
+        self.settings["log_lines"] = self.log_lines_spin.value()
+        self.settings["hex_scrollback_kb"] = self.hex_kb_spin.value()
         
         try:
             with open(self.config_path, 'w') as f:
@@ -184,12 +304,19 @@ class UARTTerminal(UARTTerminalUI):
         except Exception as e:
             print(f"Error loading settings: {e}")
     
+    def apply_scrollback(self):
+        """Apply the scrollback caps of the log and the hex dump"""
+        self.terminal_display.document().setMaximumBlockCount(self.log_lines_spin.value())
+        self.hex_model.set_max_bytes(self.hex_kb_spin.value() * 1024)
+    
     def clear_terminal(self):
         """Clear the terminal display"""
         self.terminal_display.clear()
+        self.hex_model.clear()
     
     def closeEvent(self, event):
         """Handle window close event to properly clean up resources"""
+        self.stop_reader()
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
         event.accept()
\ No newline at end of file
@@ -7,13 +7,18 @@
  
  - Contains the UI layout & components
 
+ - The terminal shows a line-capped text log and a virtualized hex dump
+   of received bytes (see hex_view.py)
+
  - Classes:
         * UARTTerminalUI: Main window UI class
 """
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QComboBox, QPushButton, QLabel, 
-                             QTextEdit, QLineEdit, QGridLayout, QGroupBox)
+                             QTextEdit, QLineEdit, QGridLayout, QGroupBox,
+                             QCheckBox, QTabWidget, QSpinBox)
+from hex_view import HexDumpView
 
 
 class UARTTerminalUI(QMainWindow):
@@ -54,6 +59,20 @@ class UARTTerminalUI(QMainWindow):
         self.status_value = QLabel("Disconnected")
         self.status_value.setStyleSheet("color: red;")
         
+        # Session mode: one-shot (default) or stay connected
+        self.mode_label = QLabel("Mode:")
+        self.persistent_check = QCheckBox("Stay connected")
+        self.connect_button = QPushButton("Connect")
+        self.disconnect_button = QPushButton("Disconnect")
+        self.connect_button.setEnabled(False)
+        self.disconnect_button.setEnabled(False)
+        
+        session_layout = QHBoxLayout()
+        session_layout.addWidget(self.persistent_check)
+        session_layout.addStretch()
+        session_layout.addWidget(self.connect_button)
+        session_layout.addWidget(self.disconnect_button)
+        
         # Layout
         connection_layout.addWidget(self.port_label, 0, 0)
         connection_layout.addWidget(self.port_combo, 0, 1)
@@ -63,6 +82,8 @@ class UARTTerminalUI(QMainWindow):
         connection_layout.addWidget(self.save_button, 1, 2)
         connection_layout.addWidget(self.status_label, 2, 0)
         connection_layout.addWidget(self.status_value, 2, 1, 1, 2)
+        connection_layout.addWidget(self.mode_label, 3, 0)
+        connection_layout.addLayout(session_layout, 3, 1, 1, 2)
         
         connection_group.setLayout(connection_layout)
         self.main_layout.addWidget(connection_group)
@@ -76,10 +97,38 @@ class UARTTerminalUI(QMainWindow):
         self.terminal_display.setReadOnly(True)
         self.terminal_display.setStyleSheet("font-family: monospace;")
         
+        # Hex dump of received bytes (only visible rows are rendered)
+        self.hex_view = HexDumpView()
+        self.hex_model = self.hex_view.model()
+        
+        self.terminal_tabs = QTabWidget()
+        self.terminal_tabs.addTab(self.terminal_display, "Log")
+        self.terminal_tabs.addTab(self.hex_view, "Hex Dump")
+        
+        # Scrollback caps
+        self.log_lines_label = QLabel("Log lines:")
+        self.log_lines_spin = QSpinBox()
+        self.log_lines_spin.setRange(100, 1000000)
+        self.log_lines_spin.setSingleStep(1000)
+        self.log_lines_spin.setValue(10000)
+        self.hex_kb_label = QLabel("Hex dump (KB):")
+        self.hex_kb_spin = QSpinBox()
+        self.hex_kb_spin.setRange(1, 65536)
+        self.hex_kb_spin.setSingleStep(256)
+        self.hex_kb_spin.setValue(1024)
+        
+        scrollback_layout = QHBoxLayout()
+        scrollback_layout.addWidget(self.log_lines_label)
+        scrollback_layout.addWidget(self.log_lines_spin)
+        scrollback_layout.addWidget(self.hex_kb_label)
+        scrollback_layout.addWidget(self.hex_kb_spin)
+        scrollback_layout.addStretch()
+        
         # Clear button
         self.clear_button = QPushButton("Clear Terminal")
         
-        terminal_layout.addWidget(self.terminal_display)
+        terminal_layout.addWidget(self.terminal_tabs)
+        terminal_layout.addLayout(scrollback_layout)
         terminal_layout.addWidget(self.clear_button)
         
         terminal_group.setLayout(terminal_layout)
@@ -0,0 +1,180 @@
+"""
+ Chat Client Module
+ ===================
+ - HTTP side of the chat GUI, kept off the Tk main loop.
+
+ - Requests go through one requests.Session with a keep-alive connection
+   pool, from a small thread pool, so several messages can be in flight
+   and no request opens a new connection.
+
+ - Replies can be streamed: server-sent events (text/event-stream) and
+   plain chunked bodies are read incrementally and passed on token by
+   token. A normal JSON reply still works in streaming mode.
+
+ - Events are put on a queue; the GUI drains it with poll() from
+   root.after, so Tk is only ever touched from its own thread.
+
+ - Classes:
+        * ChatEvent: One token, completion or error for a message
+        * ChatClient: Pooled, non-blocking chat API client
+"""
+
+import itertools
+import json
+import queue
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_API_URL = "http://localhost:5000/api/chat"
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Event kinds
+TOKEN = "token"     # text: next piece of the reply
+DONE = "done"       # elapsed: total seconds, ttft: seconds to first token
+ERROR = "error"     # text: error message
+
+
+ChatEvent = namedtuple("ChatEvent", "request_id kind text elapsed ttft")
+
+
+def reply_text(response):
+    """The "reply" field of a JSON reply (ValueError if the body isn't an object)"""
+    body = response.json()
+    if not isinstance(body, dict):
+        raise ValueError(f"unexpected reply: {json.dumps(body)[:80]}")
+    return body.get("reply", "No response")
+
+
+def sse_tokens(lines):
+    """Yield the text of each server-sent event until [DONE]
+
+    Event data may be plain text or JSON with a "token", "content" or
+    "reply" field.
+    """
+    data = []
+    for line in lines:
+        if line.startswith("data:"):
+            # The spec strips exactly one space; more belong to the token
+            value = line[5:]
+            if value.startswith(" "):
+                value = value[1:]
+            data.append(value)
+            continue
+        if line or not data:
+            continue  # Comments, other fields, or keep-alive blank lines
+        payload = "\n".join(data)
+        data = []
+        if payload == "[DONE]":
+            return
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            yield payload
+            continue
+        if isinstance(event, dict):
+            yield event.get("token") or event.get("content") or event.get("reply") or ""
+        else:
+            yield str(event)
+
+
+class ChatClient:
+    """Sends chat messages from worker threads over pooled connections"""
+
+    def __init__(self, api_url=DEFAULT_API_URL, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.api_url = api_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_in_flight = max_in_flight
+
+        # One keep-alive connection per worker, reused across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight,
+                                           thread_name_prefix="chat")
+        self.events = queue.Queue()
+        self.in_flight = 0
+        self._ids = itertools.count(1)
+
+    def send(self, message, stream=False):
+        """Queue a message; returns its request id immediately"""
+        request_id = next(self._ids)
+        self.in_flight += 1
+        self.executor.submit(self._post, request_id, message, stream)
+        return request_id
+
+    def _post(self, request_id, message, stream):
+        """Worker thread: one POST, its tokens and completion go to the queue"""
+        start = time.perf_counter()
+        ttft = None
+        error = "request ended unexpectedly"
+        try:
+            for token in self._reply_tokens(message, stream):
+                if not token:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                self.events.put(ChatEvent(request_id, TOKEN, token, None, None))
+            if ttft is None:
+                self.events.put(ChatEvent(request_id, TOKEN, "No response", None, None))
+            self.events.put(ChatEvent(request_id, DONE, None, time.perf_counter() - start, ttft))
+            error = None
+        except (requests.RequestException, ValueError) as e:
+            error = str(e)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            # Every request ends with DONE or ERROR, or in_flight never drops
+            if error is not None:
+                self.events.put(ChatEvent(request_id, ERROR, error,
+                                          time.perf_counter() - start, ttft))
+
+    def _reply_tokens(self, message, stream):
+        """Yield the reply text as it arrives (all at once when not streaming)"""
+        if not stream:
+            response = self.session.post(self.api_url, json={"message": message},
+                                         timeout=self.timeout)
+            response.raise_for_status()
+            yield reply_text(response)
+            return
+
+        with self.session.post(self.api_url, json={"message": message, "stream": True},
+                               timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            if "charset" not in content_type:
+                response.encoding = "utf-8"
+
+            if "application/json" in content_type:
+                # Server ignored the stream request: one complete reply
+                yield reply_text(response)
+            elif "text/event-stream" in content_type:
+                yield from sse_tokens(response.iter_lines(chunk_size=None, decode_unicode=True))
+            else:
+                # Plain chunked text: every chunk is passed on as it arrives
+                yield from response.iter_content(chunk_size=None, decode_unicode=True)
+
+    def poll(self):
+        """Return every queued event without blocking (call from the GUI thread)"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        self.in_flight -= sum(1 for event in events if event.kind != TOKEN)
+        return events
+
+    def close(self):
+        """Drop queued requests and release the connection pool"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -0,0 +1,309 @@
+"""
+ Chat Load Test
+ ===============
+ - Drives the chat window's send_message path at a fixed concurrency and
+   reports reply latency, time to first token and how responsive the Tk
+   main loop stayed.
+
+ - By default a stub backend (stub_server.py) is started in-process with
+   the given latency, jitter and streaming speed; --url targets a running
+   backend instead.
+
+ - Latency and time to first token are measured as the user sees them:
+   from send_message to the poll tick that displays the first token or
+   the completion. Responsiveness is the lateness of a heartbeat on the
+   main loop; the longest stall is the worst time the window could not
+   repaint or react to input.
+
+ - Without a display the same schedule runs on a plain loop without Tk.
+   That still covers client-side polling, but not widget insert cost.
+
+ - Usage:
+        python load_test.py [--requests 200] [--concurrency 8] [--stream]
+                            [--delay 0.2] [--jitter 0.1] [--token-delay 0.01]
+                            [--words 0] [--url URL] [--headless] [--json FILE]
+
+ - Classes:
+        * ObservedClient: ChatClient that reports every polled event
+        * HeadlessLoop: Minimal stand-in for root.after / mainloop
+        * LoadTest: Request pacing and measurements for one run
+"""
+
+import argparse
+import heapq
+import json
+import threading
+import time
+import tkinter as tk
+
+from chat_client import ChatClient, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, TOKEN, DONE
+from main import ChatApp, POLL_INTERVAL_MS
+from stub_server import make_server
+
+# Main loop heartbeat; its lateness is the stall measurement
+HEARTBEAT_MS = 10
+STALL_THRESHOLD_MS = 50
+# New messages are sent from this tick when a slot is free
+PUMP_INTERVAL_MS = 5
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class ObservedClient(ChatClient):
+    """ChatClient whose poll() also hands the events to an observer"""
+
+    def __init__(self, observer, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.observer = observer
+
+    def poll(self):
+        events = super().poll()
+        self.observer(events)
+        return events
+
+
+class HeadlessLoop:
+    """after() / mainloop() / quit() on the calling thread, without Tk"""
+
+    def __init__(self):
+        self._timers = []
+        self._order = 0
+        self._running = False
+
+    def after(self, ms, callback):
+        self._order += 1
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, self._order, callback))
+
+    def mainloop(self):
+        self._running = True
+        while self._running and self._timers:
+            due, _, callback = heapq.heappop(self._timers)
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            callback()
+
+    def quit(self):
+        self._running = False
+
+
+class LoadTest:
+    """Keeps `concurrency` messages in flight until `total` have completed"""
+
+    def __init__(self, total, concurrency, timeout):
+        self.total = total
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.loop = None
+        self.client = None
+        self.send = None            # send(text) -> request id
+
+        self.sent_at = {}
+        self.first_token = {}       # request id -> seconds after send
+        self.latency = {}           # request id -> seconds after send
+        self.errors = []
+        self.lateness = []          # heartbeat lateness in ms
+        self.started = None
+        self.finished = None
+
+    # ---- measurements ----
+
+    def observe(self, events):
+        """Called with every batch the main loop polls"""
+        now = time.perf_counter()
+        for event in events:
+            sent = self.sent_at.get(event.request_id)
+            if sent is None:
+                continue
+            if event.kind == TOKEN:
+                self.first_token.setdefault(event.request_id, now - sent)
+            elif event.kind == DONE:
+                self.latency[event.request_id] = now - sent
+            else:
+                self.errors.append(event.text)
+        if self.completed >= self.total:
+            self.finish()
+
+    @property
+    def completed(self):
+        return len(self.latency) + len(self.errors)
+
+    def heartbeat(self, due):
+        self.lateness.append(max(0.0, (time.perf_counter() - due) * 1000))
+        if self.finished is None:
+            self.after(HEARTBEAT_MS, self.heartbeat)
+
+    # ---- scheduling ----
+
+    def after(self, ms, callback):
+        """Schedule callback(due) on the main loop"""
+        due = time.perf_counter() + ms / 1000
+        self.loop.after(ms, lambda: callback(due))
+
+    def pump(self, due=None):
+        now = time.perf_counter()
+        if self.finished is not None:
+            return
+        if now - self.started > self.timeout:
+            self.errors.extend(["timed out"] * (self.total - self.completed))
+            self.finish()
+            return
+        while len(self.sent_at) < self.total and self.client.in_flight < self.concurrency:
+            request_id = self.send(f"load test message {len(self.sent_at) + 1}")
+            self.sent_at[request_id] = time.perf_counter()
+        self.after(PUMP_INTERVAL_MS, self.pump)
+
+    def run(self, loop, client, send):
+        self.loop = loop
+        self.client = client
+        self.send = send
+        self.started = time.perf_counter()
+        self.pump()
+        self.after(HEARTBEAT_MS, self.heartbeat)
+        loop.mainloop()
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+            self.loop.quit()
+
+    # ---- report ----
+
+    def results(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        latency = [v * 1000 for v in self.latency.values()]
+        ttft = [v * 1000 for v in self.first_token.values()]
+        results = {
+            "requests": self.total,
+            "completed": len(self.latency),
+            "errors": len(self.errors),
+            "concurrency": self.concurrency,
+            "elapsed_s": elapsed,
+            "requests_per_sec": len(self.latency) / elapsed if elapsed else 0.0,
+            "heartbeat_ms": HEARTBEAT_MS,
+            "max_stall_ms": max(self.lateness) if self.lateness else None,
+            "p99_lateness_ms": percentile(self.lateness, 99),
+            "stalls_over_threshold": sum(1 for v in self.lateness if v > STALL_THRESHOLD_MS),
+        }
+        for name, values in (("latency", latency), ("ttft", ttft)):
+            for pct in (50, 95, 99):
+                results[f"{name}_p{pct}_ms"] = percentile(values, pct)
+            results[f"{name}_max_ms"] = max(values) if values else None
+        return results
+
+
+def format_ms(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(results):
+    r = results
+    print(f"Requests: {r['completed']}/{r['requests']} ({r['errors']} error(s)) in "
+          f"{r['elapsed_s']:.2f} s, {r['requests_per_sec']:.1f} req/s, "
+          f"concurrency {r['concurrency']}, {r['mode']}, {'streamed' if r['stream'] else 'whole replies'}")
+    for name, label in (("latency", "Latency"), ("ttft", "First token")):
+        print(f"{label + ':':13s}p50 {format_ms(r[name + '_p50_ms'])} ms, "
+              f"p95 {format_ms(r[name + '_p95_ms'])} ms, p99 {format_ms(r[name + '_p99_ms'])} ms, "
+              f"max {format_ms(r[name + '_max_ms'])} ms")
+    print(f"Main loop:   longest stall {format_ms(r['max_stall_ms'])} ms, "
+          f"p99 heartbeat lateness {format_ms(r['p99_lateness_ms'])} ms, "
+          f"{r['stalls_over_threshold']} stall(s) > {STALL_THRESHOLD_MS} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Chat client load test")
+    parser.add_argument("--requests", type=int, default=200, help="messages to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="messages in flight at once")
+    parser.add_argument("--stream", action="store_true", help="request streamed replies")
+    parser.add_argument("--url", help="existing backend to test (default: start the stub)")
+    parser.add_argument("--delay", type=float, default=0.2,
+                        help="stub: seconds before each reply (or its first token)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="stub: random +/- seconds added to every delay")
+    parser.add_argument("--token-delay", type=float, default=0.01,
+                        help="stub: seconds between streamed tokens")
+    parser.add_argument("--stream-format", choices=["sse", "chunked"], default="sse")
+    parser.add_argument("--words", type=int, default=0,
+                        help="stub: filler words appended to every reply")
+    parser.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT)
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT)
+    parser.add_argument("--timeout", type=float, default=300.0,
+                        help="give up on the run after this many seconds")
+    parser.add_argument("--headless", action="store_true",
+                        help="don't open a Tk window even if a display is available")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        server = make_server(0, args.delay, token_delay=args.token_delay,
+                             stream_format=args.stream_format, extra_words=args.words,
+                             jitter=args.jitter)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/api/chat"
+
+    test = LoadTest(args.requests, args.concurrency, args.timeout)
+    client = ObservedClient(test.observe, url, args.connect_timeout, args.read_timeout,
+                            args.concurrency)
+
+    root = None
+    if not args.headless:
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            print("<No display: running the main loop without Tk>\n")
+
+    try:
+        if root is not None:
+            # Real window: messages go through the entry and send_message
+            app = ChatApp(root, client, args.stream)
+
+            def send(text):
+                app.entry.insert(0, text)
+                return app.send_message()
+
+            mode = "tk"
+            test.run(root, client, send)
+            root.destroy()
+        else:
+            loop = HeadlessLoop()
+
+            def poll(due=None):
+                client.poll()
+                if test.finished is None:
+                    loop.after(POLL_INTERVAL_MS, poll)
+
+            mode = "headless"
+            loop.after(POLL_INTERVAL_MS, poll)
+            test.run(loop, client, lambda text: client.send(text, stream=args.stream))
+    finally:
+        client.close()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    results = test.results()
+    results.update({"mode": mode, "stream": args.stream, "url": url})
+    print_report(results)
+    if test.errors:
+        print(f"First error: {test.errors[0]}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if test.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,35 +1,126 @@
+import argparse
 import tkinter as tk
-import requests
 
-# Create the main window
-root = tk.Tk()
-root.title("Tavern AI Chat")
+from chat_client import (ChatClient, DEFAULT_API_URL, DEFAULT_CONNECT_TIMEOUT,
+                         DEFAULT_READ_TIMEOUT, DEFAULT_MAX_IN_FLIGHT, TOKEN, DONE)
 
-# Text display area
-text_display = tk.Text(root, height=20, width=50)
-text_display.pack()
+# How often the Tk loop picks up new tokens / replies (one insert per reply per tick)
+POLL_INTERVAL_MS = 30
 
-# Input field
-entry = tk.Entry(root, width=40)
-entry.pack()
 
-# Function to send input to AI and receive response
-def send_message():
-    user_input = entry.get()
-    entry.delete(0, tk.END)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tavern AI Chat")
+    # Example API endpoint (Modify with actual Tavern AI API endpoint)
+    parser.add_argument("--url", default=DEFAULT_API_URL, help="chat API URL")
+    parser.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help="seconds to wait for a connection")
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT,
+                        help="seconds to wait for a reply (or between streamed chunks)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="messages that may be waiting for a reply at once")
+    parser.add_argument("--stream", action="store_true",
+                        help="start with streamed (SSE / chunked) replies enabled")
+    return parser.parse_args(argv)
 
-    # Example API request (Modify with actual Tavern AI API endpoint)
-    api_url = "http://localhost:5000/api/chat"  # Change this to the correct API URL
-    payload = {"message": user_input}
-    response = requests.post(api_url, json=payload)
 
-    # Display the response in the GUI
-    ai_response = response.json().get("reply", "No response")
-    text_display.insert(tk.END, f"You: {user_input}\nAI: {ai_response}\n\n")
+class ChatApp:
+    """Chat window widgets and callbacks (also driven by load_test.py)"""
 
-# Send button
-send_button = tk.Button(root, text="Send", command=send_message)
-send_button.pack()
+    def __init__(self, root, client, stream=False):
+        self.root = root
+        self.client = client
+        root.title("Tavern AI Chat")
 
-# Run the GUI loop
-root.mainloop()
\ No newline at end of file
+        # Text display area
+        self.text_display = tk.Text(root, height=20, width=50)
+        self.text_display.pack()
+
+        # Input field
+        self.entry = tk.Entry(root, width=40)
+        self.entry.pack()
+
+        # Streamed replies appear token by token
+        self.stream_var = tk.BooleanVar(value=stream)
+        self.stream_check = tk.Checkbutton(root, text="Stream replies", variable=self.stream_var)
+        self.stream_check.pack()
+
+        # Requests still waiting for a reply
+        self.status_label = tk.Label(root, text="")
+        self.status_label.pack()
+
+        # Send button (Enter works too)
+        self.send_button = tk.Button(root, text="Send", command=self.send_message)
+        self.send_button.pack()
+        self.entry.bind("<Return>", self.send_message)
+
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        root.after(POLL_INTERVAL_MS, self.poll_replies)
+
+    # Function to send input to AI; its reply is filled in at a per-request
+    # mark as tokens arrive, so concurrent replies don't interleave
+    def send_message(self, event=None):
+        user_input = self.entry.get()
+        self.entry.delete(0, tk.END)
+        if not user_input.strip():
+            return None
+        request_id = self.client.send(user_input, stream=self.stream_var.get())
+        self.text_display.insert(tk.END, f"You: {user_input}\nAI: \n\n")
+        mark = f"reply{request_id}"
+        self.text_display.mark_set(mark, "end-3c")
+        self.text_display.mark_gravity(mark, tk.RIGHT)
+        self.text_display.see(tk.END)
+        self.status_label.config(text=f"Waiting for {self.client.in_flight} reply(s)...")
+        return request_id
+
+    # Display new tokens; runs on the Tk loop every POLL_INTERVAL_MS
+    def poll_replies(self):
+        events = self.client.poll()
+        if events:
+            self.show_events(events)
+        self.root.after(POLL_INTERVAL_MS, self.poll_replies)
+
+    def show_events(self, events):
+        text_display = self.text_display
+        # Batch: one insert per reply per tick, however many tokens arrived
+        pending = {}
+        for event in events:
+            if event.kind == TOKEN:
+                pending.setdefault(event.request_id, []).append(event.text)
+            else:
+                pending.setdefault(event.request_id, [])
+        finished = [event for event in events if event.kind != TOKEN]
+
+        for request_id, tokens in pending.items():
+            if tokens:
+                text_display.insert(f"reply{request_id}", "".join(tokens))
+        for event in finished:
+            mark = f"reply{event.request_id}"
+            if event.kind == DONE:
+                ttft = f", first token {event.ttft * 1000:.0f} ms" if event.ttft else ""
+                self.status_label.config(text=f"Last reply: {event.elapsed:.2f} s{ttft}")
+            else:
+                text_display.insert(mark, f"<Error: {event.text}>")
+            text_display.mark_unset(mark)
+        if self.client.in_flight:
+            self.status_label.config(text=f"Waiting for {self.client.in_flight} reply(s)...")
+        text_display.see(tk.END)
+
+    def on_close(self):
+        self.client.close()
+        self.root.destroy()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    client = ChatClient(args.url, args.connect_timeout, args.read_timeout, args.max_in_flight)
+
+    # Create the main window
+    root = tk.Tk()
+    ChatApp(root, client, args.stream)
+
+    # Run the GUI loop
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+ Stub Chat Server
+ =================
+ - Local stand-in for the chat API, for testing the GUI without a model.
+
+ - POST /api/chat with {"message": ...} returns {"reply": "Echo: ..."}
+   after an optional delay. With {"stream": true} the reply is sent
+   word by word as server-sent events (or plain chunks) instead.
+
+ - Latency, jitter (uniform +/-) and streaming speed are configurable,
+   to see how the client copes with a slow or uneven backend.
+
+ - HTTP/1.1 keep-alive (streams use chunked encoding) and one thread per
+   connection, so several requests can be in flight.
+
+ - Usage:
+        python stub_server.py [--port 5000] [--delay 0.5] [--jitter 0.2]
+                              [--stream-format sse|chunked] [--token-delay 0.05]
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, the body waits
+    # for the client's delayed ACK (~40 ms) on every keep-alive request
+    disable_nagle_algorithm = True
+    delay = 0.0             # seconds before the reply (or first token)
+    jitter = 0.0            # +/- seconds added to delay and token_delay
+    token_delay = 0.0       # seconds between streamed tokens
+    stream_format = "sse"   # "sse" or "chunked"
+    extra_words = 0         # filler words appended to make long replies
+
+    def pause(self, seconds):
+        """Sleep for seconds +/- jitter (never negative)"""
+        if self.jitter:
+            seconds += random.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def reply_words(self, message):
+        words = f"Echo: {message}".split()
+        words.extend(f"word{i}" for i in range(self.extra_words))
+        return words
+
+    def do_POST(self):
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+        except ValueError:
+            self.send_error(400, "Invalid JSON")
+            return
+        words = self.reply_words(request.get("message", ""))
+
+        self.pause(self.delay)
+        if request.get("stream"):
+            self.stream_reply(words)
+            return
+        body = json.dumps({"reply": " ".join(words)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def stream_reply(self, words):
+        sse = self.stream_format == "sse"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if sse else "text/plain; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, word in enumerate(words):
+            if index:
+                self.pause(self.token_delay)
+            token = word if index == len(words) - 1 else word + " "
+            if sse:
+                self.write_chunk(f"data: {json.dumps({'token': token})}\n\n".encode())
+            else:
+                self.write_chunk(token.encode())
+        if sse:
+            self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # Client closed an idle keep-alive connection
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet
+
+
+def make_server(port=5000, delay=0.0, host="127.0.0.1", token_delay=0.0,
+                stream_format="sse", extra_words=0, jitter=0.0):
+    handler = type("StubHandler", (ChatHandler,), {
+        "delay": delay,
+        "jitter": jitter,
+        "token_delay": token_delay,
+        "stream_format": stream_format,
+        "extra_words": extra_words,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub chat API server")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="seconds before each reply (or its first token)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="random +/- seconds added to every delay")
+    parser.add_argument("--token-delay", type=float, default=0.05,
+                        help="seconds between streamed tokens")
+    parser.add_argument("--stream-format", choices=["sse", "chunked"], default="sse")
+    parser.add_argument("--words", type=int, default=0,
+                        help="filler words appended to every reply")
+    args = parser.parse_args()
+    server = make_server(args.port, args.delay, token_delay=args.token_delay,
+                         stream_format=args.stream_format, extra_words=args.words,
+                         jitter=args.jitter)
+    print(f"Stub chat API on http://127.0.0.1:{args.port}/api/chat")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
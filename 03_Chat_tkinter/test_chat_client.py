@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Chat Client Tests
+ ==================
+ - Server-sent event parsing (sse_tokens).
+ 
+ - Usage:
+        python -m unittest test_chat_client
+"""
+
+import unittest
+
+from chat_client import sse_tokens
+
+
+def events(*payloads):
+    """SSE lines for payloads, one event each, ending with [DONE]"""
+    lines = []
+    for payload in payloads + ("[DONE]",):
+        lines += [f"data: {payload}", ""]
+    return lines
+
+
+class SseTokensTest(unittest.TestCase):
+    
+    def test_plain_and_json_tokens(self):
+        tokens = list(sse_tokens(events("Hello", '{"token": " world"}')))
+        self.assertEqual(tokens, ["Hello", " world"])
+    
+    def test_only_one_leading_space_is_stripped(self):
+        tokens = list(sse_tokens(events(" world", "  two", " ")))
+        self.assertEqual(tokens, [" world", "  two", " "])
+    
+    def test_field_without_space(self):
+        self.assertEqual(list(sse_tokens(["data:abc", "", "data:[DONE]", ""])), ["abc"])
+    
+    def test_multiline_data_and_comments(self):
+        lines = [": keep-alive", "data: line 1", "data: line 2", "", "data: [DONE]", "",
+                 "data: after done", ""]
+        self.assertEqual(list(sse_tokens(lines)), ["line 1\nline 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Async Serial Module
+ ====================
+ - asyncio engine for an open serial port: coroutines can `await` a
+   response instead of blocking a worker thread.
+ 
+ - The port's file descriptor is switched to non-blocking mode and
+   watched with loop.add_reader; writes that would block wait for
+   loop.add_writer. No thread is involved, so many transactions (on many
+   ports) can be in flight on one event loop.
+ 
+ - Responses end on the same ResponseRule as the threaded engine
+   (length, terminator, idle gap or timeout). Bytes that arrive while no
+   transaction is collecting go to on_data (unsolicited data).
+ 
+ - Needs a selectable descriptor (POSIX serial ports and ptys).
+ 
+ - Classes:
+        * AsyncSerial: Non-blocking, event-loop driven serial port
+"""
+
+import os
+import time
+import asyncio
+
+
+# Largest single read from the port
+READ_CHUNK = 65536
+
+
+class AsyncSerial:
+    """Event-loop driven I/O on an open pyserial port
+    
+    Call start() once the loop exists; transact() serializes requests on
+    this port with a lock, so concurrent callers queue up in order.
+    """
+    
+    def __init__(self, serial_port, loop, on_data=None):
+        self.serial_port = serial_port
+        self.loop = loop
+        self.on_data = on_data or (lambda data: None)
+        self.error = None
+        self._fd = serial_port.fileno()
+        self._rx = bytearray()
+        self._collecting = False
+        self._waiter = None
+        self._timing = None
+        self._lock = asyncio.Lock()
+    
+    def start(self):
+        """Switch the descriptor to non-blocking and start watching it"""
+        os.set_blocking(self._fd, False)
+        self.loop.add_reader(self._fd, self._on_readable)
+    
+    def close(self):
+        """Stop watching the port (the port itself stays open)"""
+        self.loop.remove_reader(self._fd)
+        self.loop.remove_writer(self._fd)
+        try:
+            os.set_blocking(self._fd, True)
+        except OSError:
+            pass  # Already closed
+        self._wake(ConnectionError("port closed"))
+    
+    def _wake(self, error=None):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
+    
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, READ_CHUNK)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            data = b""
+            self.error = e
+        if not data:
+            # Device gone: stop watching and fail whoever is waiting
+            self.error = self.error or ConnectionError("device closed")
+            self.loop.remove_reader(self._fd)
+            self._wake(self.error)
+            return
+        if self._collecting:
+            if self._timing is not None:
+                now = time.perf_counter()
+                self._timing.setdefault("first_byte", now)
+                self._timing["last_byte"] = now
+            self._rx.extend(data)
+            self._wake()
+        else:
+            self.on_data(data)
+    
+    async def write(self, data):
+        """Write all bytes, yielding to the loop whenever the port is full"""
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(self._fd, view)
+            except BlockingIOError:
+                written = 0
+            view = view[written:]
+            if view:
+                await self._wait_writable()
+    
+    async def _wait_writable(self):
+        future = self.loop.create_future()
+        self.loop.add_writer(self._fd, lambda: future.done() or future.set_result(None))
+        try:
+            await future
+        finally:
+            self.loop.remove_writer(self._fd)
+    
+    async def _wait_data(self, timeout):
+        """Wait until more bytes arrive; returns False on timeout"""
+        self._waiter = self.loop.create_future()
+        try:
+            await asyncio.wait_for(self._waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiter = None
+    
+    async def _collect(self, rule):
+        """Collect one response per rule; returns (data, timed_out)"""
+        loop = self.loop
+        rx = self._rx
+        deadline = loop.time() + rule.timeout
+        scan_from = 0
+        
+        while True:
+            if self.error is not None:
+                raise self.error
+            if rx and rule.is_complete(rx, scan_from):
+                break
+            scan_from = len(rx)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return bytes(rx), True
+            
+            # After the first byte, wait only for the idle gap
+            gap_wait = bool(rx) and rule.gap is not None
+            wait = min(rule.gap, remaining) if gap_wait else remaining
+            if not await self._wait_data(wait) and gap_wait and wait == rule.gap:
+                break
+        
+        # A length rule may have read into the next message: pass it on
+        if rule.expected_length and len(rx) > rule.expected_length:
+            extra = bytes(rx[rule.expected_length:])
+            del rx[rule.expected_length:]
+            self.on_data(extra)
+        return bytes(rx), False
+    
+    async def transact(self, data, rule, timing=None):
+        """Send bytes and await the response; returns (data, timed_out)
+        
+        If timing is a dict, perf_counter() times are stored under
+        "write_done", "first_byte" and "last_byte".
+        """
+        async with self._lock:
+            self._rx.clear()
+            self._collecting = True
+            self._timing = timing
+            try:
+                await self.write(data)
+                if timing is not None:
+                    timing["write_done"] = time.perf_counter()
+                return await self._collect(rule)
+            finally:
+                self._collecting = False
+                self._timing = None
+                self._rx = bytearray()
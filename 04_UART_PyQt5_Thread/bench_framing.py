@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Framing Benchmark
+ ==================
+ - Measures how fast each framer in framing.py consumes an RX stream.
+
+ - The stream is fed in chunks the size a serial read typically returns
+   and compared against the fastest rate in the baudrate list
+   (921600 baud, 8N1 = 92160 bytes/s).
+
+ - Usage:
+        python bench_framing.py [--size MB] [--frame BYTES]
+"""
+
+import argparse
+import os
+import time
+
+from framing import create_framer
+
+
+FASTEST_BAUDRATE = 921600
+WIRE_BYTES_PER_SEC = FASTEST_BAUDRATE / 10  # 8N1: 10 bits per byte
+CHUNK_SIZES = [32, 512, 4096]
+CASES = [("Delimiter", "0A"), ("Length prefix", "2"), ("SLIP", ""), ("COBS", "")]
+
+
+def build_stream(name, param, total_size, frame_size):
+    """Encode random payloads until the stream is about total_size bytes"""
+    encoder = create_framer(name, param)
+    frames = []
+    size = 0
+    while size < total_size:
+        payload = os.urandom(frame_size)
+        if name == "Delimiter":
+            payload = payload.replace(b"\n", b"")
+        frame = encoder.encode(payload)
+        frames.append(frame)
+        size += len(frame)
+    return b"".join(frames), len(frames)
+
+
+def run(name, param, stream, chunk_size):
+    """Feed the stream in fixed-size chunks; return (seconds, frames)"""
+    framer = create_framer(name, param)
+    view = memoryview(stream)
+    frames = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk_size):
+        frames += len(framer.feed(view[offset:offset + chunk_size]))
+    return time.perf_counter() - start, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental framers")
+    parser.add_argument("--size", type=float, default=8, help="stream size in MB")
+    parser.add_argument("--frame", type=int, default=64, help="payload bytes per frame")
+    args = parser.parse_args()
+    
+    print(f"Wire rate at {FASTEST_BAUDRATE} baud: {WIRE_BYTES_PER_SEC / 1e3:.1f} KB/s")
+    print(f"{'framer':<15}{'chunk':>7}{'MB/s':>10}{'frames/s':>12}{'x wire':>9}")
+    for name, param in CASES:
+        stream, expected = build_stream(name, param, int(args.size * 1e6), args.frame)
+        for chunk_size in CHUNK_SIZES:
+            seconds, frames = run(name, param, stream, chunk_size)
+            assert frames == expected, (name, frames, expected)
+            rate = len(stream) / seconds
+            print(f"{name:<15}{chunk_size:>7}{rate / 1e6:>10.1f}{frames / seconds:>12.0f}"
+                  f"{rate / WIRE_BYTES_PER_SEC:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Hex Format Benchmark
+ =====================
+ - Compares hex_format.py against the per-byte formatting the terminals
+   used before (slicing list comprehension for TX, generator for ASCII).
+
+ - Buffers from 1 KB to 10 MB of random bytes.
+
+ - Usage:
+        python bench_hex_format.py [--repeat N]
+"""
+
+import argparse
+import os
+import timeit
+
+from hex_format import to_hex, to_ascii, hex_dump
+
+
+SIZES = [1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20]
+
+
+# Reference implementations (previous terminal code)
+def legacy_tx_hex(data):
+    hex_input = data.hex()
+    return ' '.join([hex_input[i:i+2] for i in range(0, len(hex_input), 2)]).upper()
+
+
+def legacy_ascii(data):
+    return ''.join(chr(b) if 32 <= b < 127 else '.' for b in data)
+
+
+def legacy_hex_dump(data, width=16):
+    lines = []
+    for offset in range(0, len(data), width):
+        chunk = data[offset:offset + width]
+        hex_part = ' '.join(f"{b:02X}" for b in chunk)
+        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
+        lines.append(f"{offset:08X}  {hex_part:<{3 * width - 1}}  {ascii_part}")
+    return lines
+
+
+CASES = [
+    ("hex", legacy_tx_hex, to_hex),
+    ("ascii", legacy_ascii, to_ascii),
+    ("hex_dump", legacy_hex_dump, hex_dump),
+]
+
+
+def best_time(func, data, repeat):
+    """Best wall time of `repeat` single calls"""
+    return min(timeit.repeat(lambda: func(data), number=1, repeat=repeat))
+
+
+def format_size(size):
+    return f"{size >> 20} MB" if size >= 1 << 20 else f"{size >> 10} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hex/ASCII formatting")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is kept)")
+    args = parser.parse_args()
+    
+    print(f"{'case':<10}{'size':>8}{'legacy ms':>12}{'table ms':>12}{'speedup':>10}{'MB/s':>10}")
+    for size in SIZES:
+        data = os.urandom(size)
+        # Fewer runs for the slow reference code on big buffers
+        repeat = args.repeat if size <= 1 << 20 else max(1, args.repeat // 2)
+        for name, legacy, fast in CASES:
+            assert legacy(data) == fast(data), name
+            legacy_s = best_time(legacy, data, repeat)
+            fast_s = best_time(fast, data, repeat)
+            print(f"{name:<10}{format_size(size):>8}{legacy_s * 1e3:>12.2f}{fast_s * 1e3:>12.2f}"
+                  f"{legacy_s / fast_s:>9.1f}x{size / fast_s / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Performance Benchmark Suite
+ ============================
+ - Hardware-free benchmarks of the terminal's serial and display paths.
+ 
+ - Stand-in devices:
+        * loop:    pyserial's loop:// URL (bytes written are read back)
+        * pty:     a Linux pseudo-terminal pair with an in-process echo thread
+        * tcp:     a local TCP echo server, reached through tcp://
+        * rfc2217: a local RFC 2217 server in front of a loop:// port
+   
+   None throttles to the baud rate, so the numbers measure the software
+   overhead on top of the wire, which is what regresses. Every device is
+   opened through transports.py, like a port typed into the selector.
+ 
+ - Benchmarks:
+        1. connect:    UARTCore.connect / disconnect cost (pty)
+        2. rtt:        Round-trip latency of one transaction, per baud rate
+        3. throughput: Sustained echo throughput through the reader thread
+        4. append:     Terminal output lines/s, OutputBatcher -> log widget
+                       (offscreen Qt, fixed line cap)
+        5. telemetry:  Record decoding and min/max plot decimation (NumPy)
+        6. stream:     Frames/s from a full-rate virtual device (pty) through
+                       the reader thread, ring buffer and RX framer
+ 
+ - Results are a flat JSON map ("rtt.pty.115200.p50_us": 81.2, ...).
+   Metrics ending in _ms/_us are lower-is-better, the rest higher.
+ 
+ - Usage:
+        python bench_suite.py [--quick] [--only rtt,append] [--json out.json]
+        python bench_suite.py --compare before.json [--tolerance 10]
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+
+import serial
+
+from response_reader import ResponseRule
+from ring_buffer import RingBuffer
+from sequence_runner import percentile
+from serial_reader import SerialReader
+from uart_core import UARTCore, BAUD_RATES
+from virtual_device import VirtualDevice, parse_rules, PTY_AVAILABLE
+
+
+BENCHMARKS = ["connect", "rtt", "throughput", "append", "telemetry", "stream"]
+RTT_PAYLOAD = bytes(range(16))
+THROUGHPUT_CHUNK = 4096
+APPEND_BATCH_LINES = 100
+# The terminal's default log line cap, fixed so saved settings don't matter
+APPEND_LOG_LINES = 10000
+TELEMETRY_CHUNK_RECORDS = 1000
+TELEMETRY_PLOT_WIDTH = 1000
+# Full-rate stream of 16-byte SLIP frames, drained like the GUI's RX timer
+STREAM_RULES = "stream continuous | frame C0 00 01 02 03 04 05 06 07 08 09 0A 0B 0C 0D 0E 0F C0"
+STREAM_POLL_INTERVAL = 0.01
+
+
+class PtyEcho:
+    """Pseudo-terminal pair whose far end echoes everything back"""
+    
+    def __init__(self):
+        import pty
+        import tty
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.name = os.ttyname(self.slave)
+        self._thread = threading.Thread(target=self._echo, daemon=True)
+        self._thread.start()
+    
+    def _echo(self):
+        while True:
+            try:
+                data = os.read(self.master, 65536)
+                while data:
+                    data = data[os.write(self.master, data):]
+            except OSError:
+                return
+    
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class TCPEcho:
+    """Local TCP server echoing every connection (a serial-to-Ethernet stand-in)"""
+    
+    def __init__(self):
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.name = f"tcp://127.0.0.1:{self.server.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+    
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve, args=(connection,), daemon=True).start()
+    
+    def serve(self, connection):
+        with connection:
+            while True:
+                try:
+                    data = connection.recv(65536)
+                    if not data:
+                        return
+                    connection.sendall(data)
+                except OSError:
+                    return
+    
+    def close(self):
+        self.server.close()
+
+
+class SocketWriter:
+    """The write() that rfc2217.PortManager expects of its connection"""
+    
+    def __init__(self, connection):
+        self.write = connection.sendall
+
+
+class RFC2217Echo(TCPEcho):
+    """Local RFC 2217 server whose port is a loop:// device"""
+    
+    def __init__(self):
+        super().__init__()
+        self.name = self.name.replace("tcp://", "rfc2217://")
+    
+    def serve(self, connection):
+        import serial.rfc2217
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        port = serial.serial_for_url("loop://", timeout=0.05)
+        manager = serial.rfc2217.PortManager(port, SocketWriter(connection))
+        
+        def device_to_network():
+            while port.is_open:
+                try:
+                    data = port.read(max(1, port.in_waiting))
+                    if data:
+                        connection.sendall(b"".join(manager.escape(data)))
+                except (OSError, serial.SerialException):
+                    return
+        
+        threading.Thread(target=device_to_network, daemon=True).start()
+        with connection:
+            while True:
+                try:
+                    data = connection.recv(65536)
+                except OSError:
+                    break
+                if not data:
+                    break
+                port.write(b"".join(manager.filter(data)))
+        port.close()
+
+
+def open_device(core, device, baudrate, stand_ins):
+    """Connect the core to a stand-in device by its port name or URL"""
+    name = "loop://" if device == "loop" else stand_ins[device].name
+    return core.connect(name, baudrate)
+
+
+def summarize(samples, unit_scale, suffix):
+    """p50 / p99 / mean of a list of seconds, scaled (1e3: ms, 1e6: us)"""
+    samples = sorted(samples)
+    return {
+        f"p50_{suffix}": percentile(samples, 50) * unit_scale,
+        f"p99_{suffix}": percentile(samples, 99) * unit_scale,
+        f"mean_{suffix}": sum(samples) / len(samples) * unit_scale,
+    }
+
+
+def bench_connect(results, stand_ins, iterations):
+    core = UARTCore()
+    for device, stand_in in stand_ins.items():
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            core.connect(stand_in.name, "115200")
+            core.disconnect()
+            samples.append(time.perf_counter() - start)
+        for key, value in summarize(samples, 1e3, "ms").items():
+            results[f"connect.{device}.{key}"] = value
+
+
+def bench_rtt(results, stand_ins, iterations, devices):
+    rule = ResponseRule(expected_length=len(RTT_PAYLOAD), timeout=1.0)
+    for device in devices:
+        for baudrate in BAUD_RATES:
+            core = UARTCore()
+            if not open_device(core, device, baudrate, stand_ins):
+                continue
+            samples = []
+            lost = 0
+            for _ in range(iterations):
+                start = time.perf_counter()
+                data, timed_out = core.transact(RTT_PAYLOAD, rule)
+                samples.append(time.perf_counter() - start)
+                lost += timed_out or data != RTT_PAYLOAD
+            core.close()
+            prefix = f"rtt.{device}.{baudrate}"
+            for key, value in summarize(samples, 1e6, "us").items():
+                results[f"{prefix}.{key}"] = value
+            results[f"{prefix}.transactions_per_s"] = iterations / sum(samples)
+            if lost:
+                print(f"warning: {prefix}: {lost} bad responses", file=sys.stderr)
+
+
+def bench_throughput(results, stand_ins, total_bytes, devices):
+    block = os.urandom(THROUGHPUT_CHUNK)
+    for device in devices:
+        for baudrate in BAUD_RATES:
+            core = UARTCore()
+            if not open_device(core, device, baudrate, stand_ins):
+                continue
+            ring = RingBuffer(total_bytes + THROUGHPUT_CHUNK)
+            reader = SerialReader(core.serial_port, ring, poll_timeout=0.01)
+            reader.start()
+            start = time.perf_counter()
+            sent = 0
+            while sent < total_bytes:
+                core.serial_port.write(block)
+                sent += len(block)
+            deadline = time.monotonic() + 10
+            while ring.total_written < sent and time.monotonic() < deadline:
+                time.sleep(0.0005)
+            elapsed = time.perf_counter() - start
+            reader.stop()
+            core.close()
+            prefix = f"throughput.{device}.{baudrate}"
+            results[f"{prefix}.bytes_per_s"] = ring.total_written / elapsed
+            wire = int(baudrate) / 10  # 8N1
+            results[f"{prefix}.x_wire"] = ring.total_written / elapsed / wire
+
+
+def bench_append(results, batches):
+    """Lines/s from OutputBatcher.post to the log widget (skipped without PyQt5)
+    
+    The widget is set up like the terminal's log, without the main window,
+    so neither ~/uart_config.json nor its background threads affect it.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtWidgets import QApplication, QTextEdit
+        from output_batcher import OutputBatcher
+    except ImportError as e:
+        print(f"skipping append benchmark: {e}", file=sys.stderr)
+        return
+    app = QApplication.instance() or QApplication([])
+    log = QTextEdit()
+    log.setReadOnly(True)
+    log.setStyleSheet("font-family: monospace;")
+    log.document().setMaximumBlockCount(APPEND_LOG_LINES)
+    batcher = OutputBatcher()
+    batcher.stop()  # Flushed by hand below, once per display frame's worth
+    batcher.flushed.connect(log.append)
+    line = "RX: " + " ".join(["A5"] * 16)
+    start = time.perf_counter()
+    for _ in range(batches):
+        for _ in range(APPEND_BATCH_LINES):
+            batcher.post(line)
+        batcher.flush()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    log.close()
+    results["append.terminal_log.lines_per_s"] = batches * APPEND_BATCH_LINES / elapsed
+    results["append.terminal_log.batch_ms"] = elapsed / batches * 1e3
+
+
+def bench_telemetry(results, samples):
+    """Decode rate and envelope time for `samples` records (skipped without NumPy)"""
+    try:
+        import numpy as np
+        from telemetry import TelemetryDecoder
+    except ImportError as e:
+        print(f"skipping telemetry benchmark: {e}", file=sys.stderr)
+        return
+    decoder = TelemetryDecoder("i16le, i16le, f32le", history=samples)
+    values = np.arange(TELEMETRY_CHUNK_RECORDS * 4, dtype="<i2") % 2000
+    chunk = values.tobytes()
+    chunks = samples // TELEMETRY_CHUNK_RECORDS
+    start = time.perf_counter()
+    for _ in range(chunks):
+        decoder.feed([chunk], stream=True)
+    elapsed = time.perf_counter() - start
+    results["telemetry.decode.samples_per_s"] = chunks * TELEMETRY_CHUNK_RECORDS / elapsed
+    
+    frames = 10
+    start = time.perf_counter()
+    for _ in range(frames):
+        decoder.envelope(TELEMETRY_PLOT_WIDTH)
+    results["telemetry.envelope.frame_ms"] = (time.perf_counter() - start) / frames * 1e3
+
+
+def bench_stream(results, seconds):
+    """Frames/s a continuous virtual device pushes through reader, ring and framer"""
+    if not PTY_AVAILABLE:
+        print("skipping stream benchmark: no pseudo-terminals", file=sys.stderr)
+        return
+    device = VirtualDevice(parse_rules(STREAM_RULES))
+    device.start()
+    core = UARTCore()
+    core.set_framing("SLIP")
+    try:
+        if not core.connect(device.port, "921600"):
+            return
+        core.start_reader()
+        frames = 0
+        received = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            time.sleep(STREAM_POLL_INTERVAL)
+            data = core.rx_buffer.read()
+            received += len(data)
+            frames += len(core.framer.feed(data))
+        elapsed = time.perf_counter() - start
+        if core.rx_buffer.dropped:
+            print(f"warning: stream: ring buffer dropped {core.rx_buffer.dropped} bytes",
+                  file=sys.stderr)
+    finally:
+        core.close()
+        device.stop()
+    results["stream.slip.frames_per_s"] = frames / elapsed
+    results["stream.slip.bytes_per_s"] = received / elapsed
+
+
+def lower_is_better(key):
+    return key.endswith("_ms") or key.endswith("_us")
+
+
+def compare(old, new, tolerance):
+    """Print old vs new per metric; returns the number of regressions"""
+    regressions = 0
+    print(f"{'metric':<44}{'before':>12}{'after':>12}{'change':>9}")
+    for key in sorted(set(old) & set(new)):
+        before, after = old[key], new[key]
+        if not before:
+            continue
+        change = (after - before) / before * 100
+        worse = change > tolerance if lower_is_better(key) else change < -tolerance
+        regressions += worse
+        flag = "  REGRESSION" if worse else ""
+        print(f"{key:<44}{before:>12.2f}{after:>12.2f}{change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hardware-free UART terminal benchmarks")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--json", metavar="FILE", help="write results to FILE")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare against an earlier results file")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                        help="allowed change in percent before flagging (default 10)")
+    args = parser.parse_args()
+    
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    scale = 1 if args.quick else 5
+    stand_ins = {}
+    if os.name == "posix":
+        stand_ins["pty"] = PtyEcho()
+    stand_ins["tcp"] = TCPEcho()
+    stand_ins["rfc2217"] = RFC2217Echo()
+    devices = ["loop"] + list(stand_ins)
+    
+    results = {}
+    try:
+        if "connect" in selected:
+            bench_connect(results, stand_ins, 20 * scale)
+        if "rtt" in selected:
+            bench_rtt(results, stand_ins, 100 * scale, devices)
+        if "throughput" in selected:
+            bench_throughput(results, stand_ins, (1 << 20) * scale, devices)
+        if "append" in selected:
+            bench_append(results, 20 * scale)
+        if "telemetry" in selected:
+            bench_telemetry(results, 200000 * scale)
+        if "stream" in selected:
+            bench_stream(results, 1.0 * scale)
+    finally:
+        for stand_in in stand_ins.values():
+            stand_in.close()
+    
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pyserial": serial.__version__,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    
+    if args.compare:
+        with open(args.compare, "r") as f:
+            old = json.load(f)["results"]
+        regressions = compare(old, results, args.tolerance)
+        return 1 if regressions else 0
+    
+    for key in sorted(results):
+        print(f"{key:<44}{results[key]:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
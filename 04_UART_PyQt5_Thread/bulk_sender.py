@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Bulk Sender Module
+ ===================
+ - Streams a large payload (firmware image, test data) to the open port in
+   fixed-size chunks, with live progress and cancellation.
+ 
+ - Flow control is done by the serial driver: RTS/CTS (hardware) or
+   XON/XOFF (software) is switched on for the transfer and restored
+   afterwards. While the device holds transmission off, writes block
+   and the queue does not drain; a hold-off longer than STALL_TIMEOUT
+   aborts the transfer instead of hanging.
+ 
+ - Pacing: the next chunk is written once the driver's TX queue has
+   drained below one chunk, so the line stays busy without piling the
+   whole file into the OS buffer (progress stays accurate and a cancel
+   takes effect within about two chunks). An optional per-chunk delay
+   gives slow devices time to process, e.g. to program a flash page.
+ 
+ - Payload files are binary, or hex text ("01 02 ...", '#' comments)
+   for .txt files and for .hex files that are not Intel HEX. Intel HEX
+   is sent unchanged, as the ASCII records bootloaders expect.
+ 
+ - Classes:
+        * BulkReport: Outcome and rate of one transfer
+        * BulkSender: Chunked, flow-controlled transmit on a UARTCore
+ 
+ - Functions:
+        * load_payload: Read a binary or hex text file
+"""
+
+import os
+import time
+
+import serial
+
+from hex_format import parse_hex
+from response_reader import idle_gap
+
+
+FLOW_NONE = "None"
+FLOW_RTSCTS = "RTS/CTS"
+FLOW_XONXOFF = "XON/XOFF"
+FLOW_NAMES = [FLOW_NONE, FLOW_RTSCTS, FLOW_XONXOFF]
+
+PAYLOAD_FORMATS = ["auto", "binary", "hex"]
+
+DEFAULT_CHUNK_SIZE = 256
+
+# Seconds without TX progress before the device is considered stuck
+STALL_TIMEOUT = 5.0
+# Upper bound for one pacing sleep, so stop requests are noticed quickly
+MAX_PACE_SLEEP = 0.05
+# Minimum seconds between progress callbacks
+PROGRESS_INTERVAL = 0.1
+
+
+def load_payload(path, fmt="auto"):
+    """Read a payload file as bytes (raises OSError or ValueError)
+    
+    fmt is "binary", "hex" (hex text) or "auto" (decided by extension).
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if fmt == "auto":
+        extension = os.path.splitext(path)[1].lower()
+        is_text_hex = extension in (".txt", ".hex") and not raw.lstrip().startswith(b":")
+        fmt = "hex" if is_text_hex else "binary"
+    if fmt == "binary":
+        return raw
+    
+    text = raw.decode("ascii", errors="replace")
+    lines = (line.split("#", 1)[0] for line in text.splitlines())
+    try:
+        return parse_hex(" ".join(lines))
+    except ValueError:
+        raise ValueError(f"{os.path.basename(path)} is not valid hex text") from None
+
+
+class BulkReport:
+    """Result of one bulk transfer"""
+    
+    def __init__(self, total):
+        self.total = total
+        self.sent = 0
+        self.elapsed = 0.0
+        self.cancelled = False
+        self.error = None
+        self.line_rate = None       # Bytes/s the baud rate allows (8N1)
+    
+    @property
+    def bytes_per_sec(self):
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def describe(self):
+        text = (f"Sent {self.sent} of {self.total} bytes in {self.elapsed:.2f} s "
+                f"({self.bytes_per_sec / 1024:.1f} KB/s")
+        if self.line_rate:
+            text += f", {100.0 * self.bytes_per_sec / self.line_rate:.0f}% of line rate"
+        text += ")"
+        if self.error:
+            text += f": {self.error}"
+        elif self.cancelled:
+            text += ": cancelled"
+        return text
+
+
+class BulkSender:
+    """Writes data to core's open port in chunks, paced by the TX queue
+    
+    on_progress(sent, total, elapsed) is called from the sending thread at
+    most every PROGRESS_INTERVAL. When the port is not being monitored,
+    bytes received meanwhile are drained and passed to on_rx(data), so a
+    device that answers cannot block the transfer.
+    """
+    
+    def __init__(self, core, data, chunk_size=DEFAULT_CHUNK_SIZE, flow=FLOW_NONE,
+                 chunk_delay=0.0, stop_event=None, on_progress=None, on_rx=None):
+        if flow not in FLOW_NAMES:
+            raise ValueError(f"unknown flow control: {flow}")
+        self.core = core
+        self.data = memoryview(data)
+        self.chunk_size = max(1, int(chunk_size))
+        self.flow = flow
+        self.chunk_delay = chunk_delay
+        self.stop_event = stop_event
+        self.on_progress = on_progress or (lambda sent, total, elapsed: None)
+        self.on_rx = on_rx
+    
+    def stopped(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+    
+    def run(self):
+        """Send everything (or until stopped); returns a BulkReport"""
+        port = self.core.serial_port
+        report = BulkReport(len(self.data))
+        baudrate = getattr(port, "baudrate", None)
+        report.line_rate = baudrate / 10.0 if baudrate else None
+        saved = self.apply_flow_control(port)
+        
+        start = time.perf_counter()
+        last_progress = 0.0
+        try:
+            for offset in range(0, len(self.data), self.chunk_size):
+                if self.stopped():
+                    report.cancelled = True
+                    break
+                self.wait_for_room(port, self.chunk_size, report.line_rate)
+                chunk = bytes(self.data[offset:offset + self.chunk_size])
+                self.core.send(chunk)
+                report.sent += len(chunk)
+                self.drain_rx(port)
+                
+                now = time.perf_counter()
+                if now - last_progress >= PROGRESS_INTERVAL:
+                    last_progress = now
+                    self.on_progress(report.sent, report.total, now - start)
+                if self.chunk_delay and self.stop_event is not None:
+                    self.stop_event.wait(self.chunk_delay)
+                elif self.chunk_delay:
+                    time.sleep(self.chunk_delay)
+            
+            # Count the time until the last byte has left the driver, then
+            # give the device an idle gap to finish answering
+            if not report.cancelled:
+                self.wait_for_room(port, 0, report.line_rate)
+                report.elapsed = time.perf_counter() - start
+                self.drain_rx(port, idle_gap(baudrate) if baudrate else 0.0)
+        except (serial.SerialTimeoutException, TimeoutError):
+            report.error = f"device held off transmission for {STALL_TIMEOUT:.0f} s"
+        except (serial.SerialException, OSError) as e:
+            report.error = str(e)
+        finally:
+            if not report.elapsed:
+                report.elapsed = time.perf_counter() - start
+            self.restore_flow_control(port, saved)
+        self.on_progress(report.sent, report.total, report.elapsed)
+        return report
+    
+    def apply_flow_control(self, port):
+        """Switch on the selected flow control; returns what to restore"""
+        saved = {}
+        if self.flow == FLOW_NONE:
+            return saved
+        saved["rtscts"] = port.rtscts
+        saved["xonxoff"] = port.xonxoff
+        saved["write_timeout"] = port.write_timeout
+        # A write blocked by flow control must not hang the worker forever
+        port.write_timeout = STALL_TIMEOUT
+        port.rtscts = self.flow == FLOW_RTSCTS
+        port.xonxoff = self.flow == FLOW_XONXOFF
+        return saved
+    
+    def restore_flow_control(self, port, saved):
+        for name, value in saved.items():
+            try:
+                setattr(port, name, value)
+            except (serial.SerialException, OSError, ValueError):
+                pass  # Port already gone (e.g. unplugged mid-transfer)
+    
+    def wait_for_room(self, port, low_water, line_rate):
+        """Block until at most low_water bytes are queued for transmit"""
+        rate = line_rate or 11520.0
+        last_queued = None
+        last_change = time.perf_counter()
+        while not self.stopped():
+            try:
+                queued = port.out_waiting
+            except (AttributeError, NotImplementedError, serial.SerialException, OSError):
+                return  # Driver can't tell; its blocking write paces us instead
+            if queued <= low_water:
+                return
+            now = time.perf_counter()
+            if queued != last_queued:
+                last_queued = queued
+                last_change = now
+            elif now - last_change > STALL_TIMEOUT:
+                raise TimeoutError
+            time.sleep(min(MAX_PACE_SLEEP, (queued - low_water) / rate))
+    
+    def drain_rx(self, port, linger=0.0):
+        """Pass on received bytes when nobody else is reading the port
+        
+        With linger, keep reading until the port has been silent that long.
+        """
+        if self.on_rx is None or self.core.is_monitoring():
+            return
+        deadline = time.perf_counter() + linger
+        while True:
+            waiting = port.in_waiting
+            if waiting:
+                data = port.read(waiting)
+                if data:
+                    self.core.record_rx(data)
+                    self.on_rx(data)
+                deadline = time.perf_counter() + linger
+            elif time.perf_counter() >= deadline or self.stopped():
+                return
+            else:
+                time.sleep(min(MAX_PACE_SLEEP, linger / 4))
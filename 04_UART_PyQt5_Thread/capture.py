@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Capture Module
+ ===============
+ - Append-only binary capture of TX/RX traffic and indexed replay.
+
+ - File layout (little-endian):
+        header  : magic "UARTCAP1" (8) + start time float64 (8)
+        record  : timestamp float64 (8) + direction uint8 (1)
+                  + length uint32 (4) + payload (length)
+
+ - A sidecar "<file>.idx" holds (timestamp float64, offset uint64) pairs,
+   one about every INDEX_INTERVAL bytes of capture. It is written while
+   recording and lets a reader jump close to any time without scanning.
+ 
+ - Search index, also written while recording (see capture_search.py):
+        "<file>.rx", "<file>.tx": the payloads of each direction back to
+                back, so a pattern is one mmap.find away even when it
+                spans several records
+        "<file>.sidx": (direction uint8, stream offset uint64, record
+                offset uint64) at a record of that direction about every
+                SEARCH_INDEX_INTERVAL bytes of its stream (and at least
+                every INDEX_INTERVAL bytes of capture), so a hit maps back
+                to its record after a short walk
+
+ - Readers memory-map the capture, so opening and seeking a multi-GB file
+   costs no more than reading the records that are actually replayed.
+
+ - Classes:
+        * CaptureWriter: Background writer thread for a capture file
+        * CaptureReader: Memory-mapped reader with time seek
+"""
+
+import bisect
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+
+MAGIC = b"UARTCAP1"
+FILE_HEADER = struct.Struct("<8sd")
+RECORD_HEADER = struct.Struct("<dBI")
+INDEX_ENTRY = struct.Struct("<dQ")
+SEARCH_INDEX_ENTRY = struct.Struct("<BQQ")
+
+# Bytes of capture between two index entries
+INDEX_INTERVAL = 64 * 1024
+# Bytes of a direction's stream between two search index entries
+SEARCH_INDEX_INTERVAL = 4 * 1024
+
+# Record directions
+RX = 0
+TX = 1
+DIRECTION_NAMES = {RX: "RX", TX: "TX"}
+
+
+def index_path(path):
+    """Path of the sidecar index of a capture file"""
+    return path + ".idx"
+
+
+def stream_path(path, direction):
+    """Path of the sidecar holding one direction's payloads back to back"""
+    return f"{path}.{DIRECTION_NAMES[direction].lower()}"
+
+
+def search_index_path(path):
+    """Path of the sidecar mapping stream offsets to records"""
+    return path + ".sidx"
+
+
+class CaptureWriter(threading.Thread):
+    """Appends timestamped records to a capture file from a background thread
+    
+    write() only timestamps and queues the data, so it is cheap enough to
+    call from the serial reader thread.
+    """
+
+    def __init__(self, path, flush_interval=0.5):
+        super().__init__(daemon=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records = 0
+        self.bytes_written = 0
+        self.error = None
+        self._queue = queue.Queue()
+        
+        # Open files up front so errors surface in the caller's thread
+        self._file = open(path, "wb")
+        self._index = open(index_path(path), "wb")
+        self._streams = {direction: open(stream_path(path, direction), "wb")
+                         for direction in DIRECTION_NAMES}
+        self._search_index = open(search_index_path(path), "wb")
+        self._file.write(FILE_HEADER.pack(MAGIC, time.time()))
+        self._offset = FILE_HEADER.size
+        self._next_index = self._offset
+        self._stream_offsets = dict.fromkeys(DIRECTION_NAMES, 0)
+        self._next_search_index = dict.fromkeys(DIRECTION_NAMES, 0)
+        self._next_search_record = dict.fromkeys(DIRECTION_NAMES, 0)
+        self.start()
+    
+    def write(self, direction, data, timestamp=None):
+        """Queue one record (safe to call from any thread)"""
+        if data:
+            self._queue.put((time.time() if timestamp is None else timestamp,
+                             direction, bytes(data)))
+    
+    def _files(self):
+        return [self._file, self._index, self._search_index] + list(self._streams.values())
+    
+    def run(self):
+        pack = RECORD_HEADER.pack
+        pack_search = SEARCH_INDEX_ENTRY.pack
+        last_flush = time.monotonic()
+        closing = False
+        try:
+            while not closing:
+                try:
+                    items = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    items = []
+                # Write everything queued in one go
+                while True:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                chunks = []
+                stream_chunks = {direction: [] for direction in self._streams}
+                search_entries = []
+                for item in items:
+                    if item is None:
+                        closing = True
+                        break
+                    timestamp, direction, data = item
+                    if self._offset >= self._next_index:
+                        self._index.write(INDEX_ENTRY.pack(timestamp, self._offset))
+                        self._next_index = self._offset + INDEX_INTERVAL
+                    stream_offset = self._stream_offsets[direction]
+                    if (stream_offset >= self._next_search_index[direction]
+                            or self._offset >= self._next_search_record[direction]):
+                        search_entries.append(pack_search(direction, stream_offset, self._offset))
+                        self._next_search_index[direction] = stream_offset + SEARCH_INDEX_INTERVAL
+                        self._next_search_record[direction] = self._offset + INDEX_INTERVAL
+                    chunks.append(pack(timestamp, direction, len(data)))
+                    chunks.append(data)
+                    stream_chunks[direction].append(data)
+                    self._stream_offsets[direction] += len(data)
+                    self._offset += RECORD_HEADER.size + len(data)
+                    self.records += 1
+                    self.bytes_written += len(data)
+                if chunks:
+                    self._file.write(b"".join(chunks))
+                    for direction, parts in stream_chunks.items():
+                        if parts:
+                            self._streams[direction].write(b"".join(parts))
+                    self._search_index.write(b"".join(search_entries))
+                
+                now = time.monotonic()
+                if now - last_flush >= self.flush_interval:
+                    for f in self._files():
+                        f.flush()
+                    last_flush = now
+        except Exception as e:
+            self.error = e
+        finally:
+            for f in self._files():
+                f.close()
+    
+    def close(self, timeout=5.0):
+        """Write everything still queued and close the files"""
+        self._queue.put(None)
+        self.join(timeout)
+
+
+class CaptureReader:
+    """Memory-mapped capture reader
+    
+    Records are returned as (offset, timestamp, direction, payload) where
+    payload is a memoryview into the mapping (no copy); copy it with
+    bytes() to keep it after the reader is closed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < FILE_HEADER.size:
+            self._file.close()
+            raise ValueError("Not a capture file (too short)")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, self.start_time = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a capture file (bad magic)")
+        self.size = size
+        self._load_index()
+    
+    def _load_index(self):
+        self.index_times = []
+        self.index_offsets = []
+        try:
+            with open(index_path(self.path), "rb") as f:
+                raw = f.read()
+        except OSError:
+            raw = b""
+        usable = len(raw) - len(raw) % INDEX_ENTRY.size
+        for timestamp, offset in INDEX_ENTRY.iter_unpack(raw[:usable]):
+            if offset < self.size:
+                self.index_times.append(timestamp)
+                self.index_offsets.append(offset)
+        if not self.index_offsets:
+            # No (or an empty) index: the first record is always a valid start
+            self.index_times = [self.start_time]
+            self.index_offsets = [FILE_HEADER.size]
+    
+    def records(self, offset=None):
+        """Iterate records starting at a record offset (default: first record)"""
+        pos = FILE_HEADER.size if offset is None else offset
+        size = self.size
+        unpack = RECORD_HEADER.unpack_from
+        header_size = RECORD_HEADER.size
+        view = self._view
+        while pos + header_size <= size:
+            timestamp, direction, length = unpack(self._map, pos)
+            start = pos + header_size
+            end = start + length
+            if end > size:
+                break  # Truncated last record (capture still being written)
+            yield pos, timestamp, direction, view[start:end]
+            pos = end
+    
+    def index_offset_for_time(self, timestamp):
+        """Offset of the last indexed record at or before timestamp"""
+        i = bisect.bisect_right(self.index_times, timestamp) - 1
+        return self.index_offsets[max(0, i)]
+    
+    def index_offset_for_position(self, position):
+        """Offset of the last indexed record at or before a file position"""
+        i = bisect.bisect_right(self.index_offsets, position) - 1
+        return self.index_offsets[max(0, i)]
+    
+    def seek_time(self, timestamp):
+        """Offset of the first record at or after timestamp (None if past the end)"""
+        for offset, record_time, direction, payload in self.records(
+                self.index_offset_for_time(timestamp)):
+            if record_time >= timestamp:
+                return offset
+        return None
+    
+    def end_time(self):
+        """Timestamp of the last record (walks only from the last index entry)"""
+        last = self.start_time
+        for offset, record_time, direction, payload in self.records(self.index_offsets[-1]):
+            last = record_time
+        return last
+    
+    def close(self):
+        """Release the mapping and the file"""
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Payload views are still referenced; the mapping is freed with them
+            pass
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Capture Search Module
+ ======================
+ - Finds hex byte patterns, ASCII strings and wildcard masks in a capture
+   file without reading it into memory.
+ 
+ - Searches run over the per-direction payload streams the capture writer
+   keeps next to the capture ("<file>.rx", "<file>.tx", see capture.py).
+   They are memory-mapped and scanned in C at close to memory speed, and
+   a match may span several records. The sparse "<file>.sidx" map then
+   turns each hit's stream offset into its record (offset and timestamp)
+   with a short walk.
+ 
+ - Patterns:
+        Hex     55 AA ?? 01     "??" matches any byte
+        ASCII   OK\\r\\n          \\r \\n \\t \\0 \\xNN escapes, optional
+                                ASCII case folding
+   Patterns compile to a bytes regex ("??" becomes "."), which re scans
+   in C from its literal prefix; case folding lowercases the stream in
+   chunks first, since an IGNORECASE regex is far slower.
+ 
+ - Captures recorded without the sidecars are indexed once on open.
+ 
+ - Classes:
+        * SearchPattern: Bytes, wildcard mask and case folding to match
+        * SearchHit: One match and the record it starts in
+        * CaptureSearch: Memory-mapped search over one capture
+ 
+ - Functions:
+        * parse_search_pattern: Search text to a SearchPattern
+        * build_search_index: Write the search sidecars of an older capture
+"""
+
+import bisect
+import mmap
+import os
+import re
+
+from capture import (CaptureReader, RX, TX, DIRECTION_NAMES, INDEX_INTERVAL,
+                     SEARCH_INDEX_ENTRY, SEARCH_INDEX_INTERVAL, stream_path,
+                     search_index_path)
+from sequence_runner import parse_pattern
+
+
+SEARCH_MODES = ["Hex", "ASCII"]
+DEFAULT_HIT_LIMIT = 1000
+# Stream bytes shown after each match
+CONTEXT_BYTES = 8
+# Bytes lowercased at a time for case-insensitive searches
+FOLD_CHUNK = 16 * 1024 * 1024
+
+ESCAPES = re.compile(rb"\\(x[0-9A-Fa-f]{2}|[rnt0\\])")
+ESCAPE_BYTES = {b"r": b"\r", b"n": b"\n", b"t": b"\t", b"0": b"\0", b"\\": b"\\"}
+
+
+def parse_search_pattern(text, mode="Hex", ignore_case=False):
+    """Parse search text (Hex with ?? wildcards, or ASCII with \\r \\n \\t \\xNN)"""
+    if mode == "ASCII":
+        data = ESCAPES.sub(
+            lambda m: ESCAPE_BYTES.get(m.group(1)) or bytes([int(m.group(1)[1:], 16)]),
+            text.encode("utf-8")
+        )
+        return SearchPattern(data, ignore_case=ignore_case)
+    if mode != "Hex":
+        raise ValueError(f"unknown search mode '{mode}'")
+    if text.split()[-1:] == ["*"]:
+        raise ValueError("a trailing * has no meaning in a search")
+    data, mask, prefix = parse_pattern(text)
+    return SearchPattern(data, mask)
+
+
+class SearchPattern:
+    """Bytes to find; mask bytes of 0 are wildcards"""
+    
+    def __init__(self, data, mask=None, ignore_case=False):
+        if not data:
+            raise ValueError("pattern is empty")
+        if mask is not None and not any(mask):
+            raise ValueError("pattern is only wildcards")
+        self.data = bytes(data)
+        self.mask = mask
+        self.ignore_case = ignore_case
+        
+        # Leading wildcards are dropped from the regex: its literal prefix is
+        # what lets re skip ahead in C instead of trying every position
+        literal = self.data.lower() if ignore_case else self.data
+        self.lead = 0
+        while mask is not None and not mask[self.lead]:
+            self.lead += 1
+        self.regex = re.compile(b"".join(
+            re.escape(literal[i:i + 1]) if mask is None or mask[i] else b"."
+            for i in range(self.lead, len(self.data))
+        ), re.DOTALL)
+    
+    def __len__(self):
+        return len(self.data)
+    
+    def find_all(self, buffer, limit=DEFAULT_HIT_LIMIT):
+        """Start offsets of non-overlapping matches in buffer (at most limit)"""
+        hits = []
+        size = len(buffer)
+        if not self.ignore_case:
+            self._scan(buffer, 0, 0, size, hits, limit)
+            return hits
+        overlap = len(self.data) - 1
+        for base in range(0, size, FOLD_CHUNK):
+            if len(hits) >= limit:
+                break
+            lo = max(base, hits[-1] + len(self.data)) if hits else base
+            window = buffer[base:base + FOLD_CHUNK + overlap].lower()
+            self._scan(window, base, lo - base, FOLD_CHUNK, hits, limit)
+        return hits
+    
+    def _scan(self, haystack, base, lo, hi, hits, limit):
+        """Matches starting in haystack[lo:hi]; haystack[0] is at offset base"""
+        search = self.regex.search
+        lead, length = self.lead, len(self.data)
+        position = lo + lead
+        while len(hits) < limit:
+            match = search(haystack, position)
+            if match is None:
+                return
+            start = match.start() - lead
+            if start >= hi:
+                return
+            if start < 0:
+                position = match.start() + 1
+                continue
+            hits.append(base + start)
+            position = start + length + lead
+
+
+class SearchHit:
+    """A match in one direction's stream and the record holding its first byte"""
+    
+    def __init__(self, direction, stream_offset, record_offset, timestamp, record_position, data):
+        self.direction = direction
+        self.stream_offset = stream_offset
+        self.record_offset = record_offset      # Capture offset, for CaptureReader.records()
+        self.timestamp = timestamp
+        self.record_position = record_position  # Offset of the match inside the record
+        self.data = data                        # Matched bytes plus CONTEXT_BYTES after
+
+
+class CaptureSearch:
+    """Search one capture; the streams stay mapped until close()"""
+    
+    def __init__(self, path):
+        self.path = path
+        if not has_search_index(path):
+            build_search_index(path)
+        self.reader = CaptureReader(path)
+        self._files = {}
+        self._maps = {}
+        try:
+            for direction in DIRECTION_NAMES:
+                f = open(stream_path(path, direction), "rb")
+                self._files[direction] = f
+                if os.fstat(f.fileno()).st_size:
+                    self._maps[direction] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            self.close()
+            raise
+        self._entries = None
+    
+    def stream_size(self, direction):
+        stream = self._maps.get(direction)
+        return len(stream) if stream is not None else 0
+    
+    def find(self, pattern, directions=(RX, TX), limit=DEFAULT_HIT_LIMIT):
+        """Hits in capture order; returns (hits, truncated)"""
+        hits = []
+        truncated = False
+        for direction in directions:
+            stream = self._maps.get(direction)
+            if stream is None:
+                continue
+            offsets = pattern.find_all(stream, limit + 1)
+            if len(offsets) > limit:
+                truncated = True
+                offsets = offsets[:limit]
+            hits.extend(self._resolve(direction, offsets, len(pattern)))
+        hits.sort(key=lambda hit: (hit.record_offset, hit.record_position))
+        if len(hits) > limit:
+            truncated = True
+            del hits[limit:]
+        return hits, truncated
+    
+    def _load_entries(self):
+        """Per direction: sorted stream offsets and their record offsets"""
+        self._entries = {direction: ([], []) for direction in DIRECTION_NAMES}
+        with open(search_index_path(self.path), "rb") as f:
+            raw = f.read()
+        usable = len(raw) - len(raw) % SEARCH_INDEX_ENTRY.size
+        for direction, stream_offset, record_offset in SEARCH_INDEX_ENTRY.iter_unpack(raw[:usable]):
+            if direction in self._entries and record_offset < self.reader.size:
+                streams, records = self._entries[direction]
+                streams.append(stream_offset)
+                records.append(record_offset)
+    
+    def _walk(self, direction, record_offset, stream_start):
+        """(record offset, timestamp, stream start, length) of one direction's records"""
+        for offset, timestamp, record_direction, payload in self.reader.records(record_offset):
+            if record_direction == direction:
+                length = len(payload)
+                yield offset, timestamp, stream_start, length
+                stream_start += length
+    
+    def _resolve(self, direction, offsets, length):
+        """SearchHits for sorted stream offsets, walking records from the nearest entry"""
+        if self._entries is None:
+            self._load_entries()
+        streams, records = self._entries[direction]
+        stream = self._maps[direction]
+        hits = []
+        walk = None
+        current = None
+        for stream_offset in offsets:
+            i = bisect.bisect_right(streams, stream_offset) - 1
+            if i < 0:
+                continue
+            if current is None or streams[i] > current[2]:
+                walk = self._walk(direction, records[i], streams[i])
+                current = next(walk, None)
+            while current is not None and current[2] + current[3] <= stream_offset:
+                current = next(walk, None)
+            if current is None:
+                break  # Stream is ahead of the capture (still being recorded)
+            record_offset, timestamp, stream_start, record_length = current
+            hits.append(SearchHit(direction, stream_offset, record_offset, timestamp,
+                                  stream_offset - stream_start,
+                                  stream[stream_offset:stream_offset + length + CONTEXT_BYTES]))
+        return hits
+    
+    def close(self):
+        for stream in self._maps.values():
+            stream.close()
+        for f in self._files.values():
+            f.close()
+        self._maps = {}
+        self._files = {}
+        self.reader.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def has_search_index(path):
+    """True if every search sidecar of a capture exists"""
+    paths = [search_index_path(path)] + [stream_path(path, d) for d in DIRECTION_NAMES]
+    return all(os.path.exists(p) for p in paths)
+
+
+def build_search_index(path):
+    """Write the search sidecars of a capture recorded without them (one pass)"""
+    # The map is renamed into place last, so an interrupted build is redone
+    partial = search_index_path(path) + ".part"
+    with CaptureReader(path) as reader:
+        streams = {direction: open(stream_path(path, direction), "wb")
+                   for direction in DIRECTION_NAMES}
+        try:
+            with open(partial, "wb") as index:
+                stream_offsets = dict.fromkeys(DIRECTION_NAMES, 0)
+                next_stream = dict.fromkeys(DIRECTION_NAMES, 0)
+                next_record = dict.fromkeys(DIRECTION_NAMES, 0)
+                pack = SEARCH_INDEX_ENTRY.pack
+                for offset, timestamp, direction, payload in reader.records():
+                    if direction not in streams:
+                        continue
+                    stream_offset = stream_offsets[direction]
+                    if stream_offset >= next_stream[direction] or offset >= next_record[direction]:
+                        index.write(pack(direction, stream_offset, offset))
+                        next_stream[direction] = stream_offset + SEARCH_INDEX_INTERVAL
+                        next_record[direction] = offset + INDEX_INTERVAL
+                    streams[direction].write(payload)
+                    stream_offsets[direction] += len(payload)
+                    payload.release()
+        finally:
+            for f in streams.values():
+                f.close()
+    os.replace(partial, search_index_path(path))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Capture Search Dialog Module
+ =============================
+ - "Search Capture..." window: hex / ASCII / wildcard search over a
+   capture file and a list of hits in capture order.
+ 
+ - Searching runs on the memory-mapped streams (capture_search.py), so
+   only matched bytes are read. Double-clicking a hit (or "Jump to")
+   asks the terminal to replay the capture from the hit's record.
+ 
+ - Classes:
+        * CaptureSearchDialog: Pattern input, hit table and jump-to
+"""
+
+import os
+import time
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (QDialog, QHBoxLayout, QVBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QComboBox, QCheckBox, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView,
+                             QFileDialog, QApplication)
+
+import capture
+from capture_search import (CaptureSearch, parse_search_pattern, SEARCH_MODES,
+                            DEFAULT_HIT_LIMIT)
+from hex_format import to_hex
+
+
+COLUMNS = ["Time (s)", "Dir", "Record offset", "Match"]
+
+
+class CaptureSearchDialog(QDialog):
+    """Search a capture; emits jump_requested(path, record offset) for a hit"""
+    
+    jump_requested = pyqtSignal(str, int)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Search Capture")
+        self.resize(720, 420)
+        self.search = None
+        self.hits = []
+        
+        self.path_label = QLabel("No capture open")
+        self.open_button = QPushButton("Open...")
+        
+        self.pattern_input = QLineEdit()
+        self.pattern_input.setPlaceholderText("55 AA ?? 01  (?? matches any byte)")
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(SEARCH_MODES)
+        self.ignore_case_check = QCheckBox("Ignore case")
+        self.ignore_case_check.setEnabled(False)
+        self.rx_check = QCheckBox("RX")
+        self.rx_check.setChecked(True)
+        self.tx_check = QCheckBox("TX")
+        self.tx_check.setChecked(True)
+        self.find_button = QPushButton("Find")
+        
+        self.status_label = QLabel()
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.jump_button = QPushButton("Jump to")
+        
+        file_row = QHBoxLayout()
+        file_row.addWidget(self.path_label, 1)
+        file_row.addWidget(self.open_button)
+        
+        pattern_row = QHBoxLayout()
+        pattern_row.addWidget(self.pattern_input, 1)
+        pattern_row.addWidget(self.mode_combo)
+        pattern_row.addWidget(self.ignore_case_check)
+        pattern_row.addWidget(self.rx_check)
+        pattern_row.addWidget(self.tx_check)
+        pattern_row.addWidget(self.find_button)
+        
+        status_row = QHBoxLayout()
+        status_row.addWidget(self.status_label, 1)
+        status_row.addWidget(self.jump_button)
+        
+        layout = QVBoxLayout(self)
+        layout.addLayout(file_row)
+        layout.addLayout(pattern_row)
+        layout.addWidget(self.table, 1)
+        layout.addLayout(status_row)
+        
+        self.open_button.clicked.connect(self.choose_capture)
+        self.find_button.clicked.connect(self.find)
+        self.pattern_input.returnPressed.connect(self.find)
+        self.mode_combo.currentTextChanged.connect(self.on_mode_changed)
+        self.table.cellDoubleClicked.connect(lambda row, column: self.jump(row))
+        self.jump_button.clicked.connect(lambda: self.jump(self.table.currentRow()))
+    
+    def on_mode_changed(self, mode):
+        ascii_mode = mode == "ASCII"
+        self.ignore_case_check.setEnabled(ascii_mode)
+        self.pattern_input.setPlaceholderText(
+            "OK\\r\\n  (\\r \\n \\t \\0 \\xNN escapes)" if ascii_mode
+            else "55 AA ?? 01  (?? matches any byte)"
+        )
+    
+    def choose_capture(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Capture", "", "UART captures (*.uartcap);;All files (*)"
+        )
+        if path:
+            self.open_capture(path)
+    
+    def open_capture(self, path):
+        """Map a capture for searching (indexes it first if it has no search index)
+        
+        Reopening is cheap, and picks up what a running recording added.
+        """
+        self.close_capture()
+        self.status_label.setText("Opening...")
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.search = CaptureSearch(path)
+        except (OSError, ValueError) as e:
+            self.status_label.setText(f"<Cannot open capture: {str(e)}>")
+            return False
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.path_label.setText(
+            f"{os.path.basename(path)}  (RX {self.search.stream_size(capture.RX)} B, "
+            f"TX {self.search.stream_size(capture.TX)} B)"
+        )
+        self.status_label.clear()
+        return True
+    
+    def close_capture(self):
+        if self.search is not None:
+            self.search.close()
+            self.search = None
+        self.hits = []
+        self.table.setRowCount(0)
+        self.path_label.setText("No capture open")
+    
+    def find(self):
+        """Search the open capture and list the hits"""
+        if self.search is None:
+            self.status_label.setText("<Open a capture first>")
+            return
+        try:
+            pattern = parse_search_pattern(self.pattern_input.text(), self.mode_combo.currentText(),
+                                           self.ignore_case_check.isChecked())
+        except ValueError as e:
+            self.status_label.setText(f"<Invalid pattern: {e}>")
+            return
+        directions = [direction for direction, check in ((capture.RX, self.rx_check),
+                                                         (capture.TX, self.tx_check))
+                      if check.isChecked()]
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            start = time.perf_counter()
+            self.hits, truncated = self.search.find(pattern, directions, DEFAULT_HIT_LIMIT)
+            elapsed = time.perf_counter() - start
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        start_time = self.search.reader.start_time
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(self.hits))
+        for row, hit in enumerate(self.hits):
+            values = (f"{hit.timestamp - start_time:.3f}",
+                      capture.DIRECTION_NAMES[hit.direction],
+                      f"{hit.record_offset} +{hit.record_position}",
+                      to_hex(hit.data))
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.table.setUpdatesEnabled(True)
+        
+        more = f" (first {DEFAULT_HIT_LIMIT} shown)" if truncated else ""
+        self.status_label.setText(f"{len(self.hits)} hits{more} in {elapsed * 1000:.0f} ms")
+    
+    def jump(self, row):
+        if 0 <= row < len(self.hits):
+            self.jump_requested.emit(self.search.path, self.hits[row].record_offset)
+    
+    def closeEvent(self, event):
+        self.close_capture()
+        super().closeEvent(event)
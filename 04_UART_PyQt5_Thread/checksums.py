@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Checksums Module
+ =================
+ - Table-driven checksums for filling in command frames.
+ 
+ - The 256-entry CRC tables are built once at import; a CRC then costs one
+   table lookup per byte. CRC-32 uses zlib's C implementation.
+ 
+ - Algorithms (check value over b"123456789"):
+        crc8            CRC-8/SMBUS, poly 0x07                    0xF4
+        crc16-modbus    CRC-16/MODBUS, little-endian on the wire  0x4B37
+        crc16-ccitt     CRC-16/CCITT-FALSE, big-endian            0x29B1
+        crc16-xmodem    CRC-16/XMODEM, big-endian                 0x31C3
+        crc32           CRC-32 (zlib), little-endian              0xCBF43926
+        sum8            Sum of bytes modulo 256                   0xDD
+        xor8            XOR of all bytes                          0x31
+ 
+ - Functions:
+        * checksum: Checksum bytes of data for an algorithm name
+"""
+
+import zlib
+from functools import reduce
+from operator import xor
+
+
+def _table_msb(poly, width):
+    """Lookup table for a non-reflected CRC of the given width"""
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) if crc & top else (crc << 1)
+        table.append(crc & mask)
+    return table
+
+
+def _table_lsb(poly):
+    """Lookup table for a reflected CRC (poly given reflected)"""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ poly if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC8_TABLE = _table_msb(0x07, 8)
+CRC16_CCITT_TABLE = _table_msb(0x1021, 16)
+CRC16_MODBUS_TABLE = _table_lsb(0xA001)
+
+
+def crc8(data, crc=0x00):
+    table = CRC8_TABLE
+    for byte in data:
+        crc = table[crc ^ byte]
+    return crc
+
+
+def crc16_ccitt(data, crc=0xFFFF):
+    table = CRC16_CCITT_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def crc16_xmodem(data):
+    return crc16_ccitt(data, 0x0000)
+
+
+def crc16_modbus(data, crc=0xFFFF):
+    table = CRC16_MODBUS_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def sum8(data):
+    return sum(data) & 0xFF
+
+
+def xor8(data):
+    return reduce(xor, data, 0)
+
+
+# name: (function, size in bytes, default byte order)
+ALGORITHMS = {
+    "crc8": (crc8, 1, "big"),
+    "crc16-modbus": (crc16_modbus, 2, "little"),
+    "crc16-ccitt": (crc16_ccitt, 2, "big"),
+    "crc16-xmodem": (crc16_xmodem, 2, "big"),
+    "crc32": (zlib.crc32, 4, "little"),
+    "sum8": (sum8, 1, "big"),
+    "xor8": (xor8, 1, "big"),
+}
+CHECKSUM_NAMES = list(ALGORITHMS)
+
+
+def checksum(name, data, byteorder=None):
+    """Checksum of data as bytes, in the algorithm's (or the given) byte order"""
+    try:
+        function, size, default_order = ALGORITHMS[name.lower()]
+    except KeyError:
+        raise ValueError(f"unknown checksum '{name}' (use {', '.join(CHECKSUM_NAMES)})") from None
+    return function(bytes(data)).to_bytes(size, byteorder or default_order)
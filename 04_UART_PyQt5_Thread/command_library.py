@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Command Library Module
+ =======================
+ - Named, saved commands compiled once into ready-to-send frames, so a
+   button or hotkey sends bytes without parsing anything.
+ 
+ - Command text is hex with optional checksum placeholders, filled in at
+   compile time from the precomputed tables in checksums.py:
+        AA 55 01 02 {crc16-modbus}      checksum over every byte before it
+        AA 55 01 02 {sum8@2}            ... starting at byte 2
+        02 10 20 {crc16-ccitt:le} 03    byte order override (le / be)
+ 
+ - The library is a JSON file (~/uart_commands.json by default):
+        {"commands": [{"name": "Ping", "hex": "01 00 {crc8}", "hotkey": "F2"}]}
+ 
+ - Classes:
+        * Command: One named command and its compiled frame
+        * CommandLibrary: Ordered commands with load / save
+ 
+ - Functions:
+        * compile_command: Command text to frame bytes
+"""
+
+import json
+import os
+import re
+
+from checksums import checksum
+from hex_format import parse_hex, to_hex
+
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.expanduser("~"), "uart_commands.json")
+
+PLACEHOLDER = re.compile(r"\{\s*([A-Za-z0-9-]+)\s*(?::\s*(le|be)\s*)?(?:@\s*(\d+)\s*)?\}",
+                         re.IGNORECASE)
+
+
+def compile_command(text):
+    """Build the frame for command text (raises ValueError)"""
+    frame = bytearray()
+    position = 0
+    for match in PLACEHOLDER.finditer(text):
+        frame += parse_hex(text[position:match.start()])
+        name, order, start = match.groups()
+        start = int(start) if start else 0
+        if start > len(frame):
+            raise ValueError(f"{match.group(0)} starts past the end of the frame")
+        byteorder = {"le": "little", "be": "big"}.get((order or "").lower())
+        frame += checksum(name, frame[start:], byteorder)
+        position = match.end()
+    tail = text[position:]
+    if "{" in tail or "}" in tail:
+        raise ValueError(f"malformed placeholder in '{tail.strip()}'")
+    frame += parse_hex(tail)
+    if not frame:
+        raise ValueError("command is empty")
+    return bytes(frame)
+
+
+class Command:
+    """A named command; frame and frame_hex are computed once"""
+    
+    def __init__(self, name, text, hotkey=""):
+        self.name = name
+        self.text = text
+        self.hotkey = hotkey
+        self.frame = compile_command(text)
+        self.frame_hex = to_hex(self.frame)
+    
+    def as_dict(self):
+        return {"name": self.name, "hex": self.text, "hotkey": self.hotkey}
+
+
+class CommandLibrary:
+    """Ordered set of commands, kept compiled"""
+    
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_LIBRARY_PATH
+        self.commands = []
+    
+    def __iter__(self):
+        return iter(self.commands)
+    
+    def __len__(self):
+        return len(self.commands)
+    
+    def get(self, name):
+        for command in self.commands:
+            if command.name == name:
+                return command
+        return None
+    
+    def set_commands(self, entries):
+        """Replace every command from (name, text, hotkey) tuples
+        
+        Raises ValueError naming the first bad entry; the library is
+        left unchanged in that case.
+        """
+        commands = []
+        names = set()
+        for name, text, hotkey in entries:
+            name = name.strip()
+            if not name:
+                raise ValueError("every command needs a name")
+            if name in names:
+                raise ValueError(f"duplicate command name '{name}'")
+            try:
+                commands.append(Command(name, text.strip(), hotkey.strip()))
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}") from None
+            names.add(name)
+        self.commands = commands
+    
+    def load(self):
+        """Read the library file (a missing file is an empty library)"""
+        if not os.path.exists(self.path):
+            self.commands = []
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.set_commands(
+            (entry.get("name", ""), entry.get("hex", ""), entry.get("hotkey", ""))
+            for entry in data.get("commands", [])
+        )
+    
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"commands": [command.as_dict() for command in self.commands]}, f, indent=2)
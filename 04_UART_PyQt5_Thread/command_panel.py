@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Command Panel Module
+ =====================
+ - One button per library command, plus window-wide hotkeys. Both emit
+   the precompiled frame; nothing is parsed when a command is sent.
+ 
+ - "Edit Commands..." opens a table editor; entries are compiled (and
+   checksums filled in) when the editor is accepted, and saved to the
+   library file.
+ 
+ - Classes:
+        * CommandEditor: Table dialog for names, hex text and hotkeys
+        * CommandPanel: Buttons and shortcuts for a CommandLibrary
+"""
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel,
+                             QDialog, QDialogButtonBox, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QScrollArea, QShortcut)
+
+from checksums import CHECKSUM_NAMES
+from command_library import CommandLibrary, compile_command
+from hex_format import to_hex
+
+
+COLUMNS = ["Name", "Hex (with {checksum} placeholders)", "Hotkey"]
+
+
+class CommandEditor(QDialog):
+    """Edit the command list; the library only changes if all entries compile"""
+    
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.setWindowTitle("Commands")
+        self.resize(640, 360)
+        
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        for command in library:
+            self.add_row(command.name, command.text, command.hotkey)
+        
+        self.add_button = QPushButton("Add")
+        self.remove_button = QPushButton("Remove")
+        self.preview_label = QLabel()
+        self.preview_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.preview_label.setWordWrap(True)
+        hint = QLabel("Checksums: " + ", ".join(f"{{{name}}}" for name in CHECKSUM_NAMES)
+                      + "; {name@N} starts at byte N, {name:le} / {name:be} sets byte order")
+        hint.setWordWrap(True)
+        
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        
+        row_layout = QHBoxLayout()
+        row_layout.addWidget(self.add_button)
+        row_layout.addWidget(self.remove_button)
+        row_layout.addStretch()
+        
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addLayout(row_layout)
+        layout.addWidget(hint)
+        layout.addWidget(self.preview_label)
+        layout.addWidget(self.buttons)
+        
+        self.add_button.clicked.connect(lambda: self.add_row("", "", ""))
+        self.remove_button.clicked.connect(self.remove_row)
+        self.table.currentCellChanged.connect(self.preview)
+        self.table.itemChanged.connect(self.preview)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+    
+    def add_row(self, name, text, hotkey):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for column, value in enumerate((name, text, hotkey)):
+            self.table.setItem(row, column, QTableWidgetItem(value))
+        self.table.setCurrentCell(row, 0)
+    
+    def remove_row(self):
+        row = self.table.currentRow()
+        if row >= 0:
+            self.table.removeRow(row)
+    
+    def entries(self):
+        return [
+            tuple(self.table.item(row, column).text() if self.table.item(row, column) else ""
+                  for column in range(len(COLUMNS)))
+            for row in range(self.table.rowCount())
+        ]
+    
+    def preview(self, *args):
+        """Show the compiled frame of the current row"""
+        row = self.table.currentRow()
+        item = self.table.item(row, 1) if row >= 0 else None
+        if item is None or not item.text().strip():
+            self.preview_label.setText("")
+            return
+        try:
+            self.preview_label.setText(f"Frame: {to_hex(compile_command(item.text()))}")
+        except ValueError as e:
+            self.preview_label.setText(f"<Error: {e}>")
+    
+    def accept(self):
+        try:
+            self.library.set_commands(self.entries())
+        except ValueError as e:
+            self.preview_label.setText(f"<Error: {e}>")
+            return
+        super().accept()
+
+
+class CommandPanel(QWidget):
+    """Buttons for every command; hotkeys work anywhere in shortcut_parent"""
+    
+    command_triggered = pyqtSignal(str, bytes)   # name, frame
+    message = pyqtSignal(str)                    # terminal text
+    
+    def __init__(self, library=None, shortcut_parent=None, parent=None):
+        super().__init__(parent)
+        self.library = library or CommandLibrary()
+        self.shortcut_parent = shortcut_parent or self
+        self.command_buttons = []
+        self.shortcuts = []
+        
+        self.button_row = QWidget()
+        self.button_layout = QHBoxLayout(self.button_row)
+        self.button_layout.setContentsMargins(0, 0, 0, 0)
+        scroll = QScrollArea()
+        scroll.setWidget(self.button_row)
+        scroll.setWidgetResizable(True)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setFrameShape(QScrollArea.NoFrame)
+        scroll.setFixedHeight(self.button_row.sizeHint().height() + 20)
+        
+        self.edit_button = QPushButton("Edit Commands...")
+        
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("Commands:"))
+        layout.addWidget(scroll, 1)
+        layout.addWidget(self.edit_button)
+        
+        self.edit_button.clicked.connect(self.edit_commands)
+    
+    def load(self):
+        """Load the library file and build the buttons"""
+        try:
+            self.library.load()
+        except (OSError, ValueError) as e:
+            self.message.emit(f"<Command library error: {str(e)}>\n")
+        self.rebuild()
+    
+    def rebuild(self):
+        """Recreate buttons and shortcuts after the library changed"""
+        while self.button_layout.count():
+            item = self.button_layout.takeAt(0)
+            if item.widget() is not None:
+                item.widget().deleteLater()
+        for shortcut in self.shortcuts:
+            shortcut.setEnabled(False)
+            shortcut.deleteLater()
+        self.command_buttons = []
+        self.shortcuts = []
+        
+        for command in self.library:
+            label = f"{command.name} ({command.hotkey})" if command.hotkey else command.name
+            button = QPushButton(label)
+            button.setToolTip(command.frame_hex)
+            button.clicked.connect(lambda checked, c=command: self.trigger(c))
+            self.button_layout.addWidget(button)
+            self.command_buttons.append(button)
+            
+            if command.hotkey:
+                sequence = QKeySequence(command.hotkey)
+                if sequence.isEmpty():
+                    self.message.emit(f"<Invalid hotkey for {command.name}: {command.hotkey}>\n")
+                    continue
+                shortcut = QShortcut(sequence, self.shortcut_parent)
+                shortcut.setAutoRepeat(True)
+                shortcut.activated.connect(lambda c=command: self.trigger(c))
+                self.shortcuts.append(shortcut)
+        
+        # Keep the buttons packed to the left
+        self.button_layout.addStretch()
+    
+    def trigger(self, command):
+        self.command_triggered.emit(command.name, command.frame)
+    
+    def edit_commands(self):
+        editor = CommandEditor(self.library, self)
+        if editor.exec_() != QDialog.Accepted:
+            return
+        try:
+            self.library.save()
+        except OSError as e:
+            self.message.emit(f"<Cannot save command library: {str(e)}>\n")
+        self.rebuild()
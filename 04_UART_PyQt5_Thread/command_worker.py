@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Command Worker Module
+ ======================
+ - One long-lived thread that performs every port operation of a
+   session, fed from a prioritized command queue.
+ 
+ - The queue is bounded: submit() reports a full queue instead of
+   letting work pile up without limit (back-pressure). Lower priority
+   numbers run first (saved-command hotkeys overtake queued transmits);
+   equal priorities run in submission order.
+ 
+ - Two kinds of work:
+        * Jobs: any callable, run one at a time (one-shot transmits,
+          sequence runs, file sends)
+        * Requests: frames whose responses are matched as they arrive.
+          Up to `depth` requests are on the wire at once; each response
+          frame goes to the request with the same transaction ID (an
+          IdField, e.g. bytes 0-1 of both frames) or, without one, to
+          the oldest outstanding request.
+ 
+ - Received bytes reach the worker through the core's on_rx hook, so
+   requests are matched whether the monitoring reader thread or the
+   worker itself reads the port. Responses are split with a framer
+   from make_framer (Raw framing can't tell pipelined responses apart).
+ 
+ - Classes:
+        * IdField: Transaction-ID bytes at a fixed offset of a frame
+        * Request: One pipelined transmit and its outcome
+        * CommandWorker: The worker thread and its queue
+ 
+ - Functions:
+        * parse_id_field: "offset[:length]" to an IdField
+"""
+
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from framing import Framer
+from hex_format import to_hex
+
+
+PRIORITY_HIGH = 0       # Saved commands and hotkeys
+PRIORITY_NORMAL = 1     # Send Hex
+PRIORITY_LOW = 2        # Sequence runs and file sends
+
+DEFAULT_QUEUE_SIZE = 64
+
+# Longest wait between checks for responses, new work and timeouts
+POLL_INTERVAL = 0.01
+
+
+def parse_id_field(text):
+    """IdField from "offset[:length]" (e.g. "0:2" or "-3:1"), None for empty text"""
+    text = text.strip()
+    if not text:
+        return None
+    offset, _, length = text.partition(":")
+    try:
+        return IdField(int(offset), int(length) if length.strip() else 1)
+    except ValueError:
+        raise ValueError(f"bad ID field '{text}' (offset[:length], e.g. 0:2)") from None
+
+
+class IdField:
+    """Transaction-ID bytes at a fixed offset (a negative offset counts from the end)"""
+    
+    def __init__(self, offset, length=1):
+        if length < 1:
+            raise ValueError("ID length must be at least 1")
+        self.offset = offset
+        self.length = length
+    
+    def extract(self, frame):
+        """The ID bytes of a frame, or None if it is too short"""
+        start = self.offset if self.offset >= 0 else len(frame) + self.offset
+        if start < 0 or start + self.length > len(frame):
+            return None
+        return bytes(frame[start:start + self.length])
+    
+    def describe(self):
+        return f"{self.offset}:{self.length}"
+
+
+class Request:
+    """A frame to send and, once matched, its response"""
+    
+    def __init__(self, data, timeout, label=None):
+        self.data = bytes(data)
+        self.timeout = timeout      # Seconds to wait for the response
+        self.label = label          # Shown with the TX line (e.g. a command name)
+        self.number = 0             # Submission number, from 1
+        self.key = None             # Transaction ID, None when matched in order
+        self.timing = {}            # perf_counter() marks for TransactionRecord.from_timing
+        self.deadline = None
+        self.response = None        # The matched frame
+        self.timed_out = False
+        self.cancelled = False
+        self.error = None
+    
+    def latency(self):
+        """Seconds from the end of the write to the response (None without one)"""
+        if self.response is None:
+            return None
+        return self.timing["last_byte"] - self.timing["write_done"]
+
+
+class CommandWorker(threading.Thread):
+    """Runs queued jobs and pipelined requests on one port, one thread
+    
+    Callbacks run on the worker thread, except on_complete for a matched
+    response, which runs on whichever thread read it; all must be quick
+    and must not touch GUI-owned state (post it to the GUI thread).
+        on_sent(request)        a request is about to be written
+        on_complete(request)    answered, timed out, cancelled or failed
+        on_rx(data)             bytes the worker read itself (no reader thread)
+        on_message(text)        unmatched responses and job errors
+        on_idle()               nothing queued, running or outstanding
+    """
+    
+    def __init__(self, core, make_framer=Framer, depth=1, id_field=None,
+                 queue_size=DEFAULT_QUEUE_SIZE, stop_event=None, on_sent=None,
+                 on_complete=None, on_rx=None, on_message=None, on_idle=None):
+        super().__init__(daemon=True)
+        self.core = core
+        self.make_framer = make_framer
+        self.depth = depth
+        self.id_field = id_field
+        self.queue = queue.PriorityQueue(queue_size)
+        self.stop_event = stop_event or threading.Event()
+        self.on_sent = on_sent or (lambda request: None)
+        self.on_complete = on_complete or (lambda request: None)
+        self.on_rx = on_rx or (lambda data: None)
+        self.on_message = on_message or (lambda text: None)
+        self.on_idle = on_idle or (lambda: None)
+        self.unmatched = 0
+        
+        self._numbers = itertools.count(1)
+        self._condition = threading.Condition()
+        self._outstanding = OrderedDict()   # number -> Request, oldest first
+        self._keys = {}                     # transaction ID -> Request
+        self._framer = make_framer()
+        self._unfinished = 0                # Queued + running + outstanding
+        self._closing = False
+        
+        # Every received byte, whoever reads it, passes through feed()
+        core.on_rx = self.feed
+    
+    def configure(self, depth, id_field, make_framer):
+        """Pipeline depth, ID field and framing for the next requests"""
+        self.depth = max(1, depth)
+        self.id_field = id_field
+        self.make_framer = make_framer
+    
+    def submit(self, work, priority=PRIORITY_NORMAL, block=False, timeout=None):
+        """Queue a Request or a job (a callable); False if the queue is full
+        
+        With block, waits up to timeout for room. Raises ValueError for a
+        request without the configured ID field.
+        """
+        number = next(self._numbers)
+        if isinstance(work, Request):
+            work.number = number
+            if self.id_field is not None:
+                work.key = self.id_field.extract(work.data)
+                if work.key is None:
+                    raise ValueError(f"frame has no ID at {self.id_field.describe()}")
+        with self._condition:
+            self._unfinished += 1
+        try:
+            self.queue.put((priority, number, work), block, timeout)
+        except queue.Full:
+            self._finished()
+            return False
+        with self._condition:
+            self._condition.notify_all()
+        return True
+    
+    def pending(self):
+        """Queued, running and outstanding work"""
+        return self._unfinished
+    
+    def busy(self):
+        return self._unfinished > 0
+    
+    def wait_idle(self, timeout=None):
+        """Wait until everything submitted has finished; False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._unfinished == 0, timeout)
+    
+    def cancel(self):
+        """Drop queued work and stop the running job and outstanding requests
+        
+        Returns the number of queued entries dropped.
+        """
+        dropped = 0
+        while True:
+            try:
+                priority, number, work = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if work is None:
+                self.queue.put_nowait((priority, number, work))  # Keep the close request
+                break
+            dropped += 1
+            self._finished()
+        self.stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        return dropped
+    
+    def close(self, timeout=1.0):
+        """Stop the thread (outstanding requests are cancelled) and unhook the core"""
+        self._closing = True
+        self.stop_event.set()
+        try:
+            self.queue.put_nowait((-1, 0, None))
+        except queue.Full:
+            pass  # The worker isn't waiting for work and checks _closing
+        with self._condition:
+            self._condition.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+        if self.core.on_rx == self.feed:
+            self.core.on_rx = None
+    
+    def run(self):
+        while not self._closing:
+            with self._condition:
+                waiting = len(self._outstanding)
+            if waiting < self.depth:
+                try:
+                    # Nothing outstanding: sleep until work arrives
+                    entry = self.queue.get_nowait() if waiting else self.queue.get()
+                except queue.Empty:
+                    entry = None
+                if entry is not None:
+                    work = entry[2]
+                    if work is None:
+                        break
+                    self.stop_event.clear()
+                    if isinstance(work, Request):
+                        self._send(work)
+                    else:
+                        self._run_job(work)
+                    self._service(block=False)
+                    continue
+            # Window full or queue empty: wait for responses and deadlines
+            self._service()
+        self._cancel_outstanding()
+    
+    def feed(self, data):
+        """Match the frames completed by received bytes (any thread)"""
+        arrived = time.perf_counter()
+        answered = []
+        unmatched = []
+        with self._condition:
+            if not self._outstanding:
+                return  # Nothing expected: unsolicited data is the display's business
+            for frame in self._framer.feed(data):
+                request = self._match(frame)
+                if request is None:
+                    unmatched.append(frame)
+                    continue
+                request.response = frame
+                request.timing.setdefault("write_done", arrived)
+                request.timing["first_byte"] = request.timing["last_byte"] = arrived
+                answered.append(request)
+            self.unmatched += len(unmatched)
+        for request in answered:
+            self._complete(request)
+        for frame in unmatched:
+            self.on_message(f"<Unmatched response: {to_hex(frame)}>\n")
+    
+    def _match(self, frame):
+        """Remove and return the request a frame answers (lock held)"""
+        if self.id_field is None:
+            if not self._outstanding:
+                return None
+            return self._outstanding.popitem(last=False)[1]
+        request = self._keys.pop(self.id_field.extract(frame), None)
+        if request is not None:
+            del self._outstanding[request.number]
+        return request
+    
+    def _send(self, request):
+        # A second request with an ID still on the wire would be ambiguous
+        while request.key is not None and not self.stop_event.is_set():
+            with self._condition:
+                if request.key not in self._keys:
+                    break
+            self._service()
+        if self.stop_event.is_set():
+            request.cancelled = True
+            self._complete(request)
+            return
+        if not self.core.is_connected():
+            request.error = "port is not open"
+            self._complete(request)
+            return
+        
+        with self._condition:
+            if not self._outstanding:
+                self._framer = self.make_framer()  # New burst: forget stale bytes
+            now = time.perf_counter()
+            request.timing["start"] = request.timing["opened"] = now
+            request.deadline = now + request.timeout
+            # Registered before the write: the response may beat write() back
+            self._outstanding[request.number] = request
+            if request.key is not None:
+                self._keys[request.key] = request
+        self.on_sent(request)
+        try:
+            self.core.send(request.data)
+        except Exception as e:
+            if self._forget(request):
+                request.error = str(e)
+                self._complete(request)
+            return
+        request.timing.setdefault("write_done", time.perf_counter())
+    
+    def _run_job(self, job):
+        # Jobs read the port themselves: let pipelined responses settle first
+        while self._has_outstanding() and not self.stop_event.is_set():
+            self._service()
+        try:
+            if not self.stop_event.is_set():
+                job()
+        except Exception as e:
+            self.on_message(f"<Worker error: {str(e)}>\n")
+        finally:
+            self._finished()
+    
+    def _service(self, block=True):
+        """Collect responses (reading the port unless a reader thread does)
+        and expire late requests; with block, wait briefly for a response"""
+        with self._condition:
+            if not self._outstanding:
+                return
+            deadline = min(request.deadline for request in self._outstanding.values())
+        wait = max(0.0, min(POLL_INTERVAL, deadline - time.perf_counter())) if block else 0.0
+        if self.core.is_monitoring():
+            if wait:
+                with self._condition:
+                    if self._outstanding:
+                        self._condition.wait(wait)
+        else:
+            self._read(wait)
+        
+        if self.stop_event.is_set():
+            self._cancel_outstanding()
+            return
+        now = time.perf_counter()
+        with self._condition:
+            late = [request for request in self._outstanding.values() if request.deadline <= now]
+        for request in late:
+            if self._forget(request):
+                request.timed_out = True
+                self._complete(request)
+    
+    def _read(self, wait):
+        port = self.core.serial_port
+        if port is None:
+            time.sleep(wait)
+            return
+        try:
+            waiting = port.in_waiting
+            if waiting:
+                chunk = port.read(waiting)
+            elif wait:
+                saved_timeout = port.timeout
+                port.timeout = wait
+                chunk = port.read(1)
+                port.timeout = saved_timeout
+            else:
+                return
+        except Exception as e:
+            self.on_message(f"<Read error: {str(e)}>\n")
+            self._cancel_outstanding(error=str(e))
+            return
+        if chunk:
+            self.core.record_rx(chunk)  # Comes back through feed()
+            self.on_rx(chunk)
+    
+    def _has_outstanding(self):
+        with self._condition:
+            return bool(self._outstanding)
+    
+    def _forget(self, request):
+        """Take a request off the wire; False if a response got it first"""
+        with self._condition:
+            if self._outstanding.pop(request.number, None) is None:
+                return False
+            if request.key is not None:
+                self._keys.pop(request.key, None)
+            return True
+    
+    def _cancel_outstanding(self, error=None):
+        with self._condition:
+            requests = list(self._outstanding.values())
+            self._outstanding.clear()
+            self._keys.clear()
+        for request in requests:
+            request.cancelled = error is None
+            request.error = error
+            self._complete(request)
+    
+    def _complete(self, request):
+        try:
+            self.on_complete(request)
+        finally:
+            self._finished()
+    
+    def _finished(self):
+        with self._condition:
+            self._unfinished -= 1
+            idle = self._unfinished == 0
+            self._condition.notify_all()
+        if idle:
+            self.on_idle()
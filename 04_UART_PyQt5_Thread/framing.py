@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Framing Module
+ ===============
+ - Incremental frame parsers for the RX byte stream.
+
+ - Each framer is fed chunks as they arrive and returns the frames that
+   became complete. Bytes are scanned once: the search for the next
+   boundary resumes where the previous chunk ended, and only the tail of
+   an unfinished frame is kept between calls.
+
+ - Classes:
+        * Framer: Base class (no framing, chunks pass through)
+        * DelimiterFramer: Frames end with a delimiter (e.g. LF)
+        * LengthPrefixFramer: Frames start with a 1/2/4-byte length field
+        * SlipFramer: SLIP (RFC 1055)
+        * CobsFramer: COBS with 0x00 frame delimiter
+
+ - Functions:
+        * create_framer: Build a framer from a UI name and parameter
+"""
+
+
+class Framer:
+    """Base framer: every chunk is passed through as one frame"""
+    name = "Raw"
+
+    def __init__(self, max_frame=65536):
+        self.max_frame = max_frame
+        self.frames = 0
+        self.dropped = 0    # Bytes discarded (oversized or malformed frames)
+        self._buffer = bytearray()
+    
+    def feed(self, data):
+        """Consume a chunk and return the list of completed frames"""
+        if not data:
+            return []
+        self.frames += 1
+        return [bytes(data)]
+    
+    def encode(self, payload):
+        """Wrap a payload into one frame of this format"""
+        return bytes(payload)
+    
+    def pending(self):
+        """Bytes of the unfinished frame held back so far"""
+        return bytes(self._buffer)
+    
+    def reset(self):
+        """Discard any partial frame"""
+        self._buffer.clear()
+    
+    def _check_overflow(self):
+        # An unterminated frame larger than max_frame is garbage; drop it
+        if len(self._buffer) > self.max_frame:
+            self.dropped += len(self._buffer)
+            self._buffer.clear()
+            return True
+        return False
+
+
+class _SeparatorFramer(Framer):
+    """Shared logic for framers that split on a separator sequence"""
+    separator = b"\n"
+    keep_separator = False
+
+    def __init__(self, max_frame=65536):
+        super().__init__(max_frame)
+        self._scan = 0  # Where the separator search resumes
+    
+    def feed(self, data):
+        buf = self._buffer
+        buf.extend(data)
+        sep = self.separator
+        sep_len = len(sep)
+        frames = []
+        start = 0
+        pos = buf.find(sep, self._scan)
+        while pos >= 0:
+            end = pos + sep_len
+            raw = buf[start:end] if self.keep_separator else buf[start:pos]
+            frame = self._decode(raw)
+            if frame is not None:
+                frames.append(frame)
+            start = end
+            pos = buf.find(sep, start)
+        
+        # Deleting from the front of a bytearray is amortized O(1) in CPython
+        if start:
+            del buf[:start]
+        if self._check_overflow():
+            self._scan = 0
+        else:
+            self._scan = max(0, len(buf) - sep_len + 1)
+        self.frames += len(frames)
+        return frames
+    
+    def reset(self):
+        super().reset()
+        self._scan = 0
+    
+    def _decode(self, raw):
+        return bytes(raw)
+
+
+class DelimiterFramer(_SeparatorFramer):
+    """Frames terminated by a delimiter sequence (delimiter kept in the frame)"""
+    name = "Delimiter"
+    keep_separator = True
+
+    def __init__(self, delimiter=b"\n", max_frame=65536):
+        if not delimiter:
+            raise ValueError("delimiter must not be empty")
+        super().__init__(max_frame)
+        self.separator = bytes(delimiter)
+    
+    def encode(self, payload):
+        return bytes(payload) + self.separator
+
+
+class LengthPrefixFramer(Framer):
+    """Frames with a length field in front of the payload
+    
+    The emitted frame includes the length field. length_adjust is added
+    to the field value, e.g. -2 if the field also counts itself (2 bytes).
+    """
+    name = "Length prefix"
+
+    def __init__(self, size=2, byteorder="big", length_adjust=0, max_frame=65536):
+        if size not in (1, 2, 4):
+            raise ValueError("length field must be 1, 2 or 4 bytes")
+        super().__init__(max_frame)
+        self.size = size
+        self.byteorder = byteorder
+        self.length_adjust = length_adjust
+    
+    def feed(self, data):
+        buf = self._buffer
+        buf.extend(data)
+        size = self.size
+        frames = []
+        pos = 0
+        available = len(buf)
+        while available - pos >= size:
+            payload_len = int.from_bytes(buf[pos:pos + size], self.byteorder) + self.length_adjust
+            total = size + payload_len
+            if payload_len < 0 or total > self.max_frame:
+                # Corrupt length field: skip one byte and try to resync
+                self.dropped += 1
+                pos += 1
+                continue
+            if available - pos < total:
+                break
+            frames.append(bytes(buf[pos:pos + total]))
+            pos += total
+        if pos:
+            del buf[:pos]
+        self.frames += len(frames)
+        return frames
+    
+    def encode(self, payload):
+        length = len(payload) - self.length_adjust
+        return length.to_bytes(self.size, self.byteorder) + bytes(payload)
+
+
+class SlipFramer(_SeparatorFramer):
+    """SLIP frames (RFC 1055): END-terminated, ESC-escaped"""
+    name = "SLIP"
+    separator = b"\xc0"
+    END = b"\xc0"
+    ESC = b"\xdb"
+
+    def _decode(self, raw):
+        if not raw:
+            return None  # Back-to-back END bytes
+        # Two bulk replaces undo the escaping; their order keeps them unambiguous
+        return bytes(raw).replace(b"\xdb\xdc", b"\xc0").replace(b"\xdb\xdd", b"\xdb")
+    
+    def encode(self, payload):
+        escaped = bytes(payload).replace(b"\xdb", b"\xdb\xdd").replace(b"\xc0", b"\xdb\xdc")
+        return self.END + escaped + self.END
+
+
+class CobsFramer(_SeparatorFramer):
+    """COBS frames delimited by 0x00"""
+    name = "COBS"
+    separator = b"\x00"
+
+    def _decode(self, raw):
+        if not raw:
+            return None
+        raw = bytes(raw)
+        out = bytearray()
+        pos = 0
+        end = len(raw)
+        # One iteration per COBS block, not per byte
+        while pos < end:
+            code = raw[pos]
+            if pos + code > end:
+                # Truncated block: the frame is corrupt
+                self.dropped += len(raw)
+                return None
+            block_end = pos + code
+            out += raw[pos + 1:block_end]
+            pos = block_end
+            if code < 0xFF and pos < end:
+                out.append(0)
+        return bytes(out)
+    
+    def encode(self, payload):
+        out = bytearray()
+        for block in bytes(payload).split(b"\x00"):
+            # Blocks longer than 254 bytes are split without an implied zero
+            while len(block) >= 0xFE:
+                out.append(0xFF)
+                out += block[:0xFE]
+                block = block[0xFE:]
+            out.append(len(block) + 1)
+            out += block
+        out.append(0)
+        return bytes(out)
+
+
+FRAMER_NAMES = ["Raw", "Delimiter", "Length prefix", "SLIP", "COBS"]
+
+FRAMER_HINTS = {
+    "Raw": "",
+    "Delimiter": "delimiter hex (default 0A)",
+    "Length prefix": "field bytes 1/2/4, add 'le' for little-endian (default 2)",
+    "SLIP": "",
+    "COBS": "",
+}
+
+
+def create_framer(name, param=""):
+    """Build a framer from its UI name and parameter text (raises ValueError)"""
+    param = param.strip()
+    if name == "Raw":
+        return Framer()
+    if name == "Delimiter":
+        delimiter = bytes.fromhex(''.join(param.split())) if param else b"\n"
+        return DelimiterFramer(delimiter)
+    if name == "Length prefix":
+        text = param.lower()
+        byteorder = "little" if text.endswith("le") else "big"
+        text = text[:-2] if text.endswith(("le", "be")) else text
+        return LengthPrefixFramer(int(text) if text else 2, byteorder)
+    if name == "SLIP":
+        return SlipFramer()
+    if name == "COBS":
+        return CobsFramer()
+    raise ValueError(f"Unknown framing: {name}")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Hex Dump View Module
+ =====================
+ - Model/view hex dump of the received byte stream.
+
+ - The model keeps the raw bytes only; rows (offset, hex, ASCII) are
+   formatted on demand when the view asks for them, so only the visible
+   rows are ever rendered.
+
+ - A configurable scrollback cap drops the oldest whole rows, so memory
+   stays bounded during long captures. Offsets stay absolute.
+
+ - Classes:
+        * HexDumpModel: Table model over a capped byte buffer
+        * HexDumpView: Table view with fixed-height rows and auto-scroll
+"""
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QFontDatabase
+from PyQt5.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from hex_format import to_hex, to_ascii
+
+
+class HexDumpModel(QAbstractTableModel):
+    """Table model that formats rows of a byte buffer on demand"""
+    COLUMNS = ("Offset", "Hex", "ASCII")
+
+    def __init__(self, bytes_per_row=16, max_bytes=1 << 20, parent=None):
+        super().__init__(parent)
+        self.bytes_per_row = bytes_per_row
+        self.max_bytes = max_bytes
+        self._data = bytearray()
+        self._base = 0  # Absolute offset of self._data[0]
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return (len(self._data) + self.bytes_per_row - 1) // self.bytes_per_row
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        
+        start = index.row() * self.bytes_per_row
+        chunk = self._data[start:start + self.bytes_per_row]
+        column = index.column()
+        if column == 0:
+            return f"{self._base + start:08X}"
+        if column == 1:
+            return to_hex(chunk)
+        return to_ascii(chunk)
+    
+    def total_bytes(self):
+        """Absolute offset one past the last stored byte"""
+        return self._base + len(self._data)
+    
+    def append_bytes(self, data):
+        """Append received bytes, trimming the oldest rows past the cap"""
+        if not data:
+            return
+        bpr = self.bytes_per_row
+        
+        # A single chunk larger than the cap replaces everything
+        if len(data) >= self.max_bytes:
+            keep = self.max_bytes - self.max_bytes % bpr
+            self.beginResetModel()
+            self._base += len(self._data) + len(data) - keep
+            self._data = bytearray(data[len(data) - keep:])
+            self.endResetModel()
+            return
+        
+        # Drop whole rows from the front so the cap holds after the append
+        excess = len(self._data) + len(data) - self.max_bytes
+        if excess > 0:
+            self._trim_rows((excess + bpr - 1) // bpr)
+        
+        old_len = len(self._data)
+        old_rows = self.rowCount()
+        self._data.extend(data)
+        new_rows = self.rowCount()
+        
+        # A partially filled last row gets new bytes
+        if old_len % bpr and old_rows:
+            last = self.index(old_rows - 1, 0)
+            self.dataChanged.emit(last, self.index(old_rows - 1, len(self.COLUMNS) - 1))
+        
+        if new_rows > old_rows:
+            self.beginInsertRows(QModelIndex(), old_rows, new_rows - 1)
+            self.endInsertRows()
+    
+    def set_max_bytes(self, max_bytes):
+        """Change the scrollback cap, trimming immediately if needed"""
+        self.max_bytes = max(self.bytes_per_row, max_bytes)
+        excess = len(self._data) - self.max_bytes
+        if excess > 0:
+            self._trim_rows((excess + self.bytes_per_row - 1) // self.bytes_per_row)
+    
+    def clear(self):
+        """Remove all stored bytes (offsets continue from where they were)"""
+        self.beginResetModel()
+        self._base += len(self._data)
+        self._data = bytearray()
+        self.endResetModel()
+    
+    def _trim_rows(self, rows):
+        rows = min(rows, self.rowCount())
+        if rows <= 0:
+            return
+        # The last row may be partial: advance by what is actually removed
+        removed = min(rows * self.bytes_per_row, len(self._data))
+        self.beginRemoveRows(QModelIndex(), 0, rows - 1)
+        del self._data[:removed]
+        self._base += removed
+        self.endRemoveRows()
+
+
+class HexDumpView(QTableView):
+    """Hex dump table that follows new data while scrolled to the bottom"""
+
+    def __init__(self, model=None, parent=None):
+        super().__init__(parent)
+        self.setModel(model if model is not None else HexDumpModel(parent=self))
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.setWordWrap(False)
+        self.setShowGrid(False)
+        self.setAlternatingRowColors(True)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        
+        # Fixed-height rows let the view map scroll position to rows directly
+        vertical = self.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(self.fontMetrics().height() + 4)
+        
+        # Column widths come from the font, not from measuring every row
+        metrics = self.fontMetrics()
+        bpr = self.model().bytes_per_row
+        horizontal = self.horizontalHeader()
+        horizontal.setStretchLastSection(True)
+        self.setColumnWidth(0, metrics.horizontalAdvance("0" * 8) + 16)
+        self.setColumnWidth(1, metrics.horizontalAdvance("00 " * bpr) + 16)
+        
+        self.model().rowsAboutToBeInserted.connect(self._remember_scroll)
+        self.model().rowsInserted.connect(self._follow_tail)
+        self._at_bottom = True
+    
+    def _remember_scroll(self, *args):
+        bar = self.verticalScrollBar()
+        self._at_bottom = bar.value() >= bar.maximum()
+    
+    def _follow_tail(self, *args):
+        if self._at_bottom:
+            self.scrollToBottom()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Multi-Session Window Module
+ ============================
+ - Tabbed window for talking to several serial ports at once.
+ 
+ - Every open port is serviced by the same PortMultiplexer I/O thread;
+   one UI timer drains all session buffers, so thread count and CPU stay
+   flat as ports are added.
+ 
+ - Classes:
+        * SessionTab: Log, hex input and counters for one port
+        * MultiSessionWindow: Port picker, session tabs and the I/O thread
+"""
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox,
+                             QPushButton, QLabel, QTextEdit, QLineEdit, QTabWidget)
+
+from hex_format import parse_hex, to_hex, to_ascii
+from port_multiplexer import PortMultiplexer
+from transports import open_transport, PORT_HINT
+from uart_core import BAUD_RATES, NO_PORTS, list_ports
+
+
+# How often the UI drains every session's RX buffer
+DRAIN_INTERVAL_MS = 50
+
+# Log lines kept per session tab
+SESSION_LOG_LINES = 5000
+
+
+class SessionTab(QWidget):
+    """Terminal for one multiplexed port"""
+    
+    def __init__(self, session, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.rx_dropped = 0
+        layout = QVBoxLayout(self)
+        
+        self.log = QTextEdit()
+        self.log.setReadOnly(True)
+        self.log.setStyleSheet("font-family: monospace;")
+        self.log.document().setMaximumBlockCount(SESSION_LOG_LINES)
+        
+        self.hex_input = QLineEdit()
+        self.hex_input.setPlaceholderText("Enter hex data (e.g., FF 00 A3 BD)...")
+        self.send_button = QPushButton("Send Hex")
+        self.stats_label = QLabel()
+        
+        input_layout = QHBoxLayout()
+        input_layout.addWidget(self.hex_input)
+        input_layout.addWidget(self.send_button)
+        
+        layout.addWidget(self.log)
+        layout.addLayout(input_layout)
+        layout.addWidget(self.stats_label)
+        self.update_stats()
+    
+    def drain(self):
+        """Show everything received since the last call"""
+        session = self.session
+        data = session.rx_buffer.read()
+        lines = []
+        if data:
+            for frame in session.framer.feed(data):
+                lines.append(f"RX: {to_hex(frame)}")
+                lines.append(f"RX (ASCII): {to_ascii(frame)}")
+        dropped = session.rx_buffer.dropped - self.rx_dropped
+        if dropped:
+            self.rx_dropped = session.rx_buffer.dropped
+            lines.append(f"<RX buffer overflow: {dropped} bytes dropped>")
+        if lines:
+            self.log.append("\n".join(lines))
+        self.update_stats()
+    
+    def update_stats(self):
+        session = self.session
+        state = "open" if session.error is None else f"error: {session.error}"
+        self.stats_label.setText(
+            f"{session.name}: {state}, RX {session.rx_bytes} B, TX {session.tx_bytes} B"
+        )
+
+
+class MultiSessionWindow(QWidget):
+    """Several serial sessions driven by one I/O thread
+    
+    make_framer, if given, returns a fresh Framer for each new session
+    (the main window passes its current framing selection). ports, if
+    given, returns the port list (the main window's cached watcher list)
+    instead of enumerating on the GUI thread.
+    """
+    
+    def __init__(self, make_framer=None, ports=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("UART Multi-Port Sessions")
+        self.resize(700, 500)
+        self.make_framer = make_framer
+        self.ports = ports or list_ports
+        
+        self.multiplexer = PortMultiplexer()
+        self.multiplexer.start()
+        
+        # Port picker
+        self.port_combo = QComboBox()
+        self.port_combo.setEditable(True)
+        self.port_combo.setToolTip(PORT_HINT)
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItems(BAUD_RATES)
+        self.baud_combo.setCurrentText("115200")
+        self.refresh_button = QPushButton("Refresh")
+        self.open_button = QPushButton("Open Port")
+        
+        picker_layout = QHBoxLayout()
+        picker_layout.addWidget(QLabel("Port:"))
+        picker_layout.addWidget(self.port_combo, 1)
+        picker_layout.addWidget(QLabel("Baudrate:"))
+        picker_layout.addWidget(self.baud_combo)
+        picker_layout.addWidget(self.refresh_button)
+        picker_layout.addWidget(self.open_button)
+        
+        # One tab per open port
+        self.session_tabs = QTabWidget()
+        self.session_tabs.setTabsClosable(True)
+        self.status_label = QLabel()
+        
+        layout = QVBoxLayout(self)
+        layout.addLayout(picker_layout)
+        layout.addWidget(self.session_tabs)
+        layout.addWidget(self.status_label)
+        
+        self.refresh_button.clicked.connect(self.refresh_ports)
+        self.open_button.clicked.connect(self.open_port)
+        self.session_tabs.tabCloseRequested.connect(self.close_tab)
+        
+        # A single timer drains every session
+        self.drain_timer = QTimer(self)
+        self.drain_timer.setInterval(DRAIN_INTERVAL_MS)
+        self.drain_timer.timeout.connect(self.drain_all)
+        self.drain_timer.start()
+        
+        self.refresh_ports()
+        self.update_status()
+    
+    def refresh_ports(self):
+        """Refresh the list of ports that are not already open here"""
+        self.port_combo.clear()
+        ports = [p for p in self.ports() if p not in self.multiplexer.sessions]
+        self.port_combo.addItems(ports if ports else [NO_PORTS])
+    
+    def open_port(self):
+        """Open the selected port and add it to the I/O thread"""
+        name = self.port_combo.currentText().strip()
+        if not name or name == NO_PORTS:
+            return
+        if name in self.multiplexer.sessions:
+            self.session_tabs.setCurrentWidget(self.find_tab(name))
+            return
+        try:
+            port = open_transport(name, self.baud_combo.currentText(), timeout=0)
+        except Exception as e:
+            self.status_label.setText(f"<Connection error: {str(e)}>")
+            return
+        
+        session = self.multiplexer.add_port(name, port)
+        if self.make_framer is not None:
+            session.framer = self.make_framer()
+        tab = SessionTab(session)
+        tab.send_button.clicked.connect(lambda: self.send(tab))
+        tab.hex_input.returnPressed.connect(lambda: self.send(tab))
+        tab.log.append(f"<Connected to {name} at {port.baudrate} baud>")
+        self.session_tabs.addTab(tab, name)
+        self.session_tabs.setCurrentWidget(tab)
+        self.refresh_ports()
+        self.update_status()
+    
+    def find_tab(self, name):
+        for index in range(self.session_tabs.count()):
+            tab = self.session_tabs.widget(index)
+            if tab.session.name == name:
+                return tab
+        return None
+    
+    def send(self, tab):
+        """Queue the tab's hex input on its port"""
+        try:
+            data = parse_hex(tab.hex_input.text())
+        except ValueError:
+            tab.log.append("<Invalid hex format>")
+            return
+        if not data:
+            tab.log.append("<No data to send>")
+            return
+        if self.multiplexer.write(tab.session.name, data):
+            tab.log.append(f"TX: {to_hex(data)}")
+        else:
+            tab.log.append("<Port is not open>")
+    
+    def close_tab(self, index):
+        """Close a session tab and its port"""
+        tab = self.session_tabs.widget(index)
+        self.multiplexer.remove_port(tab.session.name)
+        self.session_tabs.removeTab(index)
+        tab.deleteLater()
+        self.refresh_ports()
+        self.update_status()
+    
+    def drain_all(self):
+        for index in range(self.session_tabs.count()):
+            self.session_tabs.widget(index).drain()
+        self.update_status()
+    
+    def update_status(self):
+        count = len(self.multiplexer.sessions)
+        self.status_label.setText(
+            f"{count} port(s) on 1 I/O thread, {self.multiplexer.loops} wake-ups"
+        )
+    
+    def closeEvent(self, event):
+        """Close every port and stop the I/O thread"""
+        self.drain_timer.stop()
+        self.multiplexer.stop()
+        event.accept()
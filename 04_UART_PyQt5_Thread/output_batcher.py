@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Output Batcher Module
+ ======================
+ - Coalesces terminal output into frame-rate updates.
+
+ - Any thread may post messages; they are queued under a lock and flushed
+   from the GUI thread by a QTimer as one joined block, so the terminal
+   gets a single append per tick instead of one per message.
+
+ - If the GUI falls far behind, the oldest pending messages are dropped
+   so memory stays bounded.
+
+ - Classes:
+        * OutputBatcher: Thread-safe, timer-flushed message queue
+"""
+
+import threading
+from collections import deque
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer
+
+
+class OutputBatcher(QObject):
+    """Collects messages from any thread and flushes them on a GUI timer"""
+    flushed = pyqtSignal(str)   # joined block of messages
+    stats_changed = pyqtSignal(int, int, int)  # posted, coalesced, dropped
+
+    def __init__(self, interval_ms=40, max_pending=10000, parent=None):
+        super().__init__(parent)
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock()
+        
+        # Counters
+        self.posted = 0
+        self.flushes = 0
+        self.coalesced = 0
+        self.dropped = 0
+        
+        # Flush timer (runs in the thread that created the batcher)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+    
+    def post(self, message):
+        """Queue a message for the next flush (safe to call from any thread)"""
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append(message)
+            self.posted += 1
+    
+    def flush(self):
+        """Emit all pending messages as one block"""
+        with self._lock:
+            if not self._pending:
+                return
+            messages = list(self._pending)
+            self._pending.clear()
+        
+        self.flushes += 1
+        self.coalesced += len(messages) - 1
+        # Joining with newlines matches what separate appends would show
+        self.flushed.emit("\n".join(messages))
+        self.stats_changed.emit(self.posted, self.coalesced, self.dropped)
+    
+    def stop(self):
+        """Stop the timer after delivering anything still pending"""
+        self._timer.stop()
+        self.flush()
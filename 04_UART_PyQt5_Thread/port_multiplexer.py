@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Port Multiplexer Module
+ ========================
+ - Services any number of open serial ports from ONE I/O thread.
+ 
+ - The thread waits on every port's file descriptor with a selector
+   (epoll/kqueue/poll) and only touches ports that are ready, so adding
+   a port costs a registration, not another thread or poll loop.
+ 
+ - RX: readable ports are drained into their session's RingBuffer.
+   TX: writes are queued per session and flushed when the port is
+   writable, so a slow device never blocks the others.
+ 
+ - Ports without a selectable descriptor (Windows COM ports) fall back to
+   a short-interval `in_waiting` poll inside the same thread.
+ 
+ - Classes:
+        * PortSession: One port's buffers, framer and counters
+        * PortMultiplexer: The single I/O thread
+"""
+
+import os
+import socket
+import selectors
+import threading
+from collections import deque
+
+from framing import Framer
+from ring_buffer import RingBuffer
+
+
+# Per-session RX ring buffer size
+SESSION_BUFFER_SIZE = 1 << 20
+
+# Largest single read from a ready port
+READ_CHUNK = 65536
+
+# Selector timeout while non-selectable ports must be polled
+FALLBACK_POLL_INTERVAL = 0.01
+
+
+class PortSession:
+    """State of one multiplexed port (RX buffer is drained by the UI)"""
+    
+    def __init__(self, name, serial_port, buffer_size=SESSION_BUFFER_SIZE):
+        self.name = name
+        self.serial_port = serial_port
+        self.rx_buffer = RingBuffer(buffer_size)
+        self.framer = Framer()
+        self.tx_pending = deque()   # memoryviews still to be written
+        self.fd = None              # None: polled through in_waiting
+        self.error = None
+        
+        # Counters
+        self.rx_bytes = 0
+        self.tx_bytes = 0
+    
+    @property
+    def is_open(self):
+        return self.error is None and self.serial_port.is_open
+
+
+class PortMultiplexer(threading.Thread):
+    """Single I/O thread for all open ports
+    
+    add_port / remove_port / write may be called from any thread; they
+    wake the selector through a socket pair so changes apply immediately.
+    """
+    
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._polled = []           # sessions without a selectable fd
+        self._changes = deque()     # (action, session) applied by the I/O thread
+        self._stop_event = threading.Event()
+        
+        # Wake-ups and loop iterations (cost stays flat as ports are added)
+        self.loops = 0
+    
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Already pending, or shutting down
+    
+    def add_port(self, name, serial_port):
+        """Start servicing an open serial port; returns its PortSession"""
+        session = PortSession(name, serial_port)
+        try:
+            session.fd = serial_port.fileno()
+            os.set_blocking(session.fd, False)
+        except (AttributeError, OSError, ValueError):
+            session.fd = None
+        with self._lock:
+            self.sessions[name] = session
+            self._changes.append(("add", session))
+        self._wake()
+        return session
+    
+    def remove_port(self, name):
+        """Stop servicing a port and close it"""
+        with self._lock:
+            session = self.sessions.pop(name, None)
+            if session is not None:
+                self._changes.append(("remove", session))
+        self._wake()
+        return session
+    
+    def write(self, name, data):
+        """Queue bytes for a port (written by the I/O thread when ready)"""
+        with self._lock:
+            session = self.sessions.get(name)
+            if session is None or session.error is not None:
+                return False
+            session.tx_pending.append(memoryview(bytes(data)))
+            self._changes.append(("write", session))
+        self._wake()
+        return True
+    
+    def _apply_changes(self):
+        with self._lock:
+            changes = list(self._changes)
+            self._changes.clear()
+        for action, session in changes:
+            if action == "add":
+                if session.fd is None:
+                    self._polled.append(session)
+                else:
+                    self._selector.register(session.fd, selectors.EVENT_READ, session)
+            elif action == "remove":
+                self._unregister(session)
+                try:
+                    session.serial_port.close()
+                except Exception:
+                    pass
+            elif action == "write" and session.tx_pending:
+                if session.fd is None:
+                    self._flush_polled(session)
+                else:
+                    self._watch_writable(session, True)
+    
+    def _watch_writable(self, session, enabled):
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if enabled else 0)
+        try:
+            self._selector.modify(session.fd, events, session)
+        except (KeyError, ValueError):
+            pass  # Already removed
+    
+    def _unregister(self, session):
+        if session.fd is None:
+            if session in self._polled:
+                self._polled.remove(session)
+            return
+        try:
+            self._selector.unregister(session.fd)
+        except (KeyError, ValueError):
+            pass
+    
+    def _fail(self, session, error):
+        session.error = error
+        session.tx_pending.clear()
+        self._unregister(session)
+    
+    def _read_ready(self, session):
+        try:
+            data = os.read(session.fd, READ_CHUNK)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._fail(session, e)
+            return
+        if not data:
+            self._fail(session, "device closed")
+            return
+        session.rx_bytes += len(data)
+        session.rx_buffer.write(data)
+    
+    def _write_ready(self, session):
+        pending = session.tx_pending
+        while pending:
+            chunk = pending[0]
+            try:
+                written = os.write(session.fd, chunk)
+            except BlockingIOError:
+                return  # Still full: stay registered for EVENT_WRITE
+            except OSError as e:
+                self._fail(session, e)
+                return
+            session.tx_bytes += written
+            if written < len(chunk):
+                pending[0] = chunk[written:]
+                return
+            pending.popleft()
+        self._watch_writable(session, False)
+    
+    def _flush_polled(self, session):
+        port = session.serial_port
+        try:
+            while session.tx_pending:
+                chunk = session.tx_pending.popleft()
+                port.write(chunk)
+                session.tx_bytes += len(chunk)
+        except Exception as e:
+            self._fail(session, e)
+    
+    def _poll_fallback(self):
+        for session in list(self._polled):
+            port = session.serial_port
+            try:
+                waiting = port.in_waiting
+                if waiting:
+                    data = port.read(waiting)
+                    session.rx_bytes += len(data)
+                    session.rx_buffer.write(data)
+            except Exception as e:
+                self._fail(session, e)
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            timeout = FALLBACK_POLL_INTERVAL if self._polled else None
+            events = self._selector.select(timeout)
+            self.loops += 1
+            for key, mask in events:
+                session = key.data
+                if session is None:
+                    # Wake-up: drain the socket, then apply queued changes
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    continue
+                if mask & selectors.EVENT_READ and session.error is None:
+                    self._read_ready(session)
+                if mask & selectors.EVENT_WRITE and session.error is None:
+                    self._write_ready(session)
+            self._apply_changes()
+            if self._polled:
+                self._poll_fallback()
+    
+    def stop(self, timeout=1.0):
+        """Close every port and stop the I/O thread"""
+        for name in list(self.sessions):
+            self.remove_port(name)
+        self._stop_event.set()
+        self._wake()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+        self._apply_changes()
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
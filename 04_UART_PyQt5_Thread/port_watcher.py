@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Port Watcher Module
+ ====================
+ - Enumerates serial ports on a background thread and keeps a cached,
+   diffed port list, so the GUI never blocks on comports().
+ 
+ - On Linux the watcher first compares a cheap fingerprint of
+   /sys/class/tty (the entries backed by a real device); the full
+   enumeration only runs when that fingerprint changes or a refresh is
+   requested. Elsewhere comports() is re-run every interval, still off
+   the GUI thread.
+ 
+ - Classes:
+        * PortWatcher: Hotplug-aware port enumeration thread
+"""
+
+import os
+import threading
+
+from uart_core import list_ports
+
+
+SYSFS_TTY = "/sys/class/tty"
+
+# Seconds between fingerprint checks (and full scans without sysfs)
+WATCH_INTERVAL = 1.0
+FALLBACK_INTERVAL = 3.0
+
+
+def sysfs_fingerprint():
+    """Names of device-backed tty entries, or None if sysfs is unavailable"""
+    try:
+        names = os.listdir(SYSFS_TTY)
+    except OSError:
+        return None
+    return tuple(sorted(
+        name for name in names
+        if os.path.exists(os.path.join(SYSFS_TTY, name, "device"))
+    ))
+
+
+class PortWatcher(threading.Thread):
+    """Background port enumeration with change notification
+    
+    on_change(added, removed, ports) is called from the watcher thread
+    after the first scan, on every change and after each refresh().
+    """
+    
+    def __init__(self, on_change=None, interval=WATCH_INTERVAL):
+        super().__init__(daemon=True)
+        self.on_change = on_change or (lambda added, removed, ports: None)
+        self.interval = interval
+        self.ports = []             # Cached result of the last scan
+        self.scans = 0              # Full enumerations run so far
+        self._force = True
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+    
+    def refresh(self):
+        """Request a full rescan now (returns immediately)"""
+        self._force = True
+        self._wake.set()
+    
+    def run(self):
+        fingerprint = None
+        while not self._stop_event.is_set():
+            force = self._force
+            self._force = False
+            current = sysfs_fingerprint()
+            if force or current is None or current != fingerprint:
+                fingerprint = current
+                self._scan(force)
+            interval = self.interval if current is not None else max(self.interval, FALLBACK_INTERVAL)
+            self._wake.wait(interval)
+            self._wake.clear()
+    
+    def _scan(self, notify):
+        try:
+            ports = list_ports()
+        except Exception:
+            return  # Keep the cached list; try again next interval
+        self.scans += 1
+        old = set(self.ports)
+        added = [p for p in ports if p not in old]
+        removed = [p for p in self.ports if p not in set(ports)]
+        self.ports = ports
+        if added or removed or notify:
+            self.on_change(added, removed, list(ports))
+    
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
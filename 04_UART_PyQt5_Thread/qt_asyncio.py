@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Qt asyncio Bridge Module
+ =========================
+ - Runs an asyncio event loop inside the Qt event loop, on the GUI thread.
+ 
+ - Every descriptor the asyncio loop watches (serial ports, its own wake-up
+   pipe) gets a QSocketNotifier; when one fires, or when the next asyncio
+   timer is due, the bridge runs exactly one loop iteration. Coroutines
+   therefore resume on the GUI thread and can update widgets directly,
+   with no worker thread and no queued-signal hop.
+ 
+ - Classes:
+        * QtAsyncioBridge: Owns the asyncio loop and drives it from Qt
+"""
+
+import math
+import asyncio
+import selectors
+from PyQt5.QtCore import QObject, QSocketNotifier, QTimer
+
+
+# Fallback tick while tasks are pending (if loop internals are unavailable)
+FALLBACK_TICK_MS = 5
+
+
+class _NotifyingSelector(selectors.DefaultSelector):
+    """Selector that tells the bridge which descriptors to watch"""
+    
+    def __init__(self, bridge):
+        super().__init__()
+        self._bridge = bridge
+    
+    def register(self, fileobj, events, data=None):
+        key = super().register(fileobj, events, data)
+        self._bridge._watch(key.fd, key.events)
+        return key
+    
+    def modify(self, fileobj, events, data=None):
+        key = super().modify(fileobj, events, data)
+        self._bridge._watch(key.fd, key.events)
+        return key
+    
+    def unregister(self, fileobj):
+        key = super().unregister(fileobj)
+        self._bridge._unwatch(key.fd)
+        return key
+
+
+class QtAsyncioBridge(QObject):
+    """asyncio loop driven by Qt socket notifiers and a single-shot timer"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._notifiers = {}    # fd -> (read notifier, write notifier)
+        self._ticking = False
+        self.loop = asyncio.SelectorEventLoop(_NotifyingSelector(self))
+        
+        # Fires when the earliest asyncio timer (call_later, wait_for) is due
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.tick)
+        
+        # Loop iterations run so far
+        self.ticks = 0
+    
+    def _watch(self, fd, events):
+        notifiers = self._notifiers.get(fd)
+        if notifiers is None:
+            notifiers = (QSocketNotifier(fd, QSocketNotifier.Read, self),
+                         QSocketNotifier(fd, QSocketNotifier.Write, self))
+            for notifier in notifiers:
+                notifier.activated.connect(self.tick)
+            self._notifiers[fd] = notifiers
+        notifiers[0].setEnabled(bool(events & selectors.EVENT_READ))
+        notifiers[1].setEnabled(bool(events & selectors.EVENT_WRITE))
+    
+    def _unwatch(self, fd):
+        for notifier in self._notifiers.pop(fd, ()):
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+    
+    def tick(self, *args):
+        """Run one iteration of the asyncio loop"""
+        if self._ticking or self.loop.is_closed():
+            return
+        self._ticking = True
+        try:
+            self.loop.call_soon(self.loop.stop)
+            self.loop.run_forever()
+            self.ticks += 1
+        finally:
+            self._ticking = False
+        self._schedule()
+    
+    def _schedule(self):
+        """Arm the timer for the next callback or timer the loop has queued"""
+        # asyncio has no public "next deadline" API; read its queues and
+        # fall back to a short periodic tick if they ever disappear
+        ready = getattr(self.loop, "_ready", None)
+        scheduled = getattr(self.loop, "_scheduled", None)
+        if ready is None or scheduled is None:
+            if asyncio.all_tasks(self.loop):
+                self._timer.start(FALLBACK_TICK_MS)
+        elif ready:
+            self._timer.start(0)
+        elif scheduled:
+            delay = scheduled[0].when() - self.loop.time()
+            self._timer.start(max(0, math.ceil(delay * 1000)))
+    
+    def create_task(self, coro):
+        """Schedule a coroutine on the loop; it starts on the next tick"""
+        task = self.loop.create_task(coro)
+        self._timer.start(0)
+        return task
+    
+    def close(self):
+        """Cancel pending tasks and close the loop"""
+        if self.loop.is_closed():
+            return
+        self._timer.stop()
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+        for fd in list(self._notifiers):
+            self._unwatch(fd)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Response Reader Module
+ =======================
+ - Event-driven collection of one device response after a transmit.
+
+ - Instead of sleeping and polling `in_waiting`, the port is read with
+   blocking reads whose timeout is the time left before the response is
+   considered complete, so a read returns as soon as bytes arrive.
+
+ - A response is complete when one of these holds:
+        1. Expected length reached
+        2. Terminator bytes received
+        3. Idle gap elapsed after the last byte (derived from the baud rate)
+        4. Overall timeout (counted as a timeout)
+
+ - Classes:
+        * ResponseRule: Completion condition for one response
+
+ - Functions:
+        * idle_gap: Inter-byte gap for a baud rate
+        * read_response: Read one response from an open port
+"""
+
+import time
+
+
+# Granularity at which a waiting read notices a stop request
+STOP_POLL_INTERVAL = 0.1
+
+
+def idle_gap(baudrate, char_times=20, minimum=0.01):
+    """Silence (seconds) after which a response is treated as finished
+    
+    One 8N1 character is 10 bits on the wire. The floor covers USB-serial
+    adapters, which deliver bytes in bursts every few milliseconds.
+    """
+    return max(minimum, char_times * 10.0 / baudrate)
+
+
+class ResponseRule:
+    """Completion condition for one response"""
+
+    def __init__(self, expected_length=None, terminator=None, gap=None, timeout=2.0):
+        self.expected_length = expected_length
+        self.terminator = bytes(terminator) if terminator else None
+        self.gap = gap
+        self.timeout = timeout
+    
+    @classmethod
+    def for_gap(cls, baudrate, gap=None, timeout=2.0):
+        """Rule that ends on silence; gap defaults to idle_gap(baudrate)"""
+        return cls(gap=gap if gap is not None else idle_gap(baudrate), timeout=timeout)
+    
+    def is_complete(self, data, scan_from=0):
+        """Check whether data is a complete response
+        
+        Only bytes from scan_from on (plus a terminator-sized overlap)
+        are searched, so a growing buffer is never re-scanned.
+        """
+        if self.expected_length and len(data) >= self.expected_length:
+            return True
+        if self.terminator:
+            start = max(0, scan_from - len(self.terminator) + 1)
+            return data.find(self.terminator, start) >= 0
+        return False
+    
+    def describe(self):
+        """Short human-readable form of the rule"""
+        if self.expected_length:
+            return f"{self.expected_length} bytes"
+        if self.terminator:
+            return f"terminator {self.terminator.hex(' ').upper()}"
+        return f"{self.gap * 1000:.1f} ms gap"
+
+
+def read_response(port, rule, stop_event=None, timing=None):
+    """Read one response from an open serial port
+    
+    Returns (data, timed_out). A gap-completed response is not a timeout.
+    If timing is a dict, the perf_counter() times the first and last bytes
+    arrived are stored under "first_byte" and "last_byte".
+    """
+    data = bytearray()
+    deadline = time.monotonic() + rule.timeout
+    saved_timeout = port.timeout
+    timed_out = False
+    
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            if stop_event is not None and stop_event.is_set():
+                break
+            
+            # Wait for the first byte (or the next one, if no gap rule) in
+            # slices so a stop request is noticed; after data, wait only
+            # for the idle gap
+            gap_wait = bool(data) and rule.gap is not None
+            port.timeout = min(rule.gap if gap_wait else STOP_POLL_INTERVAL, remaining)
+            
+            want = max(1, port.in_waiting)
+            if rule.expected_length:
+                want = min(want, rule.expected_length - len(data))
+            chunk = port.read(want)
+            
+            if chunk:
+                if timing is not None:
+                    now = time.perf_counter()
+                    timing.setdefault("first_byte", now)
+                    timing["last_byte"] = now
+                scan_from = len(data)
+                data.extend(chunk)
+                if rule.is_complete(data, scan_from):
+                    break
+            elif gap_wait:
+                break
+    finally:
+        port.timeout = saved_timeout
+    
+    return bytes(data), timed_out
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Sequence Runner Module
+ =======================
+ - Runs a scripted sequence of hex commands over one open connection and
+   reports throughput and per-step latency.
+ 
+ - Sequence file format (one step per line, '#' starts a comment):
+        01 02 03                        send only, don't wait
+        01 02 03 | expect 06 ?? 00      wait for the response and check it
+        01 02 03 | expect 06 *          '*' at the end: any trailing bytes
+        AA 55 | wait 50                 pause 50 ms after the step
+        AA 55 | expect 06 | timeout 500 per-step response timeout (ms)
+ 
+ - Steps without `expect` are written back to back; a run of them goes
+   out as one write where the transport supports batching (one TCP
+   segment instead of one per step). With a pipeline depth above 1 (and
+   a framing other than Raw, so responses can be told apart) up to
+   `depth` responses may be outstanding; they are matched to the steps
+   in order.
+ 
+ - Classes:
+        * SequenceStep: One parsed line
+        * StepResult: Outcome of one step
+        * SequenceReport: Totals, rates and latency percentiles
+        * SequenceRunner: Executes steps on a UARTCore
+ 
+ - Functions:
+        * parse_sequence / load_sequence: Sequence text to steps
+        * percentile: Nearest-rank percentile of sorted values
+"""
+
+import math
+import time
+from collections import deque
+
+from framing import Framer
+from hex_format import parse_hex, to_hex
+
+
+# Largest run of send-only steps written as one batch
+MAX_BATCH_BYTES = 64 * 1024
+
+
+class SequenceStep:
+    """One command of a sequence"""
+    
+    def __init__(self, data, expect=None, mask=None, prefix=False, wait=0.0,
+                 timeout=None, line=0):
+        self.data = data
+        self.expect = expect        # Expected response bytes (None: don't wait)
+        self.mask = mask            # 0xFF for bytes that must match, 0x00 for ??
+        self.prefix = prefix        # Response may be longer than expect
+        self.wait = wait            # Seconds to pause after the step
+        self.timeout = timeout      # Seconds, None: use the rule's timeout
+        self.line = line
+    
+    def matches(self, response):
+        """Check a response against the expected bytes and wildcard mask"""
+        expect = self.expect
+        if len(response) < len(expect) or (not self.prefix and len(response) != len(expect)):
+            return False
+        if self.mask is None:
+            return response[:len(expect)] == expect
+        return all(m == 0 or r == e for r, e, m in zip(response, expect, self.mask))
+
+
+def parse_pattern(text):
+    """Parse expected-response text with ?? wildcards and an optional trailing *"""
+    tokens = text.split()
+    prefix = bool(tokens) and tokens[-1] == "*"
+    if prefix:
+        tokens = tokens[:-1]
+    # Split unspaced hex ("0601") into byte tokens as well
+    pairs = []
+    for token in tokens:
+        if len(token) % 2:
+            raise ValueError(f"odd-length hex '{token}'")
+        pairs.extend(token[i:i + 2] for i in range(0, len(token), 2))
+    expect = bytes(0 if p == "??" else int(p, 16) for p in pairs)
+    mask = bytes(0 if p == "??" else 0xFF for p in pairs)
+    return expect, (mask if 0 in mask else None), prefix
+
+
+def parse_sequence(text):
+    """Parse sequence text into steps (raises ValueError with the line number)"""
+    steps = []
+    for number, raw_line in enumerate(text.splitlines(), 1):
+        line = raw_line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = [part.strip() for part in line.split("|")]
+        try:
+            step = SequenceStep(parse_hex(parts[0]), line=number)
+            if not step.data:
+                raise ValueError("nothing to send")
+            for option in parts[1:]:
+                keyword, _, value = option.partition(" ")
+                value = value.strip()
+                if keyword == "expect":
+                    step.expect, step.mask, step.prefix = parse_pattern(value)
+                elif keyword == "wait":
+                    step.wait = float(value) / 1000.0
+                elif keyword == "timeout":
+                    step.timeout = float(value) / 1000.0
+                else:
+                    raise ValueError(f"unknown option '{keyword}'")
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}") from None
+        steps.append(step)
+    return steps
+
+
+def load_sequence(path):
+    """Read and parse a sequence file"""
+    with open(path, "r") as f:
+        return parse_sequence(f.read())
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile (p in 0-100) of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p * len(sorted_values) / 100.0))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class StepResult:
+    """Outcome of one executed step"""
+    
+    def __init__(self, step, latency, response=None, ok=True, error=None):
+        self.step = step
+        self.latency = latency      # Seconds from write to response (or write done)
+        self.response = response
+        self.ok = ok
+        self.error = error
+    
+    def describe(self):
+        """One terminal line for this result"""
+        text = f"[line {self.step.line}] TX: {to_hex(self.step.data)}"
+        if self.response is not None:
+            text += f" -> RX: {to_hex(self.response)}"
+        text += f" ({self.latency * 1000:.2f} ms)"
+        if not self.ok:
+            text += f" FAILED: {self.error}"
+        return text
+
+
+class SequenceReport:
+    """Totals, rates and latency percentiles of a run"""
+    
+    def __init__(self, results, elapsed, tx_bytes, rx_bytes, stopped=False):
+        self.results = results
+        self.elapsed = elapsed
+        self.tx_bytes = tx_bytes
+        self.rx_bytes = rx_bytes
+        self.stopped = stopped
+        self.failures = [r for r in results if not r.ok]
+        self.latencies = sorted(r.latency for r in results if r.step.expect is not None)
+    
+    @property
+    def commands_per_sec(self):
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def bytes_per_sec(self):
+        return (self.tx_bytes + self.rx_bytes) / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def summary_lines(self):
+        """Human-readable report"""
+        lines = [
+            f"Steps: {len(self.results)} ({len(self.failures)} failed)"
+            + (" - stopped early" if self.stopped else ""),
+            f"Elapsed: {self.elapsed:.3f} s",
+            f"Throughput: {self.commands_per_sec:.1f} commands/s, {self.bytes_per_sec:.0f} bytes/s "
+            f"(TX {self.tx_bytes} B, RX {self.rx_bytes} B)",
+        ]
+        if self.latencies:
+            values = self.latencies
+            lines.append(
+                "Latency (ms): "
+                + ", ".join(f"p{p} {percentile(values, p) * 1000:.2f}" for p in (50, 90, 99))
+                + f", max {values[-1] * 1000:.2f}"
+            )
+        return lines
+
+
+class SequenceRunner:
+    """Executes a sequence on a connected UARTCore
+    
+    The core must be connected and not monitoring (this runner reads the
+    port itself). Responses end according to `rule` (a ResponseRule); in
+    pipelined mode they are split by the core's framer instead.
+    """
+    
+    def __init__(self, core, steps, rule, depth=1, stop_event=None, on_result=None):
+        self.core = core
+        self.steps = steps
+        self.rule = rule
+        self.depth = max(1, depth)
+        self.stop_event = stop_event
+        self.on_result = on_result or (lambda result: None)
+        self.tx_bytes = 0
+        self.rx_bytes = 0
+    
+    def _stopped(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+    
+    def _finish(self, results, result):
+        results.append(result)
+        self.on_result(result)
+    
+    def run(self, repeat=1):
+        """Run the sequence `repeat` times; returns a SequenceReport"""
+        pipelined = self.depth > 1 and type(self.core.framer) is not Framer
+        steps = self.steps * repeat
+        results = []
+        start = time.perf_counter()
+        if pipelined:
+            self._run_pipelined(steps, results)
+        else:
+            self._run_serial(steps, results)
+        elapsed = time.perf_counter() - start
+        return SequenceReport(results, elapsed, self.tx_bytes, self.rx_bytes,
+                              stopped=len(results) < len(steps))
+    
+    def _send_batch(self, steps, index, results):
+        """Write the run of send-only steps starting at index as one batch
+        
+        Returns the index after the run (index itself if there is no run
+        of two or more, or the transport can't batch).
+        """
+        batch = getattr(self.core.serial_port, "batch", None)
+        end = index
+        size = 0
+        while (end < len(steps) and steps[end].expect is None and not steps[end].wait
+               and size < MAX_BATCH_BYTES):
+            size += len(steps[end].data)
+            end += 1
+        if batch is None or end - index < 2:
+            return index
+        sent = time.perf_counter()
+        with batch():
+            for step in steps[index:end]:
+                self.core.send(step.data)
+                self.tx_bytes += len(step.data)
+        done = time.perf_counter()
+        for step in steps[index:end]:
+            self._finish(results, StepResult(step, done - sent))
+        return end
+    
+    def _run_serial(self, steps, results):
+        """One step at a time: write, then wait for its response if expected"""
+        core = self.core
+        index = 0
+        while index < len(steps):
+            if self._stopped():
+                return
+            batched = self._send_batch(steps, index, results)
+            if batched > index:
+                index = batched
+                continue
+            step = steps[index]
+            index += 1
+            sent = time.perf_counter()
+            core.send(step.data)
+            self.tx_bytes += len(step.data)
+            
+            if step.expect is None:
+                self._finish(results, StepResult(step, time.perf_counter() - sent))
+            else:
+                rule = self.rule
+                if step.timeout is not None:
+                    rule = type(rule)(rule.expected_length, rule.terminator, rule.gap, step.timeout)
+                response, timed_out = core.read_response(rule, self.stop_event)
+                latency = time.perf_counter() - sent
+                self.rx_bytes += len(response)
+                if not response:
+                    result = StepResult(step, latency, response, False, "no response")
+                elif not step.matches(response):
+                    result = StepResult(step, latency, response, False, "unexpected response")
+                else:
+                    result = StepResult(step, latency, response)
+                self._finish(results, result)
+            
+            if step.wait:
+                time.sleep(step.wait)
+    
+    def _run_pipelined(self, steps, results):
+        """Keep up to `depth` responses outstanding, matched in order by frame"""
+        core = self.core
+        port = core.serial_port
+        framer = core.framer
+        framer.reset()
+        outstanding = deque()   # (step, sent_time, deadline)
+        saved_timeout = port.timeout
+        
+        def collect(block):
+            # Read once (blocking up to the oldest deadline if block) and
+            # resolve outstanding steps with the frames that completed
+            now = time.perf_counter()
+            if block:
+                port.timeout = max(0.0, min(0.1, outstanding[0][2] - now))
+            else:
+                port.timeout = 0
+            chunk = port.read(max(1, port.in_waiting))
+            if chunk:
+                core.record_rx(chunk)
+                self.rx_bytes += len(chunk)
+                arrived = time.perf_counter()
+                for frame in framer.feed(chunk):
+                    if not outstanding:
+                        break  # Unsolicited frame
+                    step, sent, deadline = outstanding.popleft()
+                    if step.matches(frame):
+                        result = StepResult(step, arrived - sent, frame)
+                    else:
+                        result = StepResult(step, arrived - sent, frame, False,
+                                            "unexpected response")
+                    self._finish(results, result)
+            # Expire responses that did not arrive in time
+            now = time.perf_counter()
+            while outstanding and outstanding[0][2] <= now:
+                step, sent, deadline = outstanding.popleft()
+                self._finish(results, StepResult(step, now - sent, None, False, "no response"))
+        
+        try:
+            index = 0
+            while index < len(steps):
+                while len(outstanding) >= self.depth and not self._stopped():
+                    collect(block=True)
+                if self._stopped():
+                    return
+                batched = self._send_batch(steps, index, results)
+                if batched > index:
+                    index = batched
+                    continue
+                step = steps[index]
+                index += 1
+                sent = time.perf_counter()
+                core.send(step.data)
+                self.tx_bytes += len(step.data)
+                if step.expect is None:
+                    self._finish(results, StepResult(step, time.perf_counter() - sent))
+                else:
+                    timeout = step.timeout if step.timeout is not None else self.rule.timeout
+                    outstanding.append((step, sent, sent + timeout))
+                    if port.in_waiting:
+                        collect(block=False)
+                if step.wait:
+                    # A pause means "let the device settle": drain first
+                    while outstanding and not self._stopped():
+                        collect(block=True)
+                    time.sleep(step.wait)
+            while outstanding and not self._stopped():
+                collect(block=True)
+        finally:
+            port.timeout = saved_timeout
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Stats Panel Module
+ ===================
+ - Live view of TransactionStats: percentile table, rolling histogram of
+   one metric, and JSON / CSV export. A second line shows the open
+   link's own latency and throughput (transports.py), when given one.
+ 
+ - Refreshes on a timer only while visible, so a hidden panel costs
+   nothing during heavy traffic.
+ 
+ - Classes:
+        * HistogramWidget: Bar chart of histogram bucket counts
+        * StatsPanel: Table, histogram and export buttons
+"""
+
+from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtGui import QPainter, QColor
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                             QPushButton, QTableWidget, QTableWidgetItem, QFileDialog,
+                             QHeaderView)
+
+from transaction_stats import TransactionStats, METRICS, BUCKET_BOUNDS_MS
+
+
+REFRESH_INTERVAL_MS = 500
+
+METRIC_LABELS = {
+    "open": "Port open",
+    "write": "Write",
+    "ttfb": "Time to first byte",
+    "ttlb": "Time to last byte",
+}
+
+COLUMNS = ["Metric", "Count", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Max (ms)"]
+
+
+class HistogramWidget(QWidget):
+    """Bar per bucket, labelled with the bucket's upper bound"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.counts = []
+        self.labels = [f"{b:g}" for b in BUCKET_BOUNDS_MS] + ["more"]
+        self.setMinimumHeight(120)
+    
+    def set_counts(self, counts):
+        self.counts = counts
+        self.update()
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        metrics = painter.fontMetrics()
+        label_height = metrics.height() + 2
+        width = self.width()
+        height = self.height() - label_height
+        slots = len(self.labels)
+        slot = width / slots
+        peak = max(self.counts) if self.counts and max(self.counts) else 1
+        
+        painter.setPen(self.palette().windowText().color())
+        for index, label in enumerate(self.labels):
+            x = index * slot
+            count = self.counts[index] if index < len(self.counts) else 0
+            if count:
+                bar = (height - 2) * count / peak
+                painter.fillRect(QRectF(x + 1, height - bar, slot - 2, bar), QColor(70, 130, 180))
+            painter.drawText(QRectF(x, height, slot, label_height),
+                             Qt.AlignHCenter | Qt.AlignTop, label)
+        painter.end()
+
+
+class StatsPanel(QWidget):
+    """Transaction timing table, histogram and export"""
+    
+    def __init__(self, stats=None, parent=None):
+        super().__init__(parent)
+        self.stats = stats or TransactionStats()
+        # Callable returning the link's stats line (or None)
+        self.link_stats = None
+        
+        self.summary_label = QLabel()
+        self.link_label = QLabel()
+        
+        self.table = QTableWidget(len(METRICS), len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        for row, metric in enumerate(METRICS):
+            self.table.setItem(row, 0, QTableWidgetItem(METRIC_LABELS[metric]))
+        
+        self.histogram_combo = QComboBox()
+        for metric in METRICS:
+            self.histogram_combo.addItem(METRIC_LABELS[metric], metric)
+        self.histogram_combo.setCurrentIndex(METRICS.index("ttlb"))
+        self.histogram = HistogramWidget()
+        
+        self.export_json_button = QPushButton("Export JSON...")
+        self.export_csv_button = QPushButton("Export CSV...")
+        self.reset_button = QPushButton("Reset")
+        
+        histogram_layout = QHBoxLayout()
+        histogram_layout.addWidget(QLabel("Histogram (ms):"))
+        histogram_layout.addWidget(self.histogram_combo)
+        histogram_layout.addStretch()
+        
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.export_json_button)
+        button_layout.addWidget(self.export_csv_button)
+        button_layout.addWidget(self.reset_button)
+        button_layout.addStretch()
+        
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(self.link_label)
+        layout.addWidget(self.table)
+        layout.addLayout(histogram_layout)
+        layout.addWidget(self.histogram, 1)
+        layout.addLayout(button_layout)
+        
+        self.histogram_combo.currentIndexChanged.connect(self.refresh)
+        self.export_json_button.clicked.connect(self.export_json)
+        self.export_csv_button.clicked.connect(self.export_csv)
+        self.reset_button.clicked.connect(self.reset)
+        
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+        self.refresh()
+    
+    def refresh(self):
+        """Redraw from a stats snapshot (skipped while hidden)"""
+        if not self.isVisible():
+            return
+        summary = self.stats.summary()
+        self.summary_label.setText(
+            f"Transactions: {summary['transactions']} ({summary['timeouts']} timed out), "
+            f"TX {summary['tx_bytes']} B, RX {summary['rx_bytes']} B, "
+            f"window: last {summary['window']}"
+        )
+        link = self.link_stats() if self.link_stats is not None else None
+        self.link_label.setText(f"Link: {link}" if link else "Link: -")
+        for row, metric in enumerate(METRICS):
+            entry = summary[metric]
+            values = [str(entry["count"])] + [
+                "-" if entry[key] is None else f"{entry[key]:.3f}"
+                for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms")
+            ]
+            for column, text in enumerate(values, 1):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        self.histogram.set_counts(summary[self.histogram_combo.currentData()]["buckets"])
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+    
+    def reset(self):
+        self.stats.reset()
+        self.refresh()
+    
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Statistics", "transactions.json",
+                                              "JSON (*.json);;All files (*)")
+        if path:
+            self.export(self.stats.export_json, path)
+    
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Statistics", "transactions.csv",
+                                              "CSV (*.csv);;All files (*)")
+        if path:
+            self.export(self.stats.export_csv, path)
+    
+    def export(self, writer, path):
+        try:
+            writer(path)
+            self.summary_label.setText(f"<Exported to {path}>")
+        except OSError as e:
+            self.summary_label.setText(f"<Export error: {str(e)}>")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Telemetry Module
+ =================
+ - Decodes RX frames into typed numeric channels held in NumPy arrays,
+   and reduces them to plot-sized min/max envelopes.
+ 
+ - Record layout: comma-separated fields, optionally named, e.g.
+        temp:i16le, pressure:f32be, x2
+   Types are i8/u8/i16/u16/i32/u32/i64/u64/f32/f64 with an le (default)
+   or be suffix; xN skips N bytes (headers, checksums). A frame may hold
+   several records back to back. With Raw framing the byte stream is cut
+   into records directly.
+ 
+ - Samples go into one growable float64 array per decoder: it doubles in
+   size up to twice the history window, then the newest `history`
+   samples are moved to the front. Memory is bounded by the window and
+   appends stay amortized O(1).
+ 
+ - Decimation: each plot pixel column gets the min and the max of the
+   samples it covers (np.fmin/fmax.reduceat), so spikes survive
+   and the cost of a redraw depends on the width, not the point count.
+ 
+ - Classes:
+        * SampleBuffer: Growable, history-bounded 2D sample array
+        * TelemetryDecoder: Layout, frame decoding and thread-safe access
+ 
+ - Functions:
+        * parse_layout: Layout text to channel names and a NumPy dtype
+        * minmax_decimate: Min/max envelope of samples per bucket
+"""
+
+import re
+import threading
+
+import numpy as np
+
+
+TYPE_SIZES = {"i8": 1, "u8": 1, "i16": 2, "u16": 2, "i32": 4, "u32": 4,
+              "i64": 8, "u64": 8, "f32": 4, "f64": 8}
+
+DEFAULT_HISTORY = 1000000
+INITIAL_CAPACITY = 4096
+
+FIELD = re.compile(r"^(?:([A-Za-z_][\w ]*)\s*:\s*)?([iuf](?:8|16|32|64))(le|be)?$", re.IGNORECASE)
+PADDING = re.compile(r"^x(\d*)$", re.IGNORECASE)
+
+
+def parse_layout(text):
+    """Parse a record layout; returns (channel names, dtype) (raises ValueError)"""
+    names, formats, offsets = [], [], []
+    offset = 0
+    for field in (part.strip() for part in text.split(",")):
+        if not field:
+            continue
+        padding = PADDING.match(field)
+        if padding:
+            offset += int(padding.group(1) or 1)
+            continue
+        match = FIELD.match(field)
+        if not match:
+            raise ValueError(f"bad field '{field}' (e.g. temp:i16le, f32be, x2)")
+        name, kind, order = match.groups()
+        kind = kind.lower()
+        if kind in ("f8", "f16"):
+            raise ValueError(f"unsupported float size in '{field}'")
+        name = (name or f"ch{len(names) + 1}").strip()
+        if name in names:
+            raise ValueError(f"duplicate channel name '{name}'")
+        endian = ">" if (order or "le").lower() == "be" else "<"
+        size = TYPE_SIZES[kind]
+        names.append(name)
+        formats.append(f"{endian}{kind[0]}{size}")
+        offsets.append(offset)
+        offset += size
+    if not names:
+        raise ValueError("layout has no channels")
+    dtype = np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": offset})
+    return names, dtype
+
+
+def minmax_decimate(y, buckets):
+    """Min/max envelope of y (samples x channels) in at most `buckets` columns
+    
+    Returns (positions, values): positions are row offsets into y, values
+    alternate bucket minimum and maximum. Small inputs are returned as is.
+    """
+    count = len(y)
+    if count <= 2 * buckets:
+        return np.arange(count), y
+    edges = np.linspace(0, count, buckets + 1).astype(np.int64)[:-1]
+    values = np.empty((2 * buckets, y.shape[1]), dtype=y.dtype)
+    # fmin / fmax skip NaN (e.g. garbage float32 records) instead of spreading it
+    values[0::2] = np.fmin.reduceat(y, edges, axis=0)
+    values[1::2] = np.fmax.reduceat(y, edges, axis=0)
+    return np.repeat(edges, 2), values
+
+
+class SampleBuffer:
+    """Rows of channel samples; keeps at most `history` of the newest"""
+    
+    def __init__(self, channels, history=DEFAULT_HISTORY):
+        self.history = max(1, int(history))
+        self._data = np.empty((min(INITIAL_CAPACITY, 2 * self.history), channels))
+        self._start = 0
+        self._end = 0
+        self.total = 0              # Samples appended so far (global index of the next)
+    
+    def __len__(self):
+        return self._end - self._start
+    
+    @property
+    def first_index(self):
+        """Global sample index of the oldest row kept"""
+        return self.total - len(self)
+    
+    def append(self, rows):
+        count = len(rows)
+        if not count:
+            return
+        self.total += count
+        if count >= self.history:
+            if len(self._data) < self.history:
+                self._data = np.empty((2 * self.history, self._data.shape[1]))
+            self._data[:self.history] = rows[-self.history:]
+            self._start, self._end = 0, self.history
+            return
+        
+        if self._end + count > len(self._data):
+            keep = min(len(self), self.history - count)
+            live = self._data[self._end - keep:self._end]
+            if len(self._data) < 2 * self.history:
+                # Grow: double, up to twice the window
+                capacity = min(2 * self.history, max(2 * len(self._data), keep + count))
+                data = np.empty((capacity, self._data.shape[1]))
+                data[:keep] = live
+                self._data = data
+            else:
+                # Full size: slide the newest samples to the front
+                self._data[:keep] = live
+            self._start, self._end = 0, keep
+        
+        self._data[self._end:self._end + count] = rows
+        self._end += count
+        if len(self) > self.history:
+            self._start = self._end - self.history
+    
+    def view(self):
+        """The kept rows (valid until the next append)"""
+        return self._data[self._start:self._end]
+
+
+class TelemetryDecoder:
+    """Decodes frames into a SampleBuffer; safe to feed from any thread"""
+    
+    def __init__(self, layout, history=DEFAULT_HISTORY):
+        self.layout = layout
+        self.names, self.dtype = parse_layout(layout)
+        self.buffer = SampleBuffer(len(self.names), history)
+        self.bad_frames = 0         # Frames whose length isn't a whole number of records
+        self.version = 0            # Bumped on every change, for redraw checks
+        self._remainder = b""       # Partial record (Raw stream mode)
+        self._lock = threading.Lock()
+    
+    @property
+    def record_size(self):
+        return self.dtype.itemsize
+    
+    def feed(self, frames, stream=False):
+        """Decode RX frames; with stream, frames are raw chunks of one byte stream"""
+        size = self.dtype.itemsize
+        if stream:
+            data = self._remainder + b"".join(frames)
+            whole = len(data) - len(data) % size
+            self._remainder = data[whole:]
+            data = data[:whole]
+        else:
+            good = [frame for frame in frames if frame and len(frame) % size == 0]
+            bad = len(frames) - len(good)
+            data = b"".join(good)
+        if not data and (stream or not bad):
+            return
+        
+        records = np.frombuffer(data, dtype=self.dtype)
+        rows = np.empty((len(records), len(self.names)))
+        with np.errstate(invalid="ignore", over="ignore"):
+            for column, name in enumerate(self.names):
+                rows[:, column] = records[name]
+        with self._lock:
+            if not stream:
+                self.bad_frames += bad
+            self.buffer.append(rows)
+            self.version += 1
+    
+    def clear(self):
+        with self._lock:
+            self.buffer = SampleBuffer(len(self.names), self.buffer.history)
+            self._remainder = b""
+            self.bad_frames = 0
+            self.version += 1
+    
+    def envelope(self, buckets, span=0):
+        """Plot data for the newest `span` samples (0: all kept)
+        
+        Returns (x, y, total): x are global sample indices, y the min/max
+        envelope per channel, total the number of samples decoded so far.
+        """
+        with self._lock:
+            rows = self.buffer.view()
+            first = self.buffer.first_index
+            if span and len(rows) > span:
+                first += len(rows) - span
+                rows = rows[-span:]
+            positions, values = minmax_decimate(rows, buckets)
+            # reduceat results are new arrays, but small inputs come back as views
+            if values is rows:
+                values = rows.copy()
+            return positions + first, values, self.buffer.total
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Telemetry View Module
+ ======================
+ - "Telemetry" tab: record layout, history window and a live plot of the
+   decoded channels.
+ 
+ - Each redraw asks the decoder for a min/max envelope one bucket per
+   pixel column wide, so drawing cost depends on the plot width and not
+   on how many samples are kept. Points are copied into the QPolygonF
+   straight from NumPy, without a Python loop.
+ 
+ - Redraws run on a timer, only while the tab is visible and new
+   samples have arrived.
+ 
+ - Classes:
+        * PlotWidget: QPainter line plot of envelope data
+        * TelemetryView: Layout controls, status and plot
+"""
+
+import numpy as np
+from PyQt5.QtCore import Qt, QTimer, QRectF, QPointF
+from PyQt5.QtGui import QPainter, QColor, QPen, QPolygonF
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QSpinBox)
+
+from telemetry import TelemetryDecoder, DEFAULT_HISTORY
+
+
+REFRESH_INTERVAL_MS = 33
+
+COLORS = [QColor(31, 119, 180), QColor(255, 127, 14), QColor(44, 160, 44),
+          QColor(214, 39, 40), QColor(148, 103, 189), QColor(140, 86, 75),
+          QColor(227, 119, 194), QColor(127, 127, 127)]
+
+
+def make_polygon(x, y):
+    """QPolygonF from coordinate arrays, filled through its raw buffer"""
+    count = len(x)
+    polygon = QPolygonF(count)
+    pointer = polygon.data()
+    pointer.setsize(count * 2 * np.dtype(np.float64).itemsize)
+    points = np.frombuffer(pointer, dtype=np.float64).reshape(count, 2)
+    points[:, 0] = x
+    points[:, 1] = y
+    return polygon
+
+
+class PlotWidget(QWidget):
+    """Line per channel over a shared x axis (sample index)"""
+    
+    MARGIN_LEFT = 70
+    MARGIN_BOTTOM = 20
+    MARGIN = 6
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.x = np.empty(0)
+        self.y = np.empty((0, 0))
+        self.names = []
+        self.setMinimumHeight(160)
+    
+    def plot_width(self):
+        """Pixel columns available for data (the decimation bucket count)"""
+        return max(1, self.width() - self.MARGIN_LEFT - self.MARGIN)
+    
+    def set_data(self, x, y, names):
+        self.x, self.y, self.names = x, y, names
+        self.update()
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        text_color = self.palette().text().color()
+        left, top = self.MARGIN_LEFT, self.MARGIN
+        width = self.plot_width()
+        height = max(1, self.height() - top - self.MARGIN_BOTTOM)
+        painter.setPen(QPen(text_color.lighter(300) if text_color.value() < 128 else text_color))
+        painter.drawRect(QRectF(left, top, width, height))
+        
+        x, y = self.x, self.y
+        if len(x) == 0 or not np.isfinite(y).any():
+            painter.setPen(text_color)
+            painter.drawText(QRectF(left, top, width, height), Qt.AlignCenter, "No samples")
+            painter.end()
+            return
+        
+        x0, x1 = float(x[0]), float(x[-1])
+        y0, y1 = float(np.nanmin(y)), float(np.nanmax(y))
+        if x1 == x0:
+            x1 = x0 + 1
+        if y1 == y0:
+            y0, y1 = y0 - 1, y1 + 1
+        px = left + (x - x0) * (width / (x1 - x0))
+        
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        for column in range(y.shape[1]):
+            values = y[:, column]
+            finite = np.isfinite(values)
+            if not finite.any():
+                continue
+            py = top + (y1 - values[finite]) * (height / (y1 - y0))
+            painter.setPen(QPen(COLORS[column % len(COLORS)], 1))
+            painter.drawPolyline(make_polygon(px[finite], py))
+        
+        # Axis labels and legend
+        metrics = painter.fontMetrics()
+        line = metrics.height()
+        painter.setPen(text_color)
+        painter.drawText(QRectF(0, top, left - 4, line), Qt.AlignRight, f"{y1:.6g}")
+        painter.drawText(QRectF(0, top + height - line, left - 4, line), Qt.AlignRight, f"{y0:.6g}")
+        painter.drawText(QRectF(left, top + height, width, line), Qt.AlignLeft, f"{x0:.0f}")
+        painter.drawText(QRectF(left, top + height, width, line), Qt.AlignRight, f"{x1:.0f}")
+        for index, name in enumerate(self.names):
+            painter.setPen(COLORS[index % len(COLORS)])
+            painter.drawText(QPointF(left + 6, top + (index + 1) * line), name)
+        painter.end()
+
+
+class TelemetryView(QWidget):
+    """Record layout, history window and live plot"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.decoder = None
+        self.drawn_version = None
+        
+        self.layout_input = QLineEdit()
+        self.layout_input.setPlaceholderText("Record layout, e.g. temp:i16le, pressure:f32be, x2")
+        self.apply_button = QPushButton("Apply")
+        self.clear_button = QPushButton("Clear")
+        
+        self.history_spin = QSpinBox()
+        self.history_spin.setRange(1000, 50000000)
+        self.history_spin.setSingleStep(100000)
+        self.history_spin.setValue(DEFAULT_HISTORY)
+        self.span_spin = QSpinBox()
+        self.span_spin.setRange(0, 50000000)
+        self.span_spin.setSingleStep(1000)
+        self.span_spin.setSpecialValueText("All")
+        self.span_spin.setToolTip("Newest samples to plot (All: the whole history)")
+        
+        self.status_label = QLabel("Telemetry off: enter a record layout")
+        self.plot = PlotWidget()
+        
+        layout_row = QHBoxLayout()
+        layout_row.addWidget(QLabel("Layout:"))
+        layout_row.addWidget(self.layout_input, 1)
+        layout_row.addWidget(self.apply_button)
+        layout_row.addWidget(self.clear_button)
+        
+        window_row = QHBoxLayout()
+        window_row.addWidget(QLabel("History (samples):"))
+        window_row.addWidget(self.history_spin)
+        window_row.addWidget(QLabel("Show last:"))
+        window_row.addWidget(self.span_spin)
+        window_row.addStretch()
+        
+        layout = QVBoxLayout(self)
+        layout.addLayout(layout_row)
+        layout.addLayout(window_row)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.plot, 1)
+        
+        self.apply_button.clicked.connect(self.apply)
+        self.layout_input.returnPressed.connect(self.apply)
+        self.clear_button.clicked.connect(self.clear)
+        self.span_spin.valueChanged.connect(self.redraw)
+        
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+    
+    def apply(self):
+        """Start decoding with the entered layout and history (drops old samples)"""
+        text = self.layout_input.text().strip()
+        if not text:
+            self.decoder = None
+            self.status_label.setText("Telemetry off: enter a record layout")
+            self.redraw()
+            return
+        try:
+            self.decoder = TelemetryDecoder(text, self.history_spin.value())
+        except ValueError as e:
+            self.decoder = None
+            self.status_label.setText(f"<Invalid layout: {e}>")
+        self.redraw()
+    
+    def feed(self, frames, stream=False):
+        """Decode RX frames if telemetry is on (any thread)"""
+        decoder = self.decoder
+        if decoder is not None and frames:
+            decoder.feed(frames, stream)
+    
+    def clear(self):
+        if self.decoder is not None:
+            self.decoder.clear()
+        self.redraw()
+    
+    def redraw(self):
+        self.drawn_version = None
+        self.refresh()
+    
+    def refresh(self):
+        """Redraw if visible and there are new samples"""
+        decoder = self.decoder
+        if not self.isVisible():
+            return
+        if decoder is None:
+            if self.drawn_version != -1:
+                self.drawn_version = -1
+                self.plot.set_data(np.empty(0), np.empty((0, 0)), [])
+            return
+        if decoder.version == self.drawn_version:
+            return
+        self.drawn_version = decoder.version
+        x, y, total = decoder.envelope(self.plot.plot_width(), self.span_spin.value())
+        self.plot.set_data(x, y, decoder.names)
+        self.status_label.setText(
+            f"{total} samples decoded, {len(decoder.buffer)} kept, "
+            f"{decoder.bad_frames} bad frames ({decoder.record_size}-byte records)"
+        )
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.redraw()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.drawn_version = None
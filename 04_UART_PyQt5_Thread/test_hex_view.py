@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Hex View Tests
+ ===============
+ - Scrollback trimming of HexDumpModel keeps absolute offsets exact.
+ 
+ - Usage:
+        python -m unittest test_hex_view
+"""
+
+import unittest
+
+from PyQt5.QtCore import Qt
+
+from hex_view import HexDumpModel
+
+
+class HexDumpModelTrimTest(unittest.TestCase):
+    
+    def offset_of_first_row(self, model):
+        return int(model.data(model.index(0, 0), Qt.DisplayRole), 16)
+    
+    def test_trim_whole_rows(self):
+        model = HexDumpModel(bytes_per_row=16, max_bytes=64)
+        model.append_bytes(bytes(64))
+        model.append_bytes(bytes(16))
+        self.assertEqual(model.total_bytes(), 80)
+        self.assertEqual(model.rowCount(), 4)
+        self.assertEqual(self.offset_of_first_row(model), 16)
+    
+    def test_trim_partial_last_row(self):
+        model = HexDumpModel(bytes_per_row=16, max_bytes=64)
+        model.append_bytes(bytes(20))      # One full row and a partial one
+        model.append_bytes(bytes(range(63)))  # Both rows are trimmed
+        self.assertEqual(model.total_bytes(), 83)
+        self.assertEqual(self.offset_of_first_row(model), 20)
+        self.assertEqual(model.data(model.index(0, 1), Qt.DisplayRole)[:5], "00 01")
+    
+    def test_set_max_bytes_below_partial_data(self):
+        model = HexDumpModel(bytes_per_row=16, max_bytes=64)
+        model.append_bytes(bytes(40))
+        model.set_max_bytes(16)
+        model.append_bytes(bytes(1))
+        self.assertEqual(model.total_bytes(), 41)
+
+
+if __name__ == "__main__":
+    unittest.main()
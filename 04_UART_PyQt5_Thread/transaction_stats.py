@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Transaction Statistics Module
+ ==============================
+ - Per-transaction timing and rolling histograms (Qt-free).
+ 
+ - Every transmit records where its time went, so latency can be pinned
+   on the driver (open / write), the device (time to first byte) or the
+   response length and completion rule (time to last byte):
+        * open:  Opening the port (0 when a session was reused)
+        * write: Writing the TX bytes
+        * ttfb:  Write finished -> first RX byte
+        * ttlb:  Write finished -> last RX byte
+ 
+ - The last `window` transactions are kept; histograms use fixed
+   log-spaced buckets updated incrementally as records enter and leave.
+ 
+ - Classes:
+        * TransactionRecord: Timing of one transaction
+        * RollingHistogram: Bucketed distribution over a sliding window
+        * TransactionStats: Thread-safe collector with JSON / CSV export
+"""
+
+import bisect
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+from sequence_runner import percentile
+
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKET_BOUNDS_MS = [0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+METRICS = ["open", "write", "ttfb", "ttlb"]
+
+CSV_FIELDS = ["timestamp", "open_ms", "write_ms", "ttfb_ms", "ttlb_ms",
+              "tx_bytes", "rx_bytes", "timed_out"]
+
+
+class TransactionRecord:
+    """Timing of one transaction (durations in seconds, None if not measured)"""
+    
+    def __init__(self, open_s=0.0, write_s=None, ttfb_s=None, ttlb_s=None,
+                 tx_bytes=0, rx_bytes=0, timed_out=False, timestamp=None):
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.open_s = open_s
+        self.write_s = write_s
+        self.ttfb_s = ttfb_s
+        self.ttlb_s = ttlb_s
+        self.tx_bytes = tx_bytes
+        self.rx_bytes = rx_bytes
+        self.timed_out = timed_out
+    
+    @classmethod
+    def from_timing(cls, timing, tx_bytes, rx_bytes, timed_out):
+        """Build a record from perf_counter() marks collected during a transaction
+        
+        Expected keys: "start", "opened", "write_done" and, if anything
+        arrived, "first_byte" / "last_byte".
+        """
+        write_done = timing.get("write_done")
+        opened = timing.get("opened", timing.get("start"))
+        first = timing.get("first_byte")
+        last = timing.get("last_byte")
+        return cls(
+            open_s=opened - timing["start"],
+            write_s=write_done - opened if write_done is not None else None,
+            ttfb_s=first - write_done if first is not None and write_done is not None else None,
+            ttlb_s=last - write_done if last is not None and write_done is not None else None,
+            tx_bytes=tx_bytes,
+            rx_bytes=rx_bytes,
+            timed_out=timed_out,
+        )
+    
+    def value(self, metric):
+        """Duration of a metric in seconds (None if not measured)"""
+        return getattr(self, metric + "_s")
+    
+    def as_dict(self):
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 4)
+        return {
+            "timestamp": self.timestamp,
+            "open_ms": ms(self.open_s),
+            "write_ms": ms(self.write_s),
+            "ttfb_ms": ms(self.ttfb_s),
+            "ttlb_ms": ms(self.ttlb_s),
+            "tx_bytes": self.tx_bytes,
+            "rx_bytes": self.rx_bytes,
+            "timed_out": self.timed_out,
+        }
+
+
+class RollingHistogram:
+    """Bucket counts and order statistics of the values currently in the window"""
+    
+    def __init__(self, bounds_ms=BUCKET_BOUNDS_MS):
+        self.bounds = [b / 1000.0 for b in bounds_ms]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self._values = []   # sorted, for percentiles
+    
+    def _bucket(self, value):
+        return bisect.bisect_left(self.bounds, value)
+    
+    def add(self, value):
+        self.counts[self._bucket(value)] += 1
+        bisect.insort(self._values, value)
+    
+    def remove(self, value):
+        self.counts[self._bucket(value)] -= 1
+        index = bisect.bisect_left(self._values, value)
+        if index < len(self._values) and self._values[index] == value:
+            del self._values[index]
+    
+    def __len__(self):
+        return len(self._values)
+    
+    def percentile(self, p):
+        """Nearest-rank percentile in seconds (None when empty)"""
+        return percentile(self._values, p) if self._values else None
+    
+    def maximum(self):
+        return self._values[-1] if self._values else None
+
+
+class TransactionStats:
+    """Collects TransactionRecords from any thread over a sliding window"""
+    
+    def __init__(self, window=1000):
+        self.window = window
+        self.records = deque()
+        self.histograms = {metric: RollingHistogram() for metric in METRICS}
+        self.total = 0
+        self.timeouts = 0
+        self.tx_bytes = 0
+        self.rx_bytes = 0
+        self._lock = threading.Lock()
+    
+    def add(self, record):
+        with self._lock:
+            if len(self.records) >= self.window:
+                old = self.records.popleft()
+                for metric, histogram in self.histograms.items():
+                    value = old.value(metric)
+                    if value is not None:
+                        histogram.remove(value)
+            self.records.append(record)
+            for metric, histogram in self.histograms.items():
+                value = record.value(metric)
+                if value is not None:
+                    histogram.add(value)
+            self.total += 1
+            self.timeouts += record.timed_out
+            self.tx_bytes += record.tx_bytes
+            self.rx_bytes += record.rx_bytes
+    
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+            self.histograms = {metric: RollingHistogram() for metric in METRICS}
+            self.total = self.timeouts = self.tx_bytes = self.rx_bytes = 0
+    
+    def summary(self):
+        """Snapshot: totals plus count / p50 / p90 / p99 / max (ms) per metric"""
+        with self._lock:
+            result = {
+                "transactions": self.total,
+                "timeouts": self.timeouts,
+                "tx_bytes": self.tx_bytes,
+                "rx_bytes": self.rx_bytes,
+                "window": len(self.records),
+            }
+            for metric, histogram in self.histograms.items():
+                entry = {"count": len(histogram)}
+                for name, value in (("p50", histogram.percentile(50)),
+                                    ("p90", histogram.percentile(90)),
+                                    ("p99", histogram.percentile(99)),
+                                    ("max", histogram.maximum())):
+                    entry[name + "_ms"] = None if value is None else value * 1000
+                entry["buckets"] = list(histogram.counts)
+                result[metric] = entry
+            return result
+    
+    def export_json(self, path):
+        """Write the summary and every windowed record as JSON"""
+        with self._lock:
+            records = [r.as_dict() for r in self.records]
+        data = {"summary": self.summary(),
+                "bucket_bounds_ms": BUCKET_BOUNDS_MS,
+                "records": records}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    
+    def export_csv(self, path):
+        """Write one CSV row per windowed record"""
+        with self._lock:
+            records = [r.as_dict() for r in self.records]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
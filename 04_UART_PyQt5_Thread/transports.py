@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Transports Module
+ ==================
+ - Opens whatever the port selector names: a local serial port, a raw TCP
+   serial bridge, an RFC 2217 server or any pyserial URL handler.
+ 
+ - Port names:
+        COM3, /dev/ttyUSB0              local serial port
+        tcp://host:port                 raw TCP (serial-to-Ethernet server)
+        socket://host:port              same as tcp://
+        rfc2217://host:port             RFC 2217 (baudrate set remotely)
+        loop://, spy://..., hwgrep://   other pyserial URL handlers
+ 
+ - Every backend is wrapped in a Transport, which behaves like the
+   pyserial object it wraps (readers, runners and the multiplexer use it
+   unchanged) and counts its own traffic: connect time, write latency,
+   TCP round-trip time, bytes and calls per direction.
+ 
+ - Raw TCP (TCPSerial) replaces pyserial's socket:// handler:
+        * Nagle is disabled, so a request goes out without waiting for the
+          previous segment's ACK
+        * in_waiting / out_waiting report the real socket queues (FIONREAD
+          and TIOCOUTQ) instead of 0 / 1, so readers fetch whole bursts and
+          the bulk sender can pace itself
+        * writes are one send() loop without a select() per call
+   With Nagle off, many small writes become many small segments; code
+   that writes several frames back to back wraps them in
+   Transport.batch() so they leave as one send.
+ 
+ - RFC 2217 (RFC2217Serial) is pyserial's client, which already disables
+   Nagle, minus two stalls: it renegotiates the line settings only when
+   one of them changes (pyserial does it on every timeout change, which
+   costs about 100 ms per read_response), and it closes without a sleep.
+ 
+ - Classes:
+        * TransportStats: Latency and throughput counters for one link
+        * TCPSerial: pyserial-compatible raw TCP client
+        * RFC2217Serial: pyserial's RFC 2217 client without the stalls
+        * Transport: Counting wrapper around an open pyserial object
+ 
+ - Functions:
+        * open_transport: Open a port name or URL
+        * transport_kind: Backend name for a port name or URL
+"""
+
+import errno
+import select
+import socket
+import struct
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import serial
+from serial import rfc2217
+from serial.urlhandler import protocol_socket
+
+try:
+    import fcntl
+    import termios
+except ImportError:
+    # Windows: socket queue sizes fall back to pyserial's estimates
+    fcntl = termios = None
+
+
+TCP_SCHEMES = ("tcp", "socket")
+PORT_HINT = "Port, or tcp://host:port, rfc2217://host:port, loop://"
+
+# Offset of tcpi_rtt (microseconds) in Linux's struct tcp_info
+TCP_INFO_RTT_OFFSET = 68
+TCP_INFO_SIZE = 104
+
+
+def transport_kind(port):
+    """Backend name for a port name or URL"""
+    scheme = urlsplit(port).scheme.lower() if "://" in port else ""
+    if not scheme:
+        return "Serial"
+    if scheme in TCP_SCHEMES:
+        return "TCP"
+    if scheme == "rfc2217":
+        return "RFC2217"
+    return "URL"
+
+
+def tcp_rtt(sock):
+    """Kernel's smoothed round-trip time of a TCP socket in seconds (None if unknown)"""
+    if sock is None or not hasattr(socket, "TCP_INFO"):
+        return None
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_SIZE)
+    except OSError:
+        return None
+    if len(info) < TCP_INFO_RTT_OFFSET + 4:
+        return None
+    return struct.unpack_from("=I", info, TCP_INFO_RTT_OFFSET)[0] / 1e6
+
+
+class TransportStats:
+    """Counters for one open link; rates are averaged since it was opened"""
+    
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.connect_time = 0.0     # Seconds spent opening the link
+        self.opened = time.perf_counter()
+        self.closed = None
+        self.tx_bytes = 0
+        self.rx_bytes = 0
+        self.writes = 0             # Write calls that reached the backend
+        self.reads = 0              # Reads that returned data
+        self.write_time = 0.0       # Seconds spent inside backend writes
+        self.rtt = None             # Callable returning the TCP RTT, if any
+    
+    def freeze(self):
+        """Stop the clock and keep the last RTT reading (the link is closing)"""
+        if self.closed is None:
+            rtt = self.rtt() if self.rtt is not None else None
+            self.rtt = None if rtt is None else (lambda: rtt)
+            self.closed = time.perf_counter()
+    
+    def snapshot(self):
+        end = self.closed if self.closed is not None else time.perf_counter()
+        elapsed = max(1e-9, end - self.opened)
+        rtt = self.rtt() if self.rtt is not None else None
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "connect_ms": self.connect_time * 1000.0,
+            "rtt_ms": rtt * 1000.0 if rtt is not None else None,
+            "write_ms": self.write_time * 1000.0 / self.writes if self.writes else None,
+            "tx_bytes": self.tx_bytes,
+            "rx_bytes": self.rx_bytes,
+            "writes": self.writes,
+            "reads": self.reads,
+            "tx_rate": self.tx_bytes / elapsed,
+            "rx_rate": self.rx_bytes / elapsed,
+            "elapsed": elapsed,
+        }
+    
+    def describe(self):
+        s = self.snapshot()
+        latency = [f"connect {s['connect_ms']:.1f} ms"]
+        if s["rtt_ms"] is not None:
+            latency.append(f"RTT {s['rtt_ms']:.2f} ms")
+        if s["write_ms"] is not None:
+            latency.append(f"write {s['write_ms']:.3f} ms avg")
+        return (
+            f"{s['kind']} {s['name']}: {', '.join(latency)}; "
+            f"TX {s['tx_bytes']} B in {s['writes']} writes ({s['tx_rate'] / 1024:.1f} KB/s), "
+            f"RX {s['rx_bytes']} B in {s['reads']} reads ({s['rx_rate'] / 1024:.1f} KB/s)"
+        )
+
+
+class TCPSerial(protocol_socket.Serial):
+    """Raw TCP client for serial-to-Ethernet servers (tcp:// or socket://)"""
+    
+    def open(self):
+        super().open()
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    
+    def from_url(self, url):
+        """(host, port) from tcp://host:port or socket://host:port"""
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in TCP_SCHEMES:
+            raise serial.SerialException(f"expected tcp://<host>:<port>, got {url!r}")
+        try:
+            port = parts.port
+        except ValueError as e:
+            raise serial.SerialException(f"bad TCP port in {url!r}: {e}") from None
+        if not parts.hostname or port is None:
+            raise serial.SerialException(f"expected tcp://<host>:<port>, got {url!r}")
+        return parts.hostname, port
+    
+    def close(self):
+        # pyserial's socket handler sleeps 0.3 s here "for quick reconnects"
+        if self.is_open:
+            if self._socket:
+                try:
+                    self._socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                self._socket.close()
+                self._socket = None
+            self.is_open = False
+    
+    def _queue_size(self, request):
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        if fcntl is None:
+            raise OSError(errno.ENOTSUP, "socket queue sizes not available")
+        return struct.unpack("I", fcntl.ioctl(self._socket, request, b"\0\0\0\0"))[0]
+    
+    @property
+    def in_waiting(self):
+        """Bytes received and not yet read"""
+        try:
+            return self._queue_size(termios.FIONREAD if termios else 0)
+        except OSError:
+            return super().in_waiting
+    
+    @property
+    def out_waiting(self):
+        """Bytes written but not yet acknowledged by the server"""
+        try:
+            return self._queue_size(termios.TIOCOUTQ if termios else 0)
+        except OSError:
+            return 0
+    
+    def write(self, data):
+        """Send everything (select() only when the socket buffer is full)"""
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        view = memoryview(serial.to_bytes(data))
+        deadline = None if self._write_timeout is None else time.monotonic() + self._write_timeout
+        sent = 0
+        while sent < len(view):
+            try:
+                sent += self._socket.send(view[sent:])
+                continue
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise serial.SerialException(f"write failed: {e}") from None
+            if deadline is not None and deadline - time.monotonic() <= 0:
+                if self._write_timeout == 0:
+                    return sent
+                raise serial.SerialTimeoutException("Write timeout")
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            select.select([], [self._socket], [], remaining)
+        return sent
+
+
+class RFC2217Serial(rfc2217.Serial):
+    """RFC 2217 client that only renegotiates changed line settings"""
+    
+    _negotiated = None
+    
+    def _line_settings(self):
+        return (self._baudrate, self._bytesize, self._parity, self._stopbits,
+                self._rtscts, self._xonxoff, self._write_timeout)
+    
+    def _reconfigure_port(self):
+        # Timeouts are local to the client, but every change of one lands here
+        settings = self._line_settings()
+        if settings != self._negotiated:
+            super()._reconfigure_port()
+            self._negotiated = settings
+    
+    def close(self):
+        # pyserial sleeps 0.3 s after the reader thread ends
+        self.is_open = False
+        self._negotiated = None
+        if self._socket:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+                self._socket.close()
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(7)
+            self._thread = None
+        self._socket = None
+
+
+class Transport:
+    """An open backend plus its TransportStats
+    
+    Attribute reads and writes that the wrapper doesn't handle itself go
+    to the wrapped pyserial object, so it drops in wherever a
+    serial.Serial was used.
+    """
+    
+    _OWN = ("kind", "name", "link", "stats", "_batch")
+    
+    def __init__(self, kind, name, link):
+        object.__setattr__(self, "kind", kind)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "link", link)
+        object.__setattr__(self, "stats", TransportStats(kind, name))
+        object.__setattr__(self, "_batch", None)
+    
+    def __getattr__(self, attribute):
+        return getattr(self.link, attribute)
+    
+    def __setattr__(self, attribute, value):
+        if attribute in self._OWN:
+            object.__setattr__(self, attribute, value)
+        else:
+            setattr(self.link, attribute, value)
+    
+    def read(self, size=1):
+        data = self.link.read(size)
+        if data:
+            self.stats.rx_bytes += len(data)
+            self.stats.reads += 1
+        return data
+    
+    def write(self, data):
+        if self._batch is not None:
+            self._batch += data
+            return len(data)
+        return self._write(data)
+    
+    def _write(self, data):
+        start = time.perf_counter()
+        written = self.link.write(data)
+        stats = self.stats
+        stats.write_time += time.perf_counter() - start
+        stats.writes += 1
+        stats.tx_bytes += written if written is not None else len(data)
+        return written
+    
+    @contextmanager
+    def batch(self):
+        """Collect writes made inside the block and send them as one"""
+        if self._batch is not None:
+            yield self  # Nested: the outer block sends
+            return
+        self._batch = bytearray()
+        try:
+            yield self
+        finally:
+            data, self._batch = bytes(self._batch), None
+            if data:
+                self._write(data)
+    
+    def close(self):
+        self.stats.freeze()
+        self.link.close()
+
+
+def open_transport(port, baudrate, timeout=0.1):
+    """Open a port name or URL; returns a Transport (raises serial.SerialException)"""
+    kind = transport_kind(port)
+    start = time.perf_counter()
+    if kind == "Serial":
+        link = serial.Serial(
+            port=port,
+            baudrate=int(baudrate),
+            bytesize=serial.EIGHTBITS,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            timeout=timeout
+        )
+    elif kind == "TCP":
+        # pyserial checks baudrates against a short list for sockets; the
+        # rate only matters to the device behind the bridge
+        link = TCPSerial(None, timeout=timeout)
+        link.BAUDRATES = ()
+        link.baudrate = int(baudrate)
+        link.port = port
+        link.open()
+    elif kind == "RFC2217":
+        link = RFC2217Serial(port, baudrate=int(baudrate), timeout=timeout)
+    else:
+        link = serial.serial_for_url(port, baudrate=int(baudrate), timeout=timeout)
+    transport = Transport(kind, port, link)
+    transport.stats.connect_time = time.perf_counter() - start
+    sock = getattr(link, "_socket", None)
+    if isinstance(sock, socket.socket):
+        transport.stats.rtt = lambda: tcp_rtt(getattr(link, "_socket", None))
+    return transport
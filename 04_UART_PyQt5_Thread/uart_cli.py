@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ UART Command-Line Tool
+ =======================
+ - Headless entry point for batch jobs and test stations.
+ 
+ - Uses the Qt-free UARTCore, so PyQt5 is never imported and start-up
+   takes milliseconds. Port and baudrate default to the settings saved
+   by the GUI (~/uart_config.json).
+ 
+ - Usage:
+        python uart_cli.py list
+        python uart_cli.py send "01 02 03" [--length N | --terminator HEX | --gap MS]
+        python uart_cli.py send "01 03 00 00 00 01 {crc16-modbus}" @Ping
+        python uart_cli.py --framing SLIP send "07 01" "08 01" --depth 8 --id-field 0
+        python uart_cli.py monitor [--duration S] [--framing SLIP]
+        python uart_cli.py run steps.seq [--repeat N] [--depth N]
+        python uart_cli.py sendfile image.bin [--chunk N] [--flow RTS/CTS] [--delay MS]
+        python uart_cli.py search traffic.uartcap "55 AA ?? 01" [--ascii [--ignore-case]]
+        python uart_cli.py -p tcp://192.168.1.50:4001 --link-stats send "01 02 03"
+        python uart_cli.py --sim device.sim --framing SLIP monitor --duration 10
+ 
+ - Exit codes:
+        0: success
+        1: connection or usage error
+        2: a response timed out, was missing or did not match
+"""
+
+import argparse
+import sys
+import time
+
+from capture import RX, TX, DIRECTION_NAMES
+from capture_search import CaptureSearch, parse_search_pattern, DEFAULT_HIT_LIMIT
+from bulk_sender import (BulkSender, load_payload, FLOW_NAMES, PAYLOAD_FORMATS,
+                         DEFAULT_CHUNK_SIZE)
+from command_library import CommandLibrary, compile_command
+from command_worker import CommandWorker, Request, parse_id_field
+from framing import FRAMER_NAMES, create_framer
+from hex_format import parse_hex, to_hex, to_ascii
+from response_reader import ResponseRule
+from sequence_runner import SequenceRunner, load_sequence
+from uart_core import UARTCore, BAUD_RATES, list_ports
+from virtual_device import VirtualDevice, load_rules
+
+
+# How often monitor mode drains the RX ring buffer
+MONITOR_POLL_INTERVAL = 0.05
+
+
+def print_message(text):
+    """Print a core message without the GUI's trailing blank line"""
+    print(text.rstrip("\n"), flush=True)
+
+
+def build_rule(args, baudrate):
+    """Response completion rule from the command-line options"""
+    timeout = args.timeout / 1000.0
+    if args.length:
+        return ResponseRule(expected_length=args.length, timeout=timeout)
+    if args.terminator:
+        return ResponseRule(terminator=parse_hex(args.terminator), timeout=timeout)
+    gap = args.gap / 1000.0 if args.gap is not None else None
+    return ResponseRule.for_gap(baudrate, gap, timeout)
+
+
+def print_frames(core, data, final=False):
+    """Print the hex / ASCII of every frame completed by data"""
+    for frame in core.framer.feed(data):
+        print(f"RX: {to_hex(frame)}")
+        print(f"RX (ASCII): {to_ascii(frame)}", flush=True)
+    if final:
+        partial = core.framer.pending()
+        if partial:
+            print(f"RX (incomplete frame): {to_hex(partial)}", flush=True)
+        core.framer.reset()
+
+
+def command_list(core, args):
+    for port in list_ports():
+        print(port)
+    return 0
+
+
+def build_frames(texts):
+    """Frames for hex arguments; "@name" sends a saved library command"""
+    library = None
+    frames = []
+    for text in texts:
+        if not text.startswith("@"):
+            frames.append(compile_command(text))
+            continue
+        if library is None:
+            library = CommandLibrary()
+            library.load()
+        command = library.get(text[1:])
+        if command is None:
+            raise ValueError(f"no command named '{text[1:]}' in {library.path}")
+        frames.append(command.frame)
+    return frames
+
+
+def command_send(core, args):
+    try:
+        frames = build_frames(args.hex)
+        rule = build_rule(args, int(args.baud))
+        id_field = parse_id_field(args.id_field or "")
+        pipelined = args.depth > 1 or id_field is not None
+        if pipelined and args.framing == "Raw":
+            raise ValueError("--depth and --id-field need a --framing other than Raw")
+    except (OSError, ValueError) as e:
+        print(f"<Invalid command: {e}>", file=sys.stderr)
+        return 1
+    
+    if not core.connect(args.port, args.baud):
+        return 1
+    if pipelined:
+        return send_pipelined(core, args, frames, rule, id_field)
+    status = 0
+    try:
+        for _ in range(args.count):
+            for data in frames:
+                print(f"TX: {to_hex(data)}", flush=True)
+                received, timed_out = core.transact(data, rule)
+                if not received:
+                    print("RX: <No response received>", flush=True)
+                    status = 2
+                    continue
+                print_frames(core, received, final=True)
+                if timed_out:
+                    print(f"<Response incomplete: no {rule.describe()} "
+                          f"within {rule.timeout * 1000:.0f} ms>", flush=True)
+                    status = 2
+    except Exception as e:
+        print(f"<Send error: {str(e)}>", flush=True)
+        status = 1
+    finally:
+        core.disconnect()
+    return status
+
+
+def send_pipelined(core, args, frames, rule, id_field):
+    """send with up to --depth requests outstanding, matched by --id-field"""
+    failed = []
+    
+    def on_complete(request):
+        if request.response is not None:
+            print(f"RX #{request.number}: {to_hex(request.response)}  "
+                  f"({request.latency() * 1000:.1f} ms)", flush=True)
+        else:
+            failed.append(request)
+            reason = request.error or f"no response within {rule.timeout * 1000:.0f} ms"
+            print(f"<#{request.number}: {reason}>", flush=True)
+    
+    worker = CommandWorker(core, lambda: create_framer(args.framing, args.framing_param),
+                           args.depth, id_field,
+                           on_sent=lambda request: print(f"TX #{request.number}: "
+                                                         f"{to_hex(request.data)}", flush=True),
+                           on_complete=on_complete, on_message=print_message)
+    worker.start()
+    try:
+        for _ in range(args.count):
+            for data in frames:
+                # A full queue blocks here until the worker catches up
+                worker.submit(Request(data, rule.timeout), block=True)
+        worker.wait_idle()
+    except ValueError as e:
+        print(f"<Invalid command: {e}>", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 1
+    finally:
+        worker.close()
+        core.disconnect()
+    return 2 if failed else 0
+
+
+def command_monitor(core, args):
+    if not core.connect(args.port, args.baud):
+        return 1
+    core.start_reader()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(MONITOR_POLL_INTERVAL)
+            data = core.rx_buffer.read()
+            if data:
+                print_frames(core, data)
+            error = core.reader_error()
+            if error is not None:
+                print(f"<Read error: {error}>", flush=True)
+                return 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        core.stop_reader()
+        print_frames(core, core.rx_buffer.read(), final=True)
+        if core.rx_buffer.dropped:
+            print(f"<RX buffer overflow: {core.rx_buffer.dropped} bytes dropped>")
+        core.disconnect()
+    return 0
+
+
+def command_run(core, args):
+    try:
+        steps = load_sequence(args.file)
+        rule = build_rule(args, int(args.baud))
+    except (OSError, ValueError) as e:
+        print(f"<Sequence error: {e}>", file=sys.stderr)
+        return 1
+    
+    if not core.connect(args.port, args.baud):
+        return 1
+    on_result = None
+    if not args.summary_only:
+        on_result = lambda result: print(result.describe(), flush=True)
+    runner = SequenceRunner(core, steps, rule, args.depth, on_result=on_result)
+    try:
+        report = runner.run(args.repeat)
+    except KeyboardInterrupt:
+        return 1
+    except Exception as e:
+        print(f"<Sequence error: {str(e)}>", flush=True)
+        return 1
+    finally:
+        core.disconnect()
+    for line in report.summary_lines():
+        print(line)
+    return 2 if report.failures else 0
+
+
+def print_progress(sent, total, elapsed):
+    """One self-overwriting progress line on stderr"""
+    rate = sent / elapsed if elapsed > 0 else 0.0
+    percent = 100.0 * sent / total if total else 100.0
+    print(f"\r{percent:5.1f}%  {sent} / {total} B  {rate / 1024:.1f} KB/s ",
+          end="", file=sys.stderr, flush=True)
+
+
+def command_sendfile(core, args):
+    try:
+        data = load_payload(args.file, args.format)
+    except (OSError, ValueError) as e:
+        print(f"<Cannot load {args.file}: {e}>", file=sys.stderr)
+        return 1
+    
+    if not core.connect(args.port, args.baud):
+        return 1
+    sender = BulkSender(core, data, args.chunk, args.flow, args.delay / 1000.0,
+                        on_progress=None if args.quiet else print_progress,
+                        on_rx=lambda received: print_frames(core, received))
+    try:
+        report = sender.run()
+    except KeyboardInterrupt:
+        return 1
+    finally:
+        core.disconnect()
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(report.describe())
+    return 1 if report.error else 0
+
+
+def command_search(core, args):
+    try:
+        pattern = parse_search_pattern(args.pattern, "ASCII" if args.ascii else "Hex",
+                                       args.ignore_case)
+        search = CaptureSearch(args.file)
+    except (OSError, ValueError) as e:
+        print(f"<Search error: {e}>", file=sys.stderr)
+        return 1
+    directions = {"RX": (RX,), "TX": (TX,), "both": (RX, TX)}[args.direction]
+    with search:
+        start = time.perf_counter()
+        hits, truncated = search.find(pattern, directions, args.limit)
+        elapsed = time.perf_counter() - start
+        for hit in hits:
+            print(f"[{hit.timestamp - search.reader.start_time:10.3f}] "
+                  f"{DIRECTION_NAMES[hit.direction]} @{hit.record_offset}+{hit.record_position}: "
+                  f"{to_hex(hit.data)}")
+    more = f" (first {args.limit} shown)" if truncated else ""
+    print(f"{len(hits)} hits{more} in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+def add_response_options(parser):
+    """Options that decide when a response is complete"""
+    end = parser.add_mutually_exclusive_group()
+    end.add_argument("--length", type=int, help="response ends after N bytes")
+    end.add_argument("--terminator", help="response ends with these hex bytes")
+    end.add_argument("--gap", type=float, help="response ends after MS of silence "
+                                               "(default: derived from baudrate)")
+    parser.add_argument("--timeout", type=int, default=2000, help="response timeout in ms")
+
+
+def build_parser(settings):
+    parser = argparse.ArgumentParser(description="Headless UART hex terminal")
+    parser.add_argument("-p", "--port", default=settings["port"],
+                        help="serial port or tcp://, rfc2217://, loop:// URL "
+                             "(default: saved GUI setting)")
+    parser.add_argument("-b", "--baud", default=settings["baudrate"], choices=BAUD_RATES,
+                        help="baudrate (default: saved GUI setting)")
+    parser.add_argument("--framing", default="Raw", choices=FRAMER_NAMES,
+                        help="RX framing")
+    parser.add_argument("--framing-param", default="", help="RX framing parameter")
+    parser.add_argument("--capture", metavar="FILE", help="record traffic to a capture file")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="hide connection messages")
+    parser.add_argument("--link-stats", action="store_true",
+                        help="print the link's latency and throughput on exit (stderr)")
+    parser.add_argument("--sim", metavar="RULES",
+                        help="run a virtual device from a rules file and use it as the port")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    commands.add_parser("list", help="list serial ports")
+    
+    send = commands.add_parser("send", help="send hex frames and print the responses")
+    send.add_argument("hex", nargs="+",
+                      help='hex frame, e.g. "01 02 {crc8}" (one per argument), or @name')
+    add_response_options(send)
+    send.add_argument("--count", type=int, default=1, help="repeat the frames N times")
+    send.add_argument("--depth", type=int, default=1,
+                      help="requests outstanding at once (needs --framing above 1)")
+    send.add_argument("--id-field", metavar="OFFSET[:LENGTH]",
+                      help="match responses to requests by these ID bytes (needs --framing)")
+    
+    monitor = commands.add_parser("monitor", help="print everything received")
+    monitor.add_argument("--duration", type=float, default=0,
+                         help="stop after S seconds (default: until Ctrl+C)")
+    
+    run = commands.add_parser("run", help="run a sequence file and report throughput")
+    run.add_argument("file", help="sequence file (HEX [| expect HEX] [| wait MS] per line)")
+    add_response_options(run)
+    run.add_argument("--repeat", type=int, default=1, help="run the sequence N times")
+    run.add_argument("--depth", type=int, default=1,
+                     help="responses outstanding at once (needs --framing above 1)")
+    run.add_argument("--summary-only", action="store_true", help="print only the report")
+    
+    sendfile = commands.add_parser("sendfile", help="stream a file in chunks with flow control")
+    sendfile.add_argument("file", help="payload: binary, or hex text for .txt / .hex")
+    sendfile.add_argument("--format", default="auto", choices=PAYLOAD_FORMATS,
+                          help="payload format (default: by extension)")
+    sendfile.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_SIZE, help="bytes per write")
+    sendfile.add_argument("--delay", type=float, default=0, help="pause in ms after each chunk")
+    sendfile.add_argument("--flow", default="None", choices=FLOW_NAMES, help="flow control")
+    
+    search = commands.add_parser("search", help="find a byte pattern in a capture file")
+    search.add_argument("file", help="capture file (.uartcap)")
+    search.add_argument("pattern", help='hex with ?? wildcards, e.g. "55 AA ?? 01"')
+    search.add_argument("--ascii", action="store_true",
+                        help="pattern is ASCII text (\\r \\n \\t \\0 \\xNN escapes)")
+    search.add_argument("--ignore-case", action="store_true", help="ASCII case folding")
+    search.add_argument("--direction", default="both", choices=["RX", "TX", "both"])
+    search.add_argument("--limit", type=int, default=DEFAULT_HIT_LIMIT, help="hits to list")
+    return parser
+
+
+COMMANDS = {
+    "list": command_list,
+    "send": command_send,
+    "monitor": command_monitor,
+    "run": command_run,
+    "sendfile": command_sendfile,
+    "search": command_search,
+}
+
+
+def main(argv=None):
+    core = UARTCore()
+    core.load_settings()
+    args = build_parser(core.settings).parse_args(argv)
+    
+    core.on_message = (lambda text: None) if args.quiet else print_message
+    try:
+        core.set_framing(args.framing, args.framing_param)
+    except ValueError as e:
+        print(f"<Invalid framing parameter: {e}>", file=sys.stderr)
+        return 1
+    
+    # Everything started from here on is released by the finally block,
+    # so a failed setup step still flushes a capture that is recording
+    device = None
+    try:
+        if args.capture:
+            try:
+                core.start_capture(args.capture)
+            except OSError as e:
+                print(f"<Capture error: {str(e)}>", file=sys.stderr)
+                return 1
+        if args.sim:
+            try:
+                device = VirtualDevice(load_rules(args.sim), name=args.sim)
+            except (OSError, ValueError) as e:
+                print(f"<Virtual device error: {str(e)}>", file=sys.stderr)
+                return 1
+            device.start()
+            args.port = device.port
+        return COMMANDS[args.command](core, args)
+    finally:
+        core.close()
+        if args.link_stats and core.link_stats():
+            print(f"<Link: {core.link_stats()}>", file=sys.stderr)
+        if device is not None:
+            device.stop()
+            if args.link_stats:
+                print(f"<Virtual device: {device.describe()}>", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
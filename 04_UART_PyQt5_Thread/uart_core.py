@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ UART Core Module
+ =================
+ - Qt-free serial logic shared by the GUI (uart_terminal.py) and the
+   command-line entry point (uart_cli.py).
+ 
+ - Handles:
+        1. Port enumeration, connect and disconnect (any backend in
+           transports.py: serial, TCP, RFC 2217, pyserial URLs)
+        2. Transmit and event-driven response reads
+        3. Continuous monitoring (reader thread + ring buffer)
+        4. RX framing and binary capture
+        5. Settings persistence
+ 
+ - Output goes through two callbacks so any front end can show it:
+        * on_message(text): terminal lines such as "<Connected ...>\\n"
+        * on_status(text, color): connection status changes
+ 
+ - Classes:
+        * UARTCore: Serial session without any UI dependency
+"""
+
+import os
+import json
+
+import capture
+from framing import Framer, create_framer
+from response_reader import read_response
+from ring_buffer import RingBuffer
+from serial_reader import SerialReader
+from transports import open_transport
+
+
+BAUD_RATES = ["9600", "19200", "38400", "57600", "115200", "230400", "460800", "921600"]
+NO_PORTS = "No ports available"
+
+# RX ring buffer size: 1 MiB holds ~11 s of backlog at 921600 baud
+RX_BUFFER_SIZE = 1 << 20
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.expanduser("~"), "uart_config.json")
+
+
+def list_ports():
+    """Return the device names of the available serial ports"""
+    # Imported here: enumeration is slow to import and not every run needs it
+    import serial.tools.list_ports
+    return [port.device for port in serial.tools.list_ports.comports()]
+
+
+class UARTCore:
+    """One serial session: connection, TX/RX, monitoring, capture and settings"""
+    
+    def __init__(self, config_path=None, defaults=None, on_message=None, on_status=None):
+        # Open Transport (behaves like a serial.Serial) and the stats of the last one
+        self.serial_port = None
+        self.last_link = None
+        
+        # Continuous monitoring: reader thread -> ring buffer
+        self.serial_reader = None
+        self.rx_buffer = RingBuffer(RX_BUFFER_SIZE)
+        
+        # RX framing and binary capture
+        self.framer = Framer()
+        self.capture_writer = None
+        
+        # Front-end callbacks
+        self.on_message = on_message or (lambda text: None)
+        self.on_status = on_status or (lambda text, color: None)
+        # Called with every received chunk, from the thread that read it
+        # (command_worker.py matches responses through it)
+        self.on_rx = None
+        
+        # Settings (front ends add their own keys through defaults)
+        self.config_path = config_path or DEFAULT_CONFIG_PATH
+        self.settings = {
+            "port": "",
+            "baudrate": "115200"
+        }
+        if defaults:
+            self.settings.update(defaults)
+    
+    def connect(self, port, baudrate):
+        """Open the port (name or URL); returns True on success"""
+        if not port or port == NO_PORTS:
+            self.on_message("<No valid port selected>\n")
+            return False
+        try:
+            self.serial_port = open_transport(port, baudrate, timeout=0.1)
+        except Exception as e:
+            self.on_message(f"<Connection error: {str(e)}>\n")
+            self.on_status("Connection Failed", "red")
+            return False
+        
+        self.on_status("Connected", "green")
+        if self.serial_port.kind == "Serial":
+            self.on_message(f"<Connected to {port} at {baudrate} baud>\n")
+        else:
+            self.on_message(f"<Connected to {port} at {baudrate} baud ({self.serial_port.kind}, "
+                            f"{self.serial_port.stats.connect_time * 1000:.1f} ms to connect)>\n")
+        return True
+    
+    def disconnect(self):
+        """Stop monitoring and close the serial port"""
+        self.stop_reader()
+        self.close_port()
+        
+        self.on_status("Disconnected", "red")
+        self.on_message("<Disconnected from device>\n")
+        self.on_message("=================================\n")
+    
+    def close_port(self):
+        """Close the port, keeping its link statistics for link_stats()"""
+        port = self.serial_port
+        self.serial_port = None
+        if port is None:
+            return
+        self.last_link = getattr(port, "stats", None)
+        if port.is_open:
+            port.close()
+    
+    def link_stats(self):
+        """Latency / throughput line of the open (or last closed) link, or None"""
+        stats = getattr(self.serial_port, "stats", None) or self.last_link
+        return stats.describe() if stats is not None else None
+    
+    def is_connected(self):
+        """Return True if the serial port is currently open"""
+        return bool(self.serial_port and self.serial_port.is_open)
+    
+    @property
+    def baudrate(self):
+        """Baud rate of the open port (None when disconnected)"""
+        return self.serial_port.baudrate if self.is_connected() else None
+    
+    def start_reader(self):
+        """Start draining the open port into rx_buffer from a reader thread"""
+        self.framer.reset()
+        self.rx_buffer.clear()
+        self.serial_reader = SerialReader(self.serial_port, self.rx_buffer,
+                                          on_data=self.record_rx)
+        self.serial_reader.start()
+    
+    def stop_reader(self):
+        """Stop the reader thread (data already buffered stays in rx_buffer)"""
+        if self.serial_reader is None:
+            return
+        self.serial_reader.stop()
+        self.serial_reader = None
+    
+    def is_monitoring(self):
+        """Return True while the reader thread owns RX"""
+        return self.serial_reader is not None
+    
+    def reader_error(self):
+        """Error that stopped the reader thread, or None while it is healthy"""
+        reader = self.serial_reader
+        if reader is not None and not reader.is_alive():
+            return reader.error or "reader stopped"
+        return None
+    
+    def send(self, data):
+        """Write bytes to the open port (recorded first so the echo can't precede it)"""
+        self.record_tx(data)
+        self.serial_port.write(data)
+    
+    def read_response(self, rule, stop_event=None, timing=None):
+        """Read one response directly from the port; returns (data, timed_out)"""
+        data, timed_out = read_response(self.serial_port, rule, stop_event, timing)
+        if data:
+            self.record_rx(data)
+        return data, timed_out
+    
+    def transact(self, data, rule, stop_event=None):
+        """Send bytes and read the response"""
+        self.send(data)
+        return self.read_response(rule, stop_event)
+    
+    def set_framing(self, name, param=""):
+        """Select the RX framing (raises ValueError for a bad parameter)"""
+        self.framer = create_framer(name, param)
+        return self.framer
+    
+    def record_tx(self, data):
+        """Add transmitted bytes to the capture file, if recording"""
+        writer = self.capture_writer
+        if writer is not None:
+            writer.write(capture.TX, data)
+    
+    def record_rx(self, data):
+        """Add received bytes to the capture file, if recording, and pass them to on_rx (any thread)"""
+        writer = self.capture_writer
+        if writer is not None:
+            writer.write(capture.RX, data)
+        if self.on_rx is not None:
+            self.on_rx(data)
+    
+    def start_capture(self, path):
+        """Start recording traffic to a capture file (raises OSError)"""
+        self.capture_writer = capture.CaptureWriter(path)
+        return self.capture_writer
+    
+    def stop_capture(self):
+        """Flush and close the capture file; returns the finished writer"""
+        writer = self.capture_writer
+        if writer is None:
+            return None
+        self.capture_writer = None
+        writer.close()
+        if writer.error:
+            self.on_message(f"<Capture error: {str(writer.error)}>\n")
+        return writer
+    
+    def save_settings(self):
+        """Write the settings dict to the config file"""
+        try:
+            with open(self.config_path, 'w') as f:
+                json.dump(self.settings, f)
+            self.on_message("<Settings saved>\n")
+            return True
+        except Exception as e:
+            self.on_message(f"<Error saving settings: {str(e)}>\n")
+            return False
+    
+    def load_settings(self):
+        """Load saved settings if they exist"""
+        try:
+            if os.path.exists(self.config_path):
+                with open(self.config_path, 'r') as f:
+                    loaded_settings = json.load(f)
+                    self.settings.update(loaded_settings)
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+    
+    def close(self):
+        """Release everything (capture file, reader thread, port)"""
+        self.stop_reader()
+        self.stop_capture()
+        self.close_port()
@@ -5,244 +5,987 @@
  ===========================
  - Implements the functionality for the UART HEX Terminal application.
  
+ - Serial, capture and settings logic lives in the Qt-free UARTCore
+   (uart_core.py); this module is the GUI layer on top of it.
+ 
  - Handles: 
-        1. Serial communication
+        1. Serial communication (through UARTCore)
         2. Setting management
         3. User interaction
-
+ 
  - Features:
         1. Serial port connection and communication
         2. Hex data transmission and reception
         3. Settings persistence
         4. Configurable delays
-        5. Continuous monitoring mode
-        6. Threaded operations for non-blocking UI
-
+        5. Continuous monitoring mode (background reader + ring buffer)
+        6. Worker-thread operations for non-blocking UI
+        7. Persistent session mode (port stays open across transmits)
+        8. Batched, frame-rate terminal updates
+        9. Event-driven response completion (length, terminator or idle gap)
+        10. Incremental RX framing (delimiter, length prefix, SLIP, COBS)
+        11. Binary traffic capture with memory-mapped, indexed replay
+        12. Qt-free core shared with the command-line tool (uart_cli.py)
+        13. Scripted sequences with pipelining and a throughput report
+        14. Multi-port sessions serviced by a single selector-based I/O thread
+        15. Optional asyncio engine integrated with the Qt event loop
+        16. Per-transaction timing with rolling histograms (Stats tab)
+        17. Background port enumeration with hotplug updates and auto-reconnect
+        18. Chunked bulk file transmit with RTS/CTS or XON/XOFF flow control
+        19. Precompiled command library with checksum auto-fill, buttons and hotkeys
+        20. Telemetry decoding into NumPy channels with min/max-decimated plotting
+        21. Indexed hex / ASCII / wildcard search over captures with jump-to replay
+        22. Pluggable transports: serial, raw TCP, RFC 2217 and pyserial URLs
+        23. Persistent command worker: prioritized queue with back-pressure and
+            pipelined transmits matched to responses by a transaction-ID field
+        24. Rule-based virtual device on a pty, listed beside the real ports
+ 
  - Classes:
         * UARTTerminal: Main application class
 
 """
 
 import os
-import json
-import serial
-import serial.tools.list_ports
 import time
 import threading
-from PyQt5.QtCore import pyqtSignal, QObject
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QTimer
+from PyQt5.QtWidgets import QFileDialog, QInputDialog
 
 from uart_terminal_ui import UARTTerminalUI
+from output_batcher import OutputBatcher
+from port_watcher import PortWatcher
+from qt_asyncio import QtAsyncioBridge
+import capture
+from framing import Framer, FRAMER_HINTS, create_framer
+from async_serial import AsyncSerial
+from bulk_sender import BulkSender, load_payload
+from capture_search_dialog import CaptureSearchDialog
+from command_worker import (CommandWorker, Request, parse_id_field, PRIORITY_HIGH,
+                            PRIORITY_NORMAL, PRIORITY_LOW)
+from hex_format import parse_hex, to_hex, to_ascii
+from multi_session_window import MultiSessionWindow
+from response_reader import ResponseRule
+from sequence_runner import SequenceRunner, load_sequence
+from transaction_stats import TransactionRecord
+from transports import transport_kind
+from uart_core import UARTCore, NO_PORTS
+from virtual_device import VirtualDevice, load_rules, RULES_FILTER, PTY_AVAILABLE
+
+
+# How often the UI drains the RX ring buffer
+RX_POLL_INTERVAL_MS = 50
+
+# Longest a one-shot transmit waits for the GUI thread to show its response
+RESPONSE_DISPLAY_TIMEOUT = 1.0
 
 
 class CommunicationSignals(QObject):
     """Signals for thread-safe communication between worker threads and UI"""
-    message_received = pyqtSignal(str)
     status_update = pyqtSignal(str, str)  # status text, color
+    rx_received = pyqtSignal(bytes)  # RX bytes to frame and show on the GUI thread
+    response_received = pyqtSignal(bytes, bool)  # one-shot response, final
     connection_complete = pyqtSignal(bool)  # success/failure
+    ports_changed = pyqtSignal(list, list, list)  # added, removed, all ports
+    bulk_progress = pyqtSignal(int, int, float)  # sent, total bytes, elapsed seconds
+    worker_idle = pyqtSignal()  # the command worker has nothing left to do
 
 
 class UARTTerminal(UARTTerminalUI):
     def __init__(self):
         super().__init__()
         
-        # Serial port object
-        self.serial_port = None
-        
-        # Threading
-        self.serial_thread = None
-        self.stop_thread = threading.Event()
+        # Terminal output is batched and flushed once per display frame
+        self.output = OutputBatcher(parent=self)
+        self.output.flushed.connect(self.update_terminal)
+        self.output.stats_changed.connect(self.update_display_stats)
         
         # Signals for thread communication
         self.signals = CommunicationSignals()
-        self.signals.message_received.connect(self.update_terminal)
         self.signals.status_update.connect(self.update_status)
+        self.signals.rx_received.connect(self.show_rx)
+        self.signals.response_received.connect(self.show_response)
         self.signals.connection_complete.connect(self.on_connection_complete)
+        self.signals.ports_changed.connect(self.update_port_list)
+        self.signals.bulk_progress.connect(self.update_bulk_progress)
+        self.signals.worker_idle.connect(self.on_worker_idle)
         
-        # Config file path
-        self.config_path = os.path.join(os.path.expanduser("~"), "uart_config.json")
-        self.settings = {
-            "port": "",
-            "baudrate": "115200"
-        }
+        # Serial session (Qt-free); its output is routed into the GUI
+        self.core = UARTCore(
+            defaults={
+                "persistent": False,
+                "log_lines": 10000,
+                "hex_scrollback_kb": 1024,
+                "response_mode": "Idle gap",
+                "response_param": "",
+                "response_timeout_ms": 2000,
+                "framing": "Raw",
+                "framing_param": "",
+                "engine": "Threads",
+                "bulk_chunk_size": 256,
+                "bulk_chunk_delay_ms": 0,
+                "flow_control": "None",
+                "telemetry_layout": "",
+                "telemetry_history": 1000000,
+                "match_id_field": "",
+                "virtual_device_rules": ""
+            },
+            on_message=self.output.post,
+            on_status=self.signals.status_update.emit
+        )
+        self.settings = self.core.settings
+        
+        # Transaction timing and link statistics, shown in the Stats tab
+        self.transaction_stats = self.stats_panel.stats
+        self.stats_panel.link_stats = self.core.link_stats
+        
+        # Threading: every port operation runs on one long-lived worker, fed
+        # from a prioritized queue (pipelined transmits are matched there);
+        # bytes it reads itself are framed and shown on the GUI thread
+        self.stop_thread = threading.Event()
+        self.worker = CommandWorker(self.core, stop_event=self.stop_thread,
+                                    on_sent=self.on_request_sent,
+                                    on_complete=self.on_request_complete,
+                                    on_rx=self.signals.rx_received.emit,
+                                    on_message=self.output.post,
+                                    on_idle=self.signals.worker_idle.emit)
+        self.worker.start()
+        
+        # Set by the GUI thread once a one-shot response is on screen, so the
+        # worker's later messages (disconnect, timeouts) follow it in the log
+        self.response_shown = threading.Event()
+        
+        # asyncio engine: coroutines run on the GUI thread through the bridge
+        self.bridge = QtAsyncioBridge(self)
+        self.async_task = None
+        
+        # Monitoring paused while a sequence reads the port itself
+        self.resume_monitoring = False
+        
+        # Continuous monitoring: the core's reader thread fills its ring
+        # buffer, a UI timer drains it
+        self.rx_dropped = 0
+        self.rx_timer = QTimer(self)
+        self.rx_timer.setInterval(RX_POLL_INTERVAL_MS)
+        self.rx_timer.timeout.connect(self.drain_rx_buffer)
+        
+        # Port enumeration runs on a watcher thread; a persistent session
+        # lost to an unplugged adapter reopens when the port comes back
+        self.port_watcher = PortWatcher(on_change=self.signals.ports_changed.emit)
+        self.reconnect_port = None
+        
+        # Multi-port window (created on demand)
+        self.multi_window = None
+        
+        # Simulated device on a pty (started on demand), listed as a port
+        self.virtual_device = None
+        
+        # Capture search window (created on demand) and the capture it opens with
+        self.search_dialog = None
+        self.last_capture_path = None
+        
+        # Bytes discarded by the RX framer so far
+        self.framer_dropped = 0
         
         # Load saved settings
-        self.load_settings()
+        self.core.load_settings()
         
         # Connect signals
         self.refresh_button.clicked.connect(self.refresh_ports)
         self.save_button.clicked.connect(self.save_settings)
         self.clear_button.clicked.connect(self.clear_terminal)
         self.transmit_button.clicked.connect(self.send_and_disconnect_threaded)
+        self.run_sequence_button.clicked.connect(self.run_sequence)
+        self.send_file_button.clicked.connect(self.send_file)
+        self.cancel_button.clicked.connect(self.cancel_operation)
+        self.command_panel.command_triggered.connect(self.send_command)
+        self.command_panel.message.connect(self.output.post)
+        self.persistent_check.toggled.connect(self.on_mode_changed)
+        self.connect_button.clicked.connect(self.open_session)
+        self.disconnect_button.clicked.connect(self.close_session)
+        self.multi_port_button.clicked.connect(self.open_multi_session)
+        self.virtual_device_button.clicked.connect(self.toggle_virtual_device)
+        self.log_lines_spin.valueChanged.connect(self.apply_scrollback)
+        self.hex_kb_spin.valueChanged.connect(self.apply_scrollback)
+        self.response_mode_combo.currentTextChanged.connect(self.on_response_mode_changed)
+        self.framing_combo.currentTextChanged.connect(self.apply_framing)
+        self.framing_param_input.editingFinished.connect(self.apply_framing)
+        self.record_check.toggled.connect(self.on_record_toggled)
+        self.open_capture_button.clicked.connect(self.open_capture)
+        self.search_capture_button.clicked.connect(self.open_capture_search)
+        
+        # Initialize the port list (filled in by the watcher's first scan);
+        # a saved network or URL port is never enumerated, so list it now
+        self.port_watcher.start()
+        if transport_kind(self.settings["port"]) != "Serial":
+            self.port_combo.addItem(self.settings["port"])
+            self.port_combo.setCurrentText(self.settings["port"])
         
-        # Initialize the port list
-        self.refresh_ports()
+        # Virtual devices need pseudo-terminals
+        if not PTY_AVAILABLE:
+            self.virtual_device_button.setEnabled(False)
+        
+        # Load and compile the saved commands
+        self.command_panel.load()
         
         # Set default baudrate from settings
         index = self.baud_combo.findText(self.settings["baudrate"])
         if index >= 0:
             self.baud_combo.setCurrentIndex(index)
+        
+        # Restore session mode from settings
+        self.persistent_check.setChecked(bool(self.settings["persistent"]))
+        self.update_session_controls()
+        
+        # Restore scrollback caps from settings
+        self.log_lines_spin.setValue(int(self.settings["log_lines"]))
+        self.hex_kb_spin.setValue(int(self.settings["hex_scrollback_kb"]))
+        self.apply_scrollback()
+        
+        # Restore response completion settings
+        index = self.response_mode_combo.findText(self.settings["response_mode"])
+        if index >= 0:
+            self.response_mode_combo.setCurrentIndex(index)
+        self.response_param_input.setText(self.settings["response_param"])
+        self.response_timeout_spin.setValue(int(self.settings["response_timeout_ms"]))
+        
+        # Restore RX framing
+        self.framing_param_input.setText(self.settings["framing_param"])
+        index = self.framing_combo.findText(self.settings["framing"])
+        if index >= 0:
+            self.framing_combo.setCurrentIndex(index)
+        self.apply_framing()
+        
+        # Restore the transaction-ID field for pipelined transmits
+        self.match_id_input.setText(self.settings["match_id_field"])
+        
+        # Restore the transmit engine (asyncio needs selectable port handles)
+        if os.name != "posix":
+            self.engine_combo.model().item(1).setEnabled(False)
+        index = self.engine_combo.findText(self.settings["engine"])
+        if index >= 0 and os.name == "posix":
+            self.engine_combo.setCurrentIndex(index)
+        
+        # Restore bulk transmit settings
+        self.chunk_size_spin.setValue(int(self.settings["bulk_chunk_size"]))
+        self.chunk_delay_spin.setValue(int(self.settings["bulk_chunk_delay_ms"]))
+        index = self.flow_combo.findText(self.settings["flow_control"])
+        if index >= 0:
+            self.flow_combo.setCurrentIndex(index)
+        
+        # Restore the telemetry layout (decoding starts if one is set)
+        self.telemetry_view.layout_input.setText(self.settings["telemetry_layout"])
+        self.telemetry_view.history_spin.setValue(int(self.settings["telemetry_history"]))
+        self.telemetry_view.apply()
     
     def refresh_ports(self):
-        """Refresh the list of available serial ports"""
-        current_port = self.port_combo.currentText()
-        self.port_combo.clear()
-        ports = [port.device for port in serial.tools.list_ports.comports()]
-        if ports:
-            self.port_combo.addItems(ports)
-            # Restore previous selection if it exists
-            if current_port in ports:
-                index = self.port_combo.findText(current_port)
-                self.port_combo.setCurrentIndex(index)
-            elif self.settings["port"] in ports:
-                index = self.port_combo.findText(self.settings["port"])
-                self.port_combo.setCurrentIndex(index)
-        else:
-            self.port_combo.addItem("No ports available")
+        """Ask the port watcher for an immediate rescan (result arrives later)"""
+        self.port_watcher.refresh()
+    
+    def update_port_list(self, added, removed, ports):
+        """Apply a port list change from the watcher without rebuilding the list"""
+        combo = self.port_combo
+        for port in removed:
+            index = combo.findText(port)
+            # Keep the open port listed until its session notices the loss
+            if index >= 0 and not (self.is_connected() and port == combo.currentText()):
+                combo.removeItem(index)
+        
+        placeholder = combo.findText(NO_PORTS)
+        if added and placeholder >= 0:
+            combo.removeItem(placeholder)
+        for port in added:
+            if combo.findText(port) < 0:
+                combo.addItem(port)
+        if combo.count() == 0:
+            combo.addItem(NO_PORTS)
+        
+        # Select the saved port once it appears, if nothing real is selected
+        if self.settings["port"] in added and combo.currentText() in ("", NO_PORTS):
+            combo.setCurrentIndex(combo.findText(self.settings["port"]))
+        
+        # Reopen a persistent session whose adapter was plugged back in
+        self.reconnect_lost_port(ports)
+    
+    def reconnect_lost_port(self, ports):
+        """Reopen the lost persistent session if its port is listed in ports
+        
+        The port may never show up as added (replugged before the read error
+        was noticed, or within one watcher interval), so check the full list.
+        """
+        port = self.reconnect_port
+        if port not in ports or self.is_connected() or self.is_busy():
+            return
+        combo = self.port_combo
+        if combo.findText(port) < 0:
+            placeholder = combo.findText(NO_PORTS)
+            if placeholder >= 0:
+                combo.removeItem(placeholder)
+            combo.addItem(port)
+        combo.setCurrentIndex(combo.findText(port))
+        self.output.post(f"<{port} is back: reconnecting>\n")
+        self.open_session()
+        if self.is_connected():
+            self.reconnect_port = None
     
     def connect_to_device(self):
         """Establish a connection to the selected serial port"""
-        try:
-            port = self.port_combo.currentText()
-            if port == "No ports available":
-                self.signals.message_received.emit("<No valid port selected>\n")
-                return False
-            
-            baudrate = int(self.baud_combo.currentText())
-            
-            self.serial_port = serial.Serial(
-                port=port,
-                baudrate=baudrate,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE,
-                timeout=0.1
-            )
-
-            # Update UI through signals
-            self.signals.status_update.emit("Connected", "green")
-            self.signals.message_received.emit(f"<Connected to {port} at {baudrate} baud>\n")
-            return True
-            
-        except Exception as e:
-            self.signals.message_received.emit(f"<Connection error: {str(e)}>\n")
-            self.signals.status_update.emit("Connection Failed", "red")
-            return False
+        return self.core.connect(self.port_combo.currentText(), self.baud_combo.currentText())
     
     def disconnect_from_device(self):
         """Disconnect from the current serial port"""
-        if self.serial_port and self.serial_port.is_open:
-            self.serial_port.close()
-            self.serial_port = None
-            
-        # Update UI through signals
-        self.signals.status_update.emit("Disconnected", "red")
-        self.signals.message_received.emit("<Disconnected from device>\n")
-        self.signals.message_received.emit("=================================\n")
-    
-    def serial_worker(self, hex_input):
-        """Worker function that runs in a separate thread"""
-        # Step 1: Connect
-        if not self.connect_to_device():
+        self.core.disconnect()
+    
+    def is_connected(self):
+        """Return True if the serial port is currently open"""
+        return self.core.is_connected()
+    
+    def is_busy(self):
+        """Return True while the worker or a coroutine has work for the serial port"""
+        if self.async_task is not None and not self.async_task.done():
+            return True
+        return self.worker.busy()
+    
+    def open_session(self):
+        """Open a persistent session that is reused for every transmit"""
+        if self.is_busy():
+            self.output.post("<Another operation is in progress>\n")
+            return
+        if not self.is_connected() and self.connect_to_device():
+            self.start_reader()
+        self.update_session_controls()
+    
+    def close_session(self):
+        """Close the persistent session"""
+        if self.is_busy():
+            self.output.post("<Another operation is in progress>\n")
+            return
+        self.reconnect_port = None
+        self.stop_reader()
+        if self.is_connected():
+            self.disconnect_from_device()
+        self.update_session_controls()
+    
+    def on_mode_changed(self, persistent):
+        """Switch between one-shot and stay-connected mode"""
+        if not persistent:
+            self.reconnect_port = None
+        if not persistent and self.is_connected():
+            self.close_session()
+        self.update_session_controls()
+    
+    def start_reader(self):
+        """Start continuous monitoring of the open port"""
+        self.core.start_reader()
+        self.rx_dropped = self.core.rx_buffer.dropped
+        self.rx_timer.start()
+    
+    def stop_reader(self):
+        """Stop continuous monitoring and show any data still buffered"""
+        if not self.core.is_monitoring():
+            return
+        self.core.stop_reader()
+        self.rx_timer.stop()
+        self.drain_rx_buffer()
+    
+    def drain_rx_buffer(self):
+        """Display everything the reader thread has buffered since the last call"""
+        rx_buffer = self.core.rx_buffer
+        data = rx_buffer.read()
+        if data:
+            self.hex_model.append_bytes(data)
+            self.display_rx(data)
+        
+        # Report bytes lost because the buffer overflowed
+        dropped = rx_buffer.dropped - self.rx_dropped
+        if dropped:
+            self.rx_dropped = rx_buffer.dropped
+            self.output.post(f"<RX buffer overflow: {dropped} bytes dropped>\n")
+        
+        # The reader exits on its own if the port fails (e.g. unplugged)
+        error = self.core.reader_error()
+        if error is not None and not self.is_busy():
+            self.output.post(f"<Read error: {error}>\n")
+            lost_port = self.port_combo.currentText()
+            self.close_session()
+            if self.persistent_check.isChecked():
+                self.reconnect_port = lost_port
+                self.output.post(f"<Waiting for {lost_port} to reconnect>\n")
+                # The port may already be back; a rescan reports it either way
+                self.port_watcher.refresh()
+    
+    def show_rx(self, data):
+        """Add bytes received off the GUI thread to the hex dump and terminal"""
+        self.hex_model.append_bytes(data)
+        self.display_rx(data)
+    
+    def show_response(self, data, final):
+        """Show a response collected on the worker thread, then release the worker"""
+        self.hex_model.append_bytes(data)
+        self.display_rx(data, final)
+        self.response_shown.set()
+    
+    def display_rx(self, data, final=False):
+        """Split received bytes into frames and post each one to the terminal
+        
+        With final, an unfinished frame is shown as incomplete and discarded
+        (used at the end of a one-shot transaction).
+        """
+        framer = self.core.framer
+        frames = framer.feed(data)
+        # Raw framing passes chunks through: telemetry cuts the stream itself
+        self.telemetry_view.feed(frames, stream=type(framer) is Framer)
+        for frame in frames:
+            self.output.post(f"RX: {to_hex(frame)}\n")
+            self.output.post(f"RX (ASCII): {to_ascii(frame)}\n")
+        
+        if final:
+            partial = framer.pending()
+            if partial:
+                self.output.post(f"RX (incomplete frame): {to_hex(partial)}\n")
+            framer.reset()
+        
+        dropped = framer.dropped - self.framer_dropped
+        if dropped:
+            self.framer_dropped = framer.dropped
+            self.output.post(f"<Framing: {dropped} bytes discarded>\n")
+    
+    def apply_framing(self):
+        """Switch to the RX framing selected in the UI"""
+        name = self.framing_combo.currentText()
+        self.framing_param_input.setPlaceholderText(FRAMER_HINTS[name])
+        self.framing_param_input.setEnabled(bool(FRAMER_HINTS[name]))
+        try:
+            self.core.set_framing(name, self.framing_param_input.text())
+        except ValueError as e:
+            self.output.post(f"<Invalid framing parameter: {e}>\n")
+            self.core.framer = Framer()
+        self.framer_dropped = 0
+    
+    def new_framer(self):
+        """A fresh framer for the framing selected in the UI (Raw if invalid)"""
+        try:
+            return create_framer(self.framing_combo.currentText(), self.framing_param_input.text())
+        except ValueError:
+            return Framer()
+    
+    def framer_factory(self):
+        """new_framer for the framing selected now, callable from any thread"""
+        name = self.framing_combo.currentText()
+        param = self.framing_param_input.text()
+        try:
+            create_framer(name, param)
+        except ValueError:
+            return Framer
+        return lambda: create_framer(name, param)
+    
+    def open_multi_session(self):
+        """Show the multi-port window (one I/O thread for all its ports)"""
+        if self.multi_window is None or not self.multi_window.isVisible():
+            self.multi_window = MultiSessionWindow(make_framer=self.new_framer,
+                                                   ports=lambda: list(self.port_watcher.ports))
+        self.multi_window.show()
+        self.multi_window.raise_()
+    
+    def is_virtual_port(self, port):
+        """Return True if port is the running virtual device's pty"""
+        return self.virtual_device is not None and port == self.virtual_device.port
+    
+    def toggle_virtual_device(self):
+        """Start a virtual device from a rules file, or stop the running one"""
+        if self.virtual_device is not None:
+            self.stop_virtual_device()
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Virtual Device Rules", self.settings["virtual_device_rules"], RULES_FILTER
+        )
+        if path:
+            self.start_virtual_device(path)
+    
+    def start_virtual_device(self, path):
+        """Run a simulated device and select its pty in the port list"""
+        try:
+            rules = load_rules(path)
+            device = VirtualDevice(rules, name=os.path.basename(path))
+        except (OSError, ValueError) as e:
+            self.output.post(f"<Virtual device error: {str(e)}>\n")
+            return False
+        device.start()
+        self.virtual_device = device
+        self.settings["virtual_device_rules"] = path
+        
+        combo = self.port_combo
+        placeholder = combo.findText(NO_PORTS)
+        if placeholder >= 0:
+            combo.removeItem(placeholder)
+        combo.addItem(device.port)
+        index = combo.findText(device.port)
+        combo.setItemData(index, f"Virtual device ({device.label})", Qt.ToolTipRole)
+        if not self.is_connected():
+            combo.setCurrentIndex(index)
+        self.virtual_device_button.setText("Stop Virtual Device")
+        
+        self.output.post(
+            f"<Virtual device on {device.port} ({device.label}): {len(rules.rules)} rules>\n"
+        )
+        for stream in device.streams:
+            self.output.post(f"<Stream: {stream.describe()}>\n")
+        return True
+    
+    def stop_virtual_device(self):
+        """Stop the virtual device, closing a session that uses it"""
+        device = self.virtual_device
+        if self.is_connected() and self.is_virtual_port(self.port_combo.currentText()):
+            if self.is_busy():
+                self.output.post("<Another operation is in progress>\n")
+                return
+            self.close_session()
+        device.stop()
+        self.virtual_device = None
+        
+        combo = self.port_combo
+        index = combo.findText(device.port)
+        if index >= 0:
+            combo.removeItem(index)
+        if combo.count() == 0:
+            combo.addItem(NO_PORTS)
+        self.virtual_device_button.setText("Virtual Device...")
+        self.output.post(f"<Virtual device stopped: {device.describe()}>\n")
+    
+    def update_session_controls(self):
+        """Enable or disable the session widgets for the current state"""
+        connected = self.is_connected()
+        persistent = self.persistent_check.isChecked()
+        self.connect_button.setEnabled(persistent and not connected)
+        self.disconnect_button.setEnabled(connected)
+        self.port_combo.setEnabled(not connected)
+        self.baud_combo.setEnabled(not connected)
+        self.refresh_button.setEnabled(not connected)
+    
+    def serial_worker(self, byte_data, keep_open=False, rule=None, label=None):
+        """One transmit, run as a job on the command worker
+        
+        With keep_open the port is reused if already open and left open.
+        The response is complete when `rule` (a ResponseRule) is met.
+        """
+        if rule is None:
+            rule = ResponseRule.for_gap(int(self.baud_combo.currentText()))
+        
+        # Step 1: Connect (skipped when a session is already open)
+        timing = {"start": time.perf_counter()}
+        if not self.is_connected() and not self.connect_to_device():
             self.signals.connection_complete.emit(False)
             return
-            
+        timing["opened"] = time.perf_counter()
+        
         # Step 2: Send message
         try:
-            # Remove any spaces and validate hex characters
-            hex_input = ''.join(hex_input.split())
-            
-            # Check if input is valid hex
-            try:
-                byte_data = bytes.fromhex(hex_input)
-            except ValueError:
-                self.signals.message_received.emit("<Invalid hex format>\n")
-                self.disconnect_from_device()
-                self.signals.connection_complete.emit(False)
-                return
-                
             # Send the data
-            self.serial_port.write(byte_data)
+            self.core.send(byte_data)
+            timing["write_done"] = time.perf_counter()
             
             # Display what was sent
-            formatted_hex = ' '.join([hex_input[i:i+2] for i in range(0, len(hex_input), 2)]).upper()
-            self.signals.message_received.emit(f"TX: {formatted_hex}\n")
-
-            # Wait a bit for response
-            # time.sleep(0.5)
-            
-            # Check for response with timeout
-            timeout = time.time() + 2  # 2 second timeout
-            received_data = bytearray()
+            formatted_hex = to_hex(byte_data)
+            tag = f" [{label}]" if label else ""
+            self.output.post(f"TX{tag}: {formatted_hex}\n")
             
-            while time.time() < timeout:
-                if self.stop_thread.is_set():
-                    break
-                    
-                bytes_available = self.serial_port.in_waiting
-                if bytes_available > 0:
-                    data = self.serial_port.read(bytes_available)
-                    received_data.extend(data)
-                    # Continue reading for a bit more to catch complete response
-                    time.sleep(0.1)
+            # Collect the response here unless the monitoring reader thread
+            # owns RX, in which case it shows up through the ring buffer
+            if not self.core.is_monitoring():
+                received_data, timed_out = self.core.read_response(rule, self.stop_thread, timing)
+                self.transaction_stats.add(TransactionRecord.from_timing(
+                    timing, len(byte_data), len(received_data), timed_out or not received_data))
+                
+                if received_data:
+                    # Hex and ASCII of every frame in the response, framed on
+                    # the GUI thread (the framer is shared with the reader path)
+                    self.response_shown.clear()
+                    self.signals.response_received.emit(received_data, True)
+                    self.response_shown.wait(RESPONSE_DISPLAY_TIMEOUT)
+                    if timed_out:
+                        self.output.post(f"<Response incomplete: no {rule.describe()} "
+                                         f"within {rule.timeout * 1000:.0f} ms>\n")
                 else:
-                    # If we already have some data and no more is coming, break
-                    if received_data:
-                        break
-                    time.sleep(0.05)
-            
-            if received_data:
-                hex_data = received_data.hex(' ').upper()
-                self.signals.message_received.emit(f"RX: {hex_data}\n")
-                # Also show ASCII representation if printable
-                ascii_data = ''.join(chr(b) if 32 <= b < 127 else '.' for b in received_data)
-                self.signals.message_received.emit(f"RX (ASCII): {ascii_data}\n")
+                    self.output.post("RX: <No response received>\n")
             else:
-                self.signals.message_received.emit("RX: <No response received>\n")
-            
+                self.transaction_stats.add(TransactionRecord.from_timing(timing, len(byte_data), 0, False))
+        
         except Exception as e:
-            self.signals.message_received.emit(f"<Send error: {str(e)}>\n")
+            self.output.post(f"<Send error: {str(e)}>\n")
         
-        # Step 3: Disconnect
-        self.disconnect_from_device()
+        # Step 3: Disconnect (one-shot mode only)
+        if not keep_open:
+            self.disconnect_from_device()
         self.signals.connection_complete.emit(True)
     
     def send_and_disconnect_threaded(self):
-        """Connect, send message, and disconnect workflow using threading"""
-        # Check if a thread is already running
-        if self.serial_thread and self.serial_thread.is_alive():
-            self.terminal_display.append("<Another operation is in progress>\n")
-            return
-        
-        # Get hex input
+        """Connect, send message, and disconnect workflow on the command worker"""
+        # Get hex input (parsed once, here; the worker gets bytes)
         hex_input = self.transmit_input.text().strip()
         if not hex_input:
-            self.terminal_display.append("<No data to send>\n")
+            self.output.post("<No data to send>\n")
+            return
+        try:
+            byte_data = parse_hex(hex_input)
+        except ValueError:
+            self.output.post("<Invalid hex format>\n")
+            return
+        self.transmit_frame(byte_data)
+    
+    def send_command(self, name, frame):
+        """Send a precompiled library frame (button or hotkey), ahead of queued transmits"""
+        self.transmit_frame(frame, PRIORITY_HIGH, name)
+    
+    def transmit_frame(self, byte_data, priority=PRIORITY_NORMAL, label=None):
+        """Queue bytes for sending and collect the response on the selected engine"""
+        asyncio_engine = self.engine_combo.currentText() == "asyncio"
+        if asyncio_engine and self.is_busy():
+            self.output.post("<Another operation is in progress>\n")
+            return
+        
+        # Response completion rule (validated here, on the GUI thread)
+        rule = self.build_response_rule()
+        if rule is None:
+            return
+        
+        # In stay-connected mode open the session (and its reader) first
+        keep_open = self.persistent_check.isChecked() or self.is_connected()
+        if keep_open and not self.is_connected():
+            self.open_session()
+            if not self.is_connected():
+                return
+        
+        # asyncio engine: await the response on the GUI thread instead
+        if asyncio_engine:
+            self.transmit_button.setEnabled(False)
+            self.transmit_button.setText("Sending...")
+            self.run_sequence_button.setEnabled(False)
+            self.send_file_button.setEnabled(False)
+            self.disconnect_button.setEnabled(False)
+            self.async_task = self.bridge.create_task(
+                self.async_transmit(byte_data, keep_open, rule)
+            )
+            return
+        
+        # On an open port with a framing, requests can be pipelined: up to
+        # the pipeline depth stay outstanding, matched by ID (or in order)
+        depth = self.pipeline_depth_spin.value()
+        id_text = self.match_id_input.text().strip()
+        pipelined = keep_open and (depth > 1 or id_text)
+        if pipelined and type(self.core.framer) is Framer:
+            if id_text:
+                self.output.post("<Matching by ID needs a framing other than Raw: "
+                                 "waiting for each response>\n")
+            pipelined = False
+        try:
+            if pipelined:
+                self.worker.configure(depth, parse_id_field(id_text), self.framer_factory())
+                queued = self.worker.submit(Request(byte_data, rule.timeout, label), priority)
+            else:
+                queued = self.worker.submit(
+                    lambda: self.serial_worker(byte_data, keep_open, rule, label), priority
+                )
+        except ValueError as e:
+            self.output.post(f"<Cannot match responses: {e}>\n")
+            return
+        if not queued:
+            self.output.post(f"<Command queue full ({self.worker.pending()} waiting): not sent>\n")
+            return
+        self.cancel_button.setEnabled(True)
+    
+    def on_request_sent(self, request):
+        """A pipelined request is going out (worker thread)"""
+        tag = f" [{request.label}]" if request.label else ""
+        self.output.post(f"TX #{request.number}{tag}: {to_hex(request.data)}\n")
+    
+    def on_request_complete(self, request):
+        """A pipelined request was answered, timed out or dropped (any thread)
+        
+        The response itself is displayed by the RX path like any other data.
+        """
+        if request.cancelled:
+            return
+        if request.error is not None:
+            self.output.post(f"<Send error: #{request.number}: {request.error}>\n")
+            return
+        received = len(request.response) if request.response is not None else 0
+        self.transaction_stats.add(TransactionRecord.from_timing(
+            request.timing, len(request.data), received, request.timed_out))
+        if request.timed_out:
+            self.output.post(f"<No response to #{request.number} "
+                             f"within {request.timeout * 1000:.0f} ms>\n")
+        else:
+            key = f" (ID {to_hex(request.key)})" if request.key is not None else ""
+            self.output.post(f"<#{request.number} answered in "
+                             f"{request.latency() * 1000:.1f} ms{key}>\n")
+    
+    def on_worker_idle(self):
+        """Nothing left on the command worker: nothing to cancel"""
+        self.cancel_button.setEnabled(False)
+    
+    async def async_transmit(self, byte_data, keep_open, rule):
+        """asyncio version of serial_worker, run on the GUI thread"""
+        # Step 1: Connect (skipped when a session is already open)
+        timing = {"start": time.perf_counter()}
+        if not self.is_connected() and not self.connect_to_device():
+            self.on_connection_complete(False)
+            return
+        timing["opened"] = time.perf_counter()
+        
+        # Step 2: Send message and await the response
+        try:
+            if self.core.is_monitoring():
+                # The reader thread owns RX; the echo arrives through it
+                self.core.send(byte_data)
+                timing["write_done"] = time.perf_counter()
+                self.output.post(f"TX: {to_hex(byte_data)}\n")
+                self.transaction_stats.add(TransactionRecord.from_timing(timing, len(byte_data), 0, False))
+            else:
+                port = AsyncSerial(self.core.serial_port, self.bridge.loop,
+                                   on_data=self.on_async_data)
+                port.start()
+                try:
+                    self.core.record_tx(byte_data)
+                    self.output.post(f"TX: {to_hex(byte_data)}\n")
+                    received_data, timed_out = await port.transact(byte_data, rule, timing)
+                finally:
+                    port.close()
+                self.transaction_stats.add(TransactionRecord.from_timing(
+                    timing, len(byte_data), len(received_data), timed_out or not received_data))
+                
+                if received_data:
+                    self.core.record_rx(received_data)
+                    self.hex_model.append_bytes(received_data)
+                    self.display_rx(received_data, final=True)
+                    if timed_out:
+                        self.output.post(f"<Response incomplete: no {rule.describe()} "
+                                         f"within {rule.timeout * 1000:.0f} ms>\n")
+                else:
+                    self.output.post("RX: <No response received>\n")
+        except Exception as e:
+            self.output.post(f"<Send error: {str(e)}>\n")
+        
+        # Step 3: Disconnect (one-shot mode only)
+        if not keep_open:
+            self.disconnect_from_device()
+        self.on_connection_complete(True)
+    
+    def on_async_data(self, data):
+        """Bytes the asyncio engine received outside a transaction"""
+        self.core.record_rx(data)
+        self.hex_model.append_bytes(data)
+        self.display_rx(data)
+    
+    def sequence_worker(self, steps, rule, depth, keep_open):
+        """Worker function that runs a sequence file over one connection"""
+        # Step 1: Connect (skipped when a session is already open)
+        if not self.is_connected() and not self.connect_to_device():
+            self.signals.connection_complete.emit(False)
+            return
+        
+        # Step 2: Run every step, then report
+        try:
+            runner = SequenceRunner(self.core, steps, rule, depth, self.stop_thread,
+                                    on_result=lambda result: self.output.post(result.describe() + "\n"))
+            report = runner.run()
+            for line in report.summary_lines():
+                self.output.post(f"<{line}>\n")
+        except Exception as e:
+            self.output.post(f"<Sequence error: {str(e)}>\n")
+        
+        # Step 3: Disconnect (one-shot mode only)
+        if not keep_open:
+            self.disconnect_from_device()
+        self.signals.connection_complete.emit(True)
+    
+    def run_sequence(self):
+        """Pick a sequence file and run it on the command worker"""
+        if self.is_busy():
+            self.output.post("<Another operation is in progress>\n")
+            return
+        
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Run Sequence", "", "Sequence files (*.txt *.seq);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            steps = load_sequence(path)
+        except (OSError, ValueError) as e:
+            self.output.post(f"<Sequence error: {str(e)}>\n")
+            return
+        if not steps:
+            self.output.post("<Sequence is empty>\n")
+            return
+        
+        rule = self.build_response_rule()
+        if rule is None:
             return
+        depth = self.pipeline_depth_spin.value()
+        if depth > 1 and type(self.core.framer) is Framer:
+            self.output.post("<Pipelining needs a framing other than Raw: running one step at a time>\n")
         
-        # Disable send button during operation
+        # The runner reads responses itself, so pause the monitoring reader
+        keep_open = self.persistent_check.isChecked() or self.is_connected()
+        self.resume_monitoring = self.core.is_monitoring()
+        self.stop_reader()
+        
+        self.output.post(f"<Running {len(steps)} steps from {os.path.basename(path)}>\n")
         self.transmit_button.setEnabled(False)
-        self.transmit_button.setText("Sending...")
+        self.run_sequence_button.setEnabled(False)
+        self.run_sequence_button.setText("Running...")
+        self.send_file_button.setEnabled(False)
+        self.disconnect_button.setEnabled(False)
+        
+        self.cancel_button.setEnabled(True)
+        self.worker.submit(lambda: self.sequence_worker(steps, rule, depth, keep_open), PRIORITY_LOW)
+    
+    def bulk_worker(self, data, chunk_size, flow, chunk_delay, keep_open):
+        """Worker function that streams a payload in chunks"""
+        # Step 1: Connect (skipped when a session is already open)
+        if not self.is_connected() and not self.connect_to_device():
+            self.signals.connection_complete.emit(False)
+            return
+        
+        # Step 2: Send every chunk; replies show up as RX meanwhile
+        try:
+            sender = BulkSender(self.core, data, chunk_size, flow, chunk_delay,
+                                stop_event=self.stop_thread,
+                                on_progress=self.signals.bulk_progress.emit,
+                                on_rx=self.on_bulk_rx)
+            report = sender.run()
+            self.output.post(f"<{report.describe()}>\n")
+        except Exception as e:
+            self.output.post(f"<Send error: {str(e)}>\n")
+        
+        # Step 3: Disconnect (one-shot mode only)
+        if not keep_open:
+            self.disconnect_from_device()
+        self.signals.connection_complete.emit(True)
+    
+    def on_bulk_rx(self, data):
+        """Bytes received during a one-shot bulk transfer (worker thread)
         
-        # Reset stop event
-        self.stop_thread.clear()
+        Framing and telemetry state belong to the GUI thread, so the bytes
+        are framed there.
+        """
+        self.signals.rx_received.emit(data)
+    
+    def send_file(self):
+        """Pick a binary or hex file and stream it on the command worker"""
+        if self.is_busy():
+            self.output.post("<Another operation is in progress>\n")
+            return
         
-        # Create and start thread
-        self.serial_thread = threading.Thread(
-            target=self.serial_worker,
-            args=(hex_input,),
-            daemon=True
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Send File", "", "All files (*);;Binary (*.bin);;Hex text (*.txt *.hex)"
         )
-        self.serial_thread.start()
+        if not path:
+            return
+        try:
+            data = load_payload(path)
+        except (OSError, ValueError) as e:
+            self.output.post(f"<Cannot load {os.path.basename(path)}: {str(e)}>\n")
+            return
+        if not data:
+            self.output.post("<File is empty>\n")
+            return
+        
+        keep_open = self.persistent_check.isChecked() or self.is_connected()
+        if keep_open and not self.is_connected():
+            self.open_session()
+            if not self.is_connected():
+                return
+        
+        chunk_size = self.chunk_size_spin.value()
+        flow = self.flow_combo.currentText()
+        self.output.post(f"<Sending {os.path.basename(path)}: {len(data)} bytes, "
+                         f"{chunk_size}-byte chunks, flow control {flow}>\n")
+        self.bulk_progress.setRange(0, len(data))
+        self.bulk_progress.setValue(0)
+        self.bulk_progress.setFormat("%p%")
+        self.transmit_button.setEnabled(False)
+        self.run_sequence_button.setEnabled(False)
+        self.send_file_button.setEnabled(False)
+        self.send_file_button.setText("Sending...")
+        self.cancel_button.setEnabled(True)
+        self.disconnect_button.setEnabled(False)
+        
+        chunk_delay = self.chunk_delay_spin.value() / 1000.0
+        self.worker.submit(lambda: self.bulk_worker(data, chunk_size, flow, chunk_delay, keep_open),
+                           PRIORITY_LOW)
+    
+    def update_bulk_progress(self, sent, total, elapsed):
+        """Show bulk transfer progress and the average rate"""
+        rate = sent / elapsed if elapsed > 0 else 0.0
+        self.bulk_progress.setMaximum(max(total, 1))
+        self.bulk_progress.setValue(sent)
+        self.bulk_progress.setFormat(f"%p%  {sent} / {total} B  {rate / 1024:.1f} KB/s")
+    
+    def cancel_operation(self):
+        """Drop queued commands and ask the running operation to stop"""
+        dropped = self.worker.cancel()
+        if dropped:
+            self.output.post(f"<Cancelled: {dropped} queued commands dropped>\n")
+        self.cancel_button.setEnabled(False)
+    
+    def build_response_rule(self):
+        """Build the ResponseRule from the UI, or None if the input is invalid"""
+        mode = self.response_mode_combo.currentText()
+        param = self.response_param_input.text().strip()
+        timeout = self.response_timeout_spin.value() / 1000.0
+        baudrate = int(self.baud_combo.currentText())
+        
+        try:
+            if mode == "Length":
+                length = int(param)
+                if length <= 0:
+                    raise ValueError
+                return ResponseRule(expected_length=length, timeout=timeout)
+            if mode == "Terminator":
+                terminator = parse_hex(param)
+                if not terminator:
+                    raise ValueError
+                return ResponseRule(terminator=terminator, timeout=timeout)
+            gap = float(param) / 1000.0 if param else None
+            return ResponseRule.for_gap(baudrate, gap, timeout)
+        except ValueError:
+            self.output.post(f"<Invalid response setting for {mode}: '{param}'>\n")
+            return None
+    
+    def on_response_mode_changed(self, mode):
+        """Show what the response parameter means for the selected mode"""
+        hints = {
+            "Idle gap": "gap ms (empty = auto from baudrate)",
+            "Length": "number of bytes",
+            "Terminator": "hex bytes (e.g., 0D 0A)",
+        }
+        self.response_param_input.setPlaceholderText(hints[mode])
     
     def on_connection_complete(self, success):
         """Called when the threaded operation completes"""
         self.transmit_button.setEnabled(True)
         self.transmit_button.setText("Send Hex")
+        self.run_sequence_button.setEnabled(True)
+        self.run_sequence_button.setText("Run Sequence...")
+        self.send_file_button.setEnabled(True)
+        self.send_file_button.setText("Send File...")
+        
+        # Resume monitoring paused for a sequence run
+        if self.resume_monitoring and self.is_connected():
+            self.start_reader()
+        self.resume_monitoring = False
+        self.update_session_controls()
     
     def update_terminal(self, message):
-        """Thread-safe method to update terminal display"""
+        """Append a batch of flushed messages to the terminal display"""
         self.terminal_display.append(message)
     
+    def update_display_stats(self, posted, coalesced, dropped):
+        """Show how much output was batched or dropped"""
+        self.display_stats_label.setText(
+            f"Display: {posted} messages, {coalesced} coalesced, {dropped} dropped"
+        )
+    
     def update_status(self, status_text, color):
         """Thread-safe method to update status"""
         self.status_value.setText(status_text)
@@ -251,42 +994,177 @@ class UARTTerminal(UARTTerminalUI):
     def save_settings(self):
         """Save the current port and baudrate settings"""
         port = self.port_combo.currentText()
-        if port != "No ports available":
+        # A virtual device's pty is gone after a restart
+        if port != NO_PORTS and not self.is_virtual_port(port):
             self.settings["port"] = port
         self.settings["baudrate"] = self.baud_combo.currentText()
+        self.settings["persistent"] = self.persistent_check.isChecked()
+        self.settings["log_lines"] = self.log_lines_spin.value()
+        self.settings["hex_scrollback_kb"] = self.hex_kb_spin.value()
+        self.settings["response_mode"] = self.response_mode_combo.currentText()
+        self.settings["response_param"] = self.response_param_input.text().strip()
+        self.settings["response_timeout_ms"] = self.response_timeout_spin.value()
+        self.settings["framing"] = self.framing_combo.currentText()
+        self.settings["framing_param"] = self.framing_param_input.text().strip()
+        self.settings["engine"] = self.engine_combo.currentText()
+        self.settings["bulk_chunk_size"] = self.chunk_size_spin.value()
+        self.settings["bulk_chunk_delay_ms"] = self.chunk_delay_spin.value()
+        self.settings["flow_control"] = self.flow_combo.currentText()
+        self.settings["telemetry_layout"] = self.telemetry_view.layout_input.text().strip()
+        self.settings["telemetry_history"] = self.telemetry_view.history_spin.value()
+        self.settings["match_id_field"] = self.match_id_input.text().strip()
+        self.core.save_settings()
+    
+    def on_record_toggled(self, checked):
+        """Start or stop recording to a capture file"""
+        if checked:
+            self.start_capture()
+        else:
+            self.stop_capture()
+    
+    def start_capture(self):
+        """Ask for a file name and start the background capture writer"""
+        default = time.strftime("capture_%Y%m%d_%H%M%S.uartcap")
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Record Capture", default, "UART captures (*.uartcap);;All files (*)"
+        )
+        if not path:
+            self.record_check.setChecked(False)
+            return
+        try:
+            self.core.start_capture(path)
+        except OSError as e:
+            self.output.post(f"<Capture error: {str(e)}>\n")
+            self.record_check.setChecked(False)
+            return
+        self.last_capture_path = path
+        self.capture_label.setText(f"Recording to {os.path.basename(path)}")
+        self.output.post(f"<Recording to {path}>\n")
+    
+    def stop_capture(self):
+        """Flush and close the capture file"""
+        writer = self.core.stop_capture()
+        if writer is None:
+            return
+        self.capture_label.setText(
+            f"Saved {writer.records} records ({writer.bytes_written} bytes)"
+        )
+        self.output.post(f"<Capture saved: {writer.path}>\n")
+    
+    def open_capture(self):
+        """Open a capture file and replay it from a chosen time"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Capture", "", "UART captures (*.uartcap);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            reader = capture.CaptureReader(path)
+        except (OSError, ValueError) as e:
+            self.output.post(f"<Cannot open capture: {str(e)}>\n")
+            return
+        self.last_capture_path = path
         
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(self.settings, f)
-            self.terminal_display.append("<Settings saved>\n")
-        except Exception as e:
-            self.terminal_display.append(f"<Error saving settings: {str(e)}>\n")
+            duration = max(0.0, reader.end_time() - reader.start_time)
+            start, ok = QInputDialog.getDouble(
+                self, "Replay Capture", f"Start at second (0 - {duration:.3f}):",
+                0.0, 0.0, duration, 3
+            )
+            if ok:
+                self.replay_capture(reader, reader.start_time + start)
+        finally:
+            reader.close()
     
-    def load_settings(self):
-        """Load saved settings if they exist"""
+    def open_capture_search(self):
+        """Show the search window on the last recorded or opened capture"""
+        if self.search_dialog is None:
+            self.search_dialog = CaptureSearchDialog(self)
+            self.search_dialog.jump_requested.connect(self.jump_to_capture)
+        if self.last_capture_path and os.path.exists(self.last_capture_path):
+            self.search_dialog.open_capture(self.last_capture_path)
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+        self.search_dialog.activateWindow()
+    
+    def jump_to_capture(self, path, record_offset):
+        """Replay a capture from the record of a search hit"""
         try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r') as f:
-                    loaded_settings = json.load(f)
-                    self.settings.update(loaded_settings)
-        except Exception as e:
-            print(f"Error loading settings: {e}")
+            reader = capture.CaptureReader(path)
+        except (OSError, ValueError) as e:
+            self.output.post(f"<Cannot open capture: {str(e)}>\n")
+            return
+        self.last_capture_path = path
+        try:
+            self.replay_capture(reader, offset=record_offset)
+        finally:
+            reader.close()
+        # Show the hit's record (first line) rather than the end of the replay
+        self.output.flush()
+        self.terminal_display.verticalScrollBar().setValue(0)
+    
+    def replay_capture(self, reader, start_time=None, offset=None):
+        """Replay records from start_time (or a record offset) into the log and the hex dump
+        
+        Only as much as the scrollback caps can show is read from the file.
+        """
+        self.clear_terminal()
+        self.output.post(f"<Replaying {reader.path}>\n")
+        
+        if offset is None:
+            offset = reader.seek_time(start_time)
+        if offset is None:
+            self.output.post("<No records after the selected time>\n")
+            return
+        
+        # Every posted entry takes its line plus a blank separator line
+        line_budget = max(1, self.log_lines_spin.value() // 2 - 2)
+        byte_budget = self.hex_kb_spin.value() * 1024
+        lines = 0
+        rx_bytes = 0
+        for offset, timestamp, direction, payload in reader.records(offset):
+            if lines >= line_budget and rx_bytes >= byte_budget:
+                break
+            data = bytes(payload)
+            if direction == capture.RX and rx_bytes < byte_budget:
+                self.hex_model.append_bytes(data)
+                rx_bytes += len(data)
+            if lines < line_budget:
+                name = capture.DIRECTION_NAMES.get(direction, "??")
+                self.output.post(f"[{timestamp - reader.start_time:10.3f}] {name}: {to_hex(data)}\n")
+                lines += 1
+        self.output.post("<Replay finished>\n")
+    
+    def apply_scrollback(self):
+        """Apply the scrollback caps of the log and the hex dump"""
+        self.terminal_display.document().setMaximumBlockCount(self.log_lines_spin.value())
+        self.hex_model.set_max_bytes(self.hex_kb_spin.value() * 1024)
     
     def clear_terminal(self):
         """Clear the terminal display"""
         self.terminal_display.clear()
+        self.hex_model.clear()
     
     def closeEvent(self, event):
         """Handle window close event to properly clean up resources"""
-        # Signal thread to stop
+        # Signal threads to stop
         self.stop_thread.set()
+        self.stop_reader()
+        self.stop_capture()
+        self.output.stop()
+        if self.multi_window is not None:
+            self.multi_window.close()
+        if self.search_dialog is not None:
+            self.search_dialog.close()
+        self.bridge.close()
+        if self.virtual_device is not None:
+            self.virtual_device.stop()
+        self.port_watcher.stop()
         
-        # Wait for thread to finish
-        if self.serial_thread and self.serial_thread.is_alive():
-            self.serial_thread.join(timeout=1.0)
+        # Wait for the worker to finish its current operation
+        self.worker.close(timeout=1.0)
         
         # Close serial port
-        if self.serial_port and self.serial_port.is_open:
-            self.serial_port.close()
+        self.core.close()
         
         event.accept()
\ No newline at end of file
@@ -7,13 +7,25 @@
  
  - Contains the UI layout & components
 
+ - The terminal shows a line-capped text log and a virtualized hex dump
+   of received bytes (see hex_view.py)
+
  - Classes:
         * UARTTerminalUI: Main window UI class
 """
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QComboBox, QPushButton, QLabel, 
-                             QTextEdit, QLineEdit, QGridLayout, QGroupBox)
+                             QTextEdit, QLineEdit, QGridLayout, QGroupBox,
+                             QCheckBox, QTabWidget, QSpinBox, QProgressBar)
+from bulk_sender import FLOW_NAMES, DEFAULT_CHUNK_SIZE
+from command_panel import CommandPanel
+from hex_view import HexDumpView
+from stats_panel import StatsPanel
+from telemetry_view import TelemetryView
+from framing import FRAMER_NAMES
+from transports import PORT_HINT
+from uart_core import BAUD_RATES
 
 
 class UARTTerminalUI(QMainWindow):
@@ -39,12 +51,14 @@ class UARTTerminalUI(QMainWindow):
         # Port selection
         self.port_label = QLabel("Port:")
         self.port_combo = QComboBox()
+        self.port_combo.setEditable(True)
+        self.port_combo.setToolTip(PORT_HINT)
         self.refresh_button = QPushButton("Refresh")
         
         # Baudrate selection
         self.baud_label = QLabel("Baudrate:")
         self.baud_combo = QComboBox()
-        self.baud_combo.addItems(["9600", "19200", "38400", "57600", "115200", "230400", "460800", "921600"])
+        self.baud_combo.addItems(BAUD_RATES)
         
         # Save settings button
         self.save_button = QPushButton("Save Settings")
@@ -54,6 +68,27 @@ class UARTTerminalUI(QMainWindow):
         self.status_value = QLabel("Disconnected")
         self.status_value.setStyleSheet("color: red;")
         
+        # Session mode: one-shot (default) or stay connected
+        self.mode_label = QLabel("Mode:")
+        self.persistent_check = QCheckBox("Stay connected")
+        self.connect_button = QPushButton("Connect")
+        self.disconnect_button = QPushButton("Disconnect")
+        self.multi_port_button = QPushButton("Multi-Port...")
+        self.virtual_device_button = QPushButton("Virtual Device...")
+        self.virtual_device_button.setToolTip(
+            "Simulate a device on a pty from a rules file (replies, latency, streams)"
+        )
+        self.connect_button.setEnabled(False)
+        self.disconnect_button.setEnabled(False)
+        
+        session_layout = QHBoxLayout()
+        session_layout.addWidget(self.persistent_check)
+        session_layout.addStretch()
+        session_layout.addWidget(self.connect_button)
+        session_layout.addWidget(self.disconnect_button)
+        session_layout.addWidget(self.multi_port_button)
+        session_layout.addWidget(self.virtual_device_button)
+        
         # Layout
         connection_layout.addWidget(self.port_label, 0, 0)
         connection_layout.addWidget(self.port_combo, 0, 1)
@@ -63,6 +98,8 @@ class UARTTerminalUI(QMainWindow):
         connection_layout.addWidget(self.save_button, 1, 2)
         connection_layout.addWidget(self.status_label, 2, 0)
         connection_layout.addWidget(self.status_value, 2, 1, 1, 2)
+        connection_layout.addWidget(self.mode_label, 3, 0)
+        connection_layout.addLayout(session_layout, 3, 1, 1, 2)
         
         connection_group.setLayout(connection_layout)
         self.main_layout.addWidget(connection_group)
@@ -76,10 +113,75 @@ class UARTTerminalUI(QMainWindow):
         self.terminal_display.setReadOnly(True)
         self.terminal_display.setStyleSheet("font-family: monospace;")
         
+        # Hex dump of received bytes (only visible rows are rendered)
+        self.hex_view = HexDumpView()
+        self.hex_model = self.hex_view.model()
+        
+        self.terminal_tabs = QTabWidget()
+        self.terminal_tabs.addTab(self.terminal_display, "Log")
+        self.terminal_tabs.addTab(self.hex_view, "Hex Dump")
+        
+        # Per-transaction timing (open / write / first byte / last byte)
+        self.stats_panel = StatsPanel()
+        self.terminal_tabs.addTab(self.stats_panel, "Stats")
+        
+        # RX frames decoded into numeric channels and plotted
+        self.telemetry_view = TelemetryView()
+        self.terminal_tabs.addTab(self.telemetry_view, "Telemetry")
+        
+        # Scrollback caps
+        self.log_lines_label = QLabel("Log lines:")
+        self.log_lines_spin = QSpinBox()
+        self.log_lines_spin.setRange(100, 1000000)
+        self.log_lines_spin.setSingleStep(1000)
+        self.log_lines_spin.setValue(10000)
+        self.hex_kb_label = QLabel("Hex dump (KB):")
+        self.hex_kb_spin = QSpinBox()
+        self.hex_kb_spin.setRange(1, 65536)
+        self.hex_kb_spin.setSingleStep(256)
+        self.hex_kb_spin.setValue(1024)
+        
+        scrollback_layout = QHBoxLayout()
+        scrollback_layout.addWidget(self.log_lines_label)
+        scrollback_layout.addWidget(self.log_lines_spin)
+        scrollback_layout.addWidget(self.hex_kb_label)
+        scrollback_layout.addWidget(self.hex_kb_spin)
+        scrollback_layout.addStretch()
+        
         # Clear button
         self.clear_button = QPushButton("Clear Terminal")
         
-        terminal_layout.addWidget(self.terminal_display)
+        # Display statistics (messages posted / coalesced / dropped)
+        self.display_stats_label = QLabel("Display: 0 messages, 0 coalesced, 0 dropped")
+        
+        # RX framing (how the received stream is split into frames)
+        self.framing_label = QLabel("RX framing:")
+        self.framing_combo = QComboBox()
+        self.framing_combo.addItems(FRAMER_NAMES)
+        self.framing_param_input = QLineEdit()
+        
+        framing_layout = QHBoxLayout()
+        framing_layout.addWidget(self.framing_label)
+        framing_layout.addWidget(self.framing_combo)
+        framing_layout.addWidget(self.framing_param_input)
+        
+        # Binary capture: record traffic to a file, open or search a capture for replay
+        self.record_check = QCheckBox("Record to file")
+        self.capture_label = QLabel("Not recording")
+        self.open_capture_button = QPushButton("Open Capture...")
+        self.search_capture_button = QPushButton("Search Capture...")
+        
+        capture_layout = QHBoxLayout()
+        capture_layout.addWidget(self.record_check)
+        capture_layout.addWidget(self.capture_label, 1)
+        capture_layout.addWidget(self.open_capture_button)
+        capture_layout.addWidget(self.search_capture_button)
+        
+        terminal_layout.addLayout(framing_layout)
+        terminal_layout.addLayout(capture_layout)
+        terminal_layout.addWidget(self.terminal_tabs)
+        terminal_layout.addLayout(scrollback_layout)
+        terminal_layout.addWidget(self.display_stats_label)
         terminal_layout.addWidget(self.clear_button)
         
         terminal_group.setLayout(terminal_layout)
@@ -96,11 +198,96 @@ class UARTTerminalUI(QMainWindow):
         # Transmit button
         self.transmit_button = QPushButton("Send Hex")
         
+        # Saved commands, precompiled: buttons and hotkeys send ready frames
+        self.command_panel = CommandPanel(shortcut_parent=self)
+        
+        # Scripted sequence: file of hex steps, optionally pipelined
+        self.run_sequence_button = QPushButton("Run Sequence...")
+        self.pipeline_label = QLabel("Pipeline:")
+        self.pipeline_depth_spin = QSpinBox()
+        self.pipeline_depth_spin.setRange(1, 64)
+        self.pipeline_depth_spin.setValue(1)
+        self.pipeline_depth_spin.setToolTip("Responses outstanding at once, for sequences and for "
+                                            "Send Hex while connected (needs framing above 1)")
+        
+        # Pipelined transmits: responses matched to requests by an ID field
+        self.match_id_label = QLabel("Match ID:")
+        self.match_id_input = QLineEdit()
+        self.match_id_input.setPlaceholderText("in order")
+        self.match_id_input.setMaximumWidth(80)
+        self.match_id_input.setToolTip("Transaction-ID bytes shared by a request and its response: "
+                                       "offset[:length], e.g. 0:2 (negative offsets count from the end)")
+        
+        # Response completion: idle gap, expected length or terminator
+        self.response_label = QLabel("Response ends on:")
+        self.response_mode_combo = QComboBox()
+        self.response_mode_combo.addItems(["Idle gap", "Length", "Terminator"])
+        self.response_param_input = QLineEdit()
+        self.response_param_input.setPlaceholderText("gap ms (empty = auto from baudrate)")
+        self.response_timeout_label = QLabel("Timeout (ms):")
+        self.response_timeout_spin = QSpinBox()
+        self.response_timeout_spin.setRange(10, 60000)
+        self.response_timeout_spin.setSingleStep(100)
+        self.response_timeout_spin.setValue(2000)
+        
+        # Transmit engine: the command worker thread, or asyncio on the GUI thread
+        self.engine_label = QLabel("Engine:")
+        self.engine_combo = QComboBox()
+        self.engine_combo.addItems(["Threads", "asyncio"])
+        
+        # Bulk transmit: a binary or hex file in chunks, with flow control
+        self.send_file_button = QPushButton("Send File...")
+        self.chunk_label = QLabel("Chunk:")
+        self.chunk_size_spin = QSpinBox()
+        self.chunk_size_spin.setRange(1, 65536)
+        self.chunk_size_spin.setSingleStep(64)
+        self.chunk_size_spin.setValue(DEFAULT_CHUNK_SIZE)
+        self.chunk_size_spin.setSuffix(" B")
+        self.chunk_delay_spin = QSpinBox()
+        self.chunk_delay_spin.setRange(0, 10000)
+        self.chunk_delay_spin.setSuffix(" ms")
+        self.chunk_delay_spin.setToolTip("Pause after each chunk (for slow devices)")
+        self.flow_label = QLabel("Flow:")
+        self.flow_combo = QComboBox()
+        self.flow_combo.addItems(FLOW_NAMES)
+        self.bulk_progress = QProgressBar()
+        self.bulk_progress.setFormat("%p%")
+        self.bulk_progress.setValue(0)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        
         # Add to layout
         input_layout = QHBoxLayout()
         input_layout.addWidget(self.transmit_input)
         input_layout.addWidget(self.transmit_button)
+        input_layout.addWidget(self.run_sequence_button)
+        input_layout.addWidget(self.pipeline_label)
+        input_layout.addWidget(self.pipeline_depth_spin)
+        input_layout.addWidget(self.match_id_label)
+        input_layout.addWidget(self.match_id_input)
+        
+        response_layout = QHBoxLayout()
+        response_layout.addWidget(self.response_label)
+        response_layout.addWidget(self.response_mode_combo)
+        response_layout.addWidget(self.response_param_input)
+        response_layout.addWidget(self.response_timeout_label)
+        response_layout.addWidget(self.response_timeout_spin)
+        response_layout.addWidget(self.engine_label)
+        response_layout.addWidget(self.engine_combo)
+        
+        bulk_layout = QHBoxLayout()
+        bulk_layout.addWidget(self.send_file_button)
+        bulk_layout.addWidget(self.chunk_label)
+        bulk_layout.addWidget(self.chunk_size_spin)
+        bulk_layout.addWidget(self.chunk_delay_spin)
+        bulk_layout.addWidget(self.flow_label)
+        bulk_layout.addWidget(self.flow_combo)
+        bulk_layout.addWidget(self.bulk_progress, 1)
+        bulk_layout.addWidget(self.cancel_button)
         
         transmit_layout.addLayout(input_layout)
+        transmit_layout.addWidget(self.command_panel)
+        transmit_layout.addLayout(response_layout)
+        transmit_layout.addLayout(bulk_layout)
         transmit_group.setLayout(transmit_layout)
         self.main_layout.addWidget(transmit_group)
\ No newline at end of file
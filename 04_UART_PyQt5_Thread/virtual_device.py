@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ Virtual Device Module
+ ======================
+ - A simulated serial device on a pseudo-terminal pair, for working on
+   the terminal without hardware. The device holds the master end; the
+   slave end (/dev/pts/N) is opened like any serial port, so the reader
+   thread, the multiplexer and the asyncio engine all see a real file
+   descriptor.
+ 
+ - Rules file format (one entry per line, '#' starts a comment):
+        latency 5                               default reply latency in ms
+        latency 5 2                             ... with +/- 2 ms of jitter
+        01 03 ?? ?? | reply 01 03 02 00 2A      request pattern -> response
+        01 06 * | reply 06 {crc8}               '*' at the end: the rest of
+                                                what has arrived so far
+        ?? 10 | reply echo | latency 50         echo the request, 50 ms late
+        stream continuous | frame C0 01 02 C0   as fast as the port is read
+        stream continuous | frame 7E 01 | interval 10
+        stream burst | frame C0 01 C0 | count 200 | every 500
+   Patterns take '??' wildcards (like sequence files); replies and
+   frames take the command library's checksum placeholders and are
+   compiled once. The first rule whose pattern completes wins; bytes
+   that no rule can match are dropped.
+ 
+ - Replies wait in a timer heap, so a short-latency reply can overtake a
+   slower one (as with ID-matched pipelining). Output the client does
+   not read piles up in the pty, then in a bounded buffer; past that,
+   stream frames and replies are dropped and counted as overruns.
+ 
+ - loop:// can't carry a device of its own (what is written comes
+   straight back), so the simulator needs a pty (Linux / macOS).
+ 
+ - Usage:
+        python virtual_device.py rules.sim [--no-stream] [--stats S]
+ 
+ - Classes:
+        * ReplyRule: Request pattern, response and latency
+        * StreamProfile: Continuous or bursty unsolicited output
+        * DeviceRules: Parsed rules file
+        * VirtualDevice: The simulator thread on a pty pair
+ 
+ - Functions:
+        * parse_rules / load_rules: Rules text to DeviceRules
+"""
+
+import argparse
+import heapq
+import os
+import random
+import selectors
+import sys
+import threading
+import time
+
+from command_library import compile_command
+from sequence_runner import parse_pattern
+
+try:
+    import pty
+    import tty
+except ImportError:
+    # Windows: no pseudo-terminals
+    pty = tty = None
+
+PTY_AVAILABLE = pty is not None
+
+STREAM_KINDS = ["continuous", "burst"]
+RULES_FILTER = "Device rules (*.sim *.txt);;All files (*)"
+
+# Largest single read from the pty
+READ_CHUNK = 65536
+# Output held back while the client isn't reading; beyond it, overruns
+MAX_PENDING = 1 << 20
+# A full-rate stream tops the output up to this many bytes at a time
+STREAM_CHUNK = 16384
+# A partial request older than this is dropped as unmatched
+STALE_INPUT = 0.5
+# Longest selector wait (also how quickly stop() is noticed)
+MAX_WAIT = 0.05
+
+
+class ReplyRule:
+    """One request pattern and what the device answers"""
+    
+    def __init__(self, expect, mask=None, prefix=False, reply=None, latency=None,
+                 jitter=None, line=0):
+        self.expect = expect
+        self.mask = mask            # 0xFF for bytes that must match, 0x00 for ??
+        self.prefix = prefix        # Pattern ends in '*'
+        self.reply = reply          # Response bytes, None: echo the request
+        self.latency = latency      # Seconds, None: the file's default
+        self.jitter = jitter
+        self.line = line
+    
+    def match(self, buffer):
+        """Bytes of buffer the rule consumes: n > 0, 0 (no match) or -1 (needs more)"""
+        expect = self.expect
+        size = min(len(buffer), len(expect))
+        if self.mask is None:
+            head = buffer[:size] == expect[:size]
+        else:
+            head = all(m == 0 or b == e for b, e, m in zip(buffer, expect, self.mask))
+        if not head:
+            return 0
+        if len(buffer) < len(expect):
+            return -1
+        return len(buffer) if self.prefix else len(expect)
+
+
+class StreamProfile:
+    """Unsolicited frames: continuous (optionally every interval) or in bursts"""
+    
+    def __init__(self, kind, frame, interval=0.0, count=1, every=1.0, line=0):
+        self.kind = kind
+        self.frame = frame
+        self.interval = interval    # continuous: seconds between frames, 0: full rate
+        self.count = count          # burst: frames per burst
+        self.every = every          # burst: seconds between bursts
+        self.line = line
+    
+    @property
+    def full_rate(self):
+        return self.kind == "continuous" and self.interval <= 0
+    
+    @property
+    def period(self):
+        return self.every if self.kind == "burst" else self.interval
+    
+    def describe(self):
+        if self.kind == "burst":
+            return f"burst of {self.count} x {len(self.frame)} B every {self.every * 1000:g} ms"
+        if self.full_rate:
+            return f"continuous {len(self.frame)} B frames at full rate"
+        return f"continuous {len(self.frame)} B frames every {self.interval * 1000:g} ms"
+
+
+class DeviceRules:
+    """Reply rules, stream profiles and the default latency of a rules file"""
+    
+    def __init__(self, rules=None, streams=None, latency=0.0, jitter=0.0):
+        self.rules = rules or []
+        self.streams = streams or []
+        self.latency = latency      # Seconds
+        self.jitter = jitter
+
+
+def parse_options(parts, known):
+    """'keyword value' options after the first '|' as a dict (ValueError if unknown)"""
+    options = {}
+    for option in parts:
+        keyword, _, value = option.partition(" ")
+        if keyword not in known:
+            raise ValueError(f"unknown option '{keyword}'")
+        options[keyword] = value.strip()
+    return options
+
+
+def parse_latency(text):
+    """'MS [JITTER]' to seconds"""
+    values = text.split()
+    if not 1 <= len(values) <= 2:
+        raise ValueError("expected 'latency MS [JITTER]'")
+    latency = float(values[0]) / 1000.0
+    jitter = float(values[1]) / 1000.0 if len(values) > 1 else 0.0
+    if latency < 0 or jitter < 0:
+        raise ValueError("latency can't be negative")
+    return latency, jitter
+
+
+def parse_rules(text):
+    """Parse rules text (raises ValueError with the line number)"""
+    device = DeviceRules()
+    for number, raw_line in enumerate(text.splitlines(), 1):
+        line = raw_line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = [part.strip() for part in line.split("|")]
+        keyword, _, value = parts[0].partition(" ")
+        try:
+            if keyword == "latency":
+                device.latency, device.jitter = parse_latency(value)
+            elif keyword == "stream":
+                device.streams.append(parse_stream(value.strip(), parts[1:], number))
+            else:
+                device.rules.append(parse_rule(parts[0], parts[1:], number))
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}") from None
+    return device
+
+
+def parse_rule(pattern, parts, line):
+    expect, mask, prefix = parse_pattern(pattern)
+    if not expect:
+        raise ValueError("empty request pattern")
+    options = parse_options(parts, ("reply", "latency"))
+    if "reply" not in options:
+        raise ValueError("missing 'reply'")
+    reply = None if options["reply"] == "echo" else compile_command(options["reply"])
+    rule = ReplyRule(expect, mask, prefix, reply, line=line)
+    if "latency" in options:
+        rule.latency, rule.jitter = parse_latency(options["latency"])
+    return rule
+
+
+def parse_stream(kind, parts, line):
+    if kind not in STREAM_KINDS:
+        raise ValueError(f"stream must be one of {', '.join(STREAM_KINDS)}")
+    options = parse_options(parts, ("frame", "interval", "count", "every"))
+    if not options.get("frame"):
+        raise ValueError("missing 'frame'")
+    stream = StreamProfile(kind, compile_command(options["frame"]), line=line)
+    if not stream.frame:
+        raise ValueError("empty frame")
+    if kind == "continuous":
+        stream.interval = float(options.get("interval", 0)) / 1000.0
+    else:
+        stream.count = int(options.get("count", 1))
+        stream.every = float(options.get("every", 1000)) / 1000.0
+        if stream.count < 1 or stream.every <= 0:
+            raise ValueError("a burst needs count >= 1 and every > 0")
+    return stream
+
+
+def load_rules(path):
+    """Read and parse a rules file"""
+    with open(path, "r") as f:
+        return parse_rules(f.read())
+
+
+class VirtualDevice(threading.Thread):
+    """Answers requests and streams frames on the master end of a pty pair
+    
+    `port` is the slave's path; open it like a serial port. Counters are
+    updated from the device thread and may be read at any time.
+    """
+    
+    def __init__(self, rules, streaming=True, name=""):
+        super().__init__(daemon=True)
+        if not PTY_AVAILABLE:
+            raise OSError("virtual devices need pseudo-terminals (Linux / macOS)")
+        self.rules = rules.rules
+        self.streams = rules.streams if streaming else []
+        self.latency = rules.latency
+        self.jitter = rules.jitter
+        self.label = name           # Rules file name, for display
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+        
+        self.rx_bytes = 0
+        self.tx_bytes = 0
+        self.requests = 0           # Requests matched by a rule
+        self.unmatched = 0          # Request bytes no rule matched
+        self.stream_frames = 0
+        self.overruns = 0           # Replies and frames dropped, client not reading
+        
+        self._input = bytearray()
+        self._input_time = 0.0
+        self._output = bytearray()
+        self._replies = []          # Heap of (due, sequence, data)
+        self._sequence = 0
+        self._random = random.Random()
+        self._stop_event = threading.Event()
+    
+    def stop(self, timeout=1.0):
+        """Stop the device thread and close the pty"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+    
+    def describe(self):
+        return (
+            f"{self.requests} requests ({self.unmatched} B unmatched), "
+            f"{self.stream_frames} stream frames, {self.overruns} overruns; "
+            f"RX {self.rx_bytes} B, TX {self.tx_bytes} B"
+        )
+    
+    def run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self.master, selectors.EVENT_READ)
+        events = selectors.EVENT_READ
+        now = time.monotonic()
+        due = {stream: now for stream in self.streams}
+        try:
+            while not self._stop_event.is_set():
+                wanted = selectors.EVENT_READ | (selectors.EVENT_WRITE if self._output else 0)
+                if wanted != events:
+                    selector.modify(self.master, wanted)
+                    events = wanted
+                
+                wait = MAX_WAIT
+                if self._replies:
+                    wait = min(wait, self._replies[0][0] - now)
+                for stream, when in due.items():
+                    if not stream.full_rate:
+                        wait = min(wait, when - now)
+                for key, mask in selector.select(max(0.0, wait)):
+                    if mask & selectors.EVENT_READ:
+                        self._read()
+                    if mask & selectors.EVENT_WRITE:
+                        self._write()
+                
+                now = time.monotonic()
+                self._match(now)
+                while self._replies and self._replies[0][0] <= now:
+                    self._emit(heapq.heappop(self._replies)[2])
+                for stream in self.streams:
+                    if stream.full_rate:
+                        self._top_up(stream)
+                    elif due[stream] <= now:
+                        self._emit(stream.frame * stream.count, stream.count)
+                        # Late ticks are skipped, not made up in a rush
+                        due[stream] = max(due[stream] + stream.period, now)
+                if self._output:
+                    self._write()
+        except OSError:
+            pass  # The pty was closed under us
+        finally:
+            selector.close()
+    
+    def _read(self):
+        try:
+            data = os.read(self.master, READ_CHUNK)
+        except BlockingIOError:
+            return
+        self.rx_bytes += len(data)
+        self._input += data
+        self._input_time = time.monotonic()
+    
+    def _write(self):
+        try:
+            written = os.write(self.master, self._output)
+        except BlockingIOError:
+            return
+        self.tx_bytes += written
+        del self._output[:written]
+    
+    def _match(self, now):
+        """Consume complete requests from the input and schedule their replies"""
+        buffer = self._input
+        while buffer:
+            waiting = False
+            for rule in self.rules:
+                consumed = rule.match(buffer)
+                if consumed > 0:
+                    self._schedule(rule, bytes(buffer[:consumed]), now)
+                    del buffer[:consumed]
+                    self.requests += 1
+                    break
+                waiting = waiting or consumed < 0
+            else:
+                if waiting and now - self._input_time < STALE_INPUT:
+                    return
+                # No rule can match here: drop one byte and look again
+                del buffer[:1]
+                self.unmatched += 1
+    
+    def _schedule(self, rule, request, now):
+        latency = self.latency if rule.latency is None else rule.latency
+        jitter = self.jitter if rule.jitter is None else rule.jitter
+        if jitter:
+            latency = max(0.0, latency + self._random.uniform(-jitter, jitter))
+        reply = request if rule.reply is None else rule.reply
+        if not reply:
+            return
+        self._sequence += 1
+        heapq.heappush(self._replies, (now + latency, self._sequence, reply))
+    
+    def _emit(self, data, frames=0):
+        if len(self._output) >= MAX_PENDING:
+            self.overruns += frames or 1
+            return
+        self._output += data
+        self.stream_frames += frames
+    
+    def _top_up(self, stream):
+        """Keep a full-rate stream's output ready for the next write"""
+        if len(self._output) < STREAM_CHUNK:
+            frames = max(1, STREAM_CHUNK // len(stream.frame))
+            self._output += stream.frame * frames
+            self.stream_frames += frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated serial device on a pty pair")
+    parser.add_argument("rules", help="rules file (PATTERN | reply HEX per line, stream ...)")
+    parser.add_argument("--no-stream", action="store_true", help="ignore stream profiles")
+    parser.add_argument("--stats", type=float, default=0,
+                        help="print counters every S seconds (default: only on exit)")
+    args = parser.parse_args(argv)
+    
+    try:
+        rules = load_rules(args.rules)
+        device = VirtualDevice(rules, streaming=not args.no_stream,
+                               name=os.path.basename(args.rules))
+    except (OSError, ValueError) as e:
+        print(f"<Virtual device error: {e}>", file=sys.stderr)
+        return 1
+    device.start()
+    print(f"<Virtual device on {device.port}: {len(rules.rules)} rules>", flush=True)
+    for stream in device.streams:
+        print(f"<Stream: {stream.describe()}>", flush=True)
+    try:
+        while True:
+            time.sleep(args.stats or 3600)
+            if args.stats:
+                print(f"<{device.describe()}>", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.stop()
+        print(f"<{device.describe()}>")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())